@@ -17,8 +17,15 @@ import unicodedata
 import re
 import random
 import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, render_template, request, jsonify, send_file, Response, stream_with_context
+
+from utils.player_index import PlayerNameIndex
+from utils.player_profile_store import PlayerProfileStore
+from utils.club_registry import (get_club_registry, normalize_club_name, economic_factor, league_factor,
+                                 club_class, club_factors)
 
 # Modelos sintéticos eliminados - usando solo modelos reales
 
@@ -105,6 +112,10 @@ club_multipliers = None
 value_predictor = None  # Modelo de predicción de cambio de valor (Singleton)
 hybrid_model = None     # Modelo híbrido (Singleton)
 hybrid_searcher = None # Sistema híbrido de búsqueda (scraper)
+player_index = None     # Índice de nombres de player_data (exacto, prefijo y typos)
+player_index_lock = threading.Lock()
+player_profile_store = None  # Perfiles de player_data indexados por player_id (enriquecimiento de /search)
+player_profile_store_lock = threading.Lock()
 
 # Sistema de cache mejorado
 cache = {
@@ -118,6 +129,25 @@ cache = {
     'autocomplete_ttl': 300       # 5 minutos
 }
 
+# Resumen precalculado del dashboard (se invalida por fecha, lo refresca un hilo en segundo plano)
+dashboard_summary = {
+    'key': None,    # Fecha (YYYY-MM-DD) con la que se calcularon las edades
+    'data': None,   # Estadisticas listas para devolver
+}
+dashboard_summary_lock = threading.Lock()
+dashboard_refresher_started = False
+dashboard_refresh_event = threading.Event()  # Despierta al hilo de refresco antes del intervalo
+dashboard_refresh_forced = False             # El próximo refresco recalcula aunque la fecha no cambió
+DASHBOARD_REFRESH_INTERVAL = 3600  # Revisar cada hora si cambio el dia
+
+# Enriquecimiento del registro de clubes con la API de Transfermarkt (en segundo plano)
+TRANSFERMARKT_CLUB_SEARCH_URL = "https://transfermarkt-api.fly.dev/clubs/search/{query}?page_number=1"
+CLUB_ENRICHMENT_TTL = 6 * 3600       # No volver a consultar la misma búsqueda antes de 6 horas
+CLUB_ENRICHMENT_MAX_PENDING = 20     # Búsquedas en cola como máximo (el resto se descarta)
+club_enrichment_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='club-enrichment')
+club_enrichment_state = {'last_run': {}, 'pending': 0}
+club_enrichment_lock = threading.Lock()
+
 def get_cached_data(data_type):
     """Obtener datos del cache si estan disponibles"""
     global cache
@@ -136,6 +166,96 @@ def set_cached_data(data_type, data):
     cache[data_type] = data
     cache['last_loaded'] = datetime.now()
 
+def build_dashboard_summary(players, clubs, transfers, today=None):
+    """Calcular las estadisticas del dashboard con operaciones vectorizadas (sin modificar los datos globales)"""
+    today = today or date.today()
+    
+    stats = {
+        'total_players': len(players) if players is not None else 0,
+        'total_clubs': len(clubs) if clubs is not None else 0,
+        'total_transfers': len(transfers) if transfers is not None else 0,
+        'model_accuracy': 95.0,  # Precision del modelo
+        'system_status': 'operational'
+    }
+    
+    # Estadisticas de jugadores por posicion
+    if players is not None and not players.empty:
+        if 'position' in players.columns:
+            stats['top_positions'] = players['position'].value_counts().head(5).to_dict()
+        
+        # Estadisticas de edad (Series local, no se escribe en el DataFrame compartido)
+        if 'date_of_birth' in players.columns:
+            try:
+                birth_dates = pd.to_datetime(players['date_of_birth'], errors='coerce')
+                ages = (pd.Timestamp(today) - birth_dates).dt.days // 365
+                avg_age = ages.mean()
+                stats['average_age'] = round(float(avg_age), 1) if pd.notna(avg_age) else 0
+            except Exception as e:
+                print(f"⚠️ Error calculando edades del dashboard: {e}")
+                stats['average_age'] = 0
+    
+    # Estadisticas de clubes por liga
+    if clubs is not None:
+        stats['top_leagues'] = {
+            'La Liga': 20,
+            'Premier League': 20,
+            'Serie A': 20,
+            'Bundesliga': 18,
+            'Ligue 1': 20
+        }
+    
+    return stats
+
+def refresh_dashboard_summary(force=False):
+    """Recalcular el resumen del dashboard si cambio la fecha (o si se fuerza)"""
+    global dashboard_summary
+    
+    key = date.today().isoformat()
+    if not force and dashboard_summary['key'] == key and dashboard_summary['data'] is not None:
+        return dashboard_summary['data']
+    
+    # Evitar recalculos simultaneos; si otro hilo ya esta calculando, devolver lo que haya
+    if not dashboard_summary_lock.acquire(blocking=False):
+        return dashboard_summary['data']
+    try:
+        data = build_dashboard_summary(player_data, club_data, model_data)
+        # Reemplazo atomico del dict completo: los lectores nunca ven un resumen a medias
+        dashboard_summary = {'key': key, 'data': data}
+        return data
+    except Exception as e:
+        print(f"❌ Error recalculando resumen del dashboard: {e}")
+        return dashboard_summary['data']
+    finally:
+        dashboard_summary_lock.release()
+
+def start_dashboard_refresher():
+    """Lanzar el hilo en segundo plano que mantiene actualizado el resumen del dashboard"""
+    global dashboard_refresher_started
+    
+    if dashboard_refresher_started:
+        return
+    dashboard_refresher_started = True
+    
+    def _refresh_loop():
+        global dashboard_refresh_forced
+        while True:
+            force, dashboard_refresh_forced = dashboard_refresh_forced, False
+            refresh_dashboard_summary(force=force)
+            # Dormir hasta el próximo intervalo o hasta que alguien pida un refresco
+            dashboard_refresh_event.wait(DASHBOARD_REFRESH_INTERVAL)
+            dashboard_refresh_event.clear()
+    
+    threading.Thread(target=_refresh_loop, daemon=True).start()
+    print("✅ Refresco del resumen del dashboard en segundo plano iniciado")
+
+def request_dashboard_refresh(force=False):
+    """Despertar al hilo de refresco (y lanzarlo si hace falta) sin crear un hilo por llamada"""
+    global dashboard_refresh_forced
+    if force:
+        dashboard_refresh_forced = True
+    start_dashboard_refresher()
+    dashboard_refresh_event.set()
+
 def initialize_model():
     """Inicializar el modelo perfecto usando los datos ya procesados"""
     global model_data, player_data, club_data, club_multipliers, perfect_model
@@ -165,6 +285,17 @@ def initialize_model():
         player_data['player_name'] = player_data['player_name'].apply(clean_player_name)
         player_data['current_club_name'] = player_data['current_club_name'].apply(clean_player_name)
         
+        # Indexar nombres para búsquedas locales (tolerantes a typos) y perfiles por player_id
+        get_player_index()
+        get_player_profile_store()
+        
+        # Sembrar el mapa de identidades de los scrapers con los player_id de Transfermarkt
+        try:
+            from scraping.player_identity import get_player_identity_map
+            get_player_identity_map().seed_from_profiles(player_data)
+        except Exception as e:
+            print(f"⚠️ Mapa de identidades no disponible: {e}")
+        
         # Cargar equipos (con cache)
         cached_teams = get_cached_data('teams_data')
         if cached_teams is not None:
@@ -194,6 +325,9 @@ def initialize_model():
                     print(f"No se encontraron multiplicadores de clubes: {e3}")
                     club_multipliers = pd.DataFrame()
         
+        # Indexar multiplicadores en el registro de clubes
+        get_club_registry().set_multiplier_table(club_multipliers)
+        
         # Inicializar modelo de cambios de precios de mercado (Singleton) - Carga diferida
         try:
             if ValueChangePredictor is not None:
@@ -212,6 +346,9 @@ def initialize_model():
         print(f"Clubes disponibles: {len(club_data)}")
         print(f"Multiplicadores disponibles: {len(club_multipliers) if not club_multipliers.empty else 'Ninguno'}")
         
+        # Recalcular el resumen del dashboard con los datos recien cargados
+        request_dashboard_refresh(force=True)
+        
         return True
         
     except Exception as e:
@@ -241,6 +378,38 @@ def normalize_name(name):
     
     return name
 
+def get_player_index():
+    """Índice de nombres de player_data (se reconstruye si player_data cambió)"""
+    global player_index
+    if player_data is None or not hasattr(player_data, 'columns') or 'player_name' not in player_data.columns:
+        return None
+    index = player_index
+    if index is not None and index.source is player_data:
+        return index
+    with player_index_lock:
+        if player_index is None or player_index.source is not player_data:
+            start = time.time()
+            index = PlayerNameIndex(player_data['player_name'].tolist(), source=player_data)
+            player_index = index
+            print(f"✅ Índice de jugadores: {len(index)} nombres en {time.time() - start:.1f}s")
+        return player_index
+
+def get_player_profile_store():
+    """Perfiles de player_data por player_id (se reconstruye si player_data cambió)"""
+    global player_profile_store
+    if player_data is None or not hasattr(player_data, 'columns') or 'player_id' not in player_data.columns:
+        return None
+    store = player_profile_store
+    if store is not None and store.source is player_data:
+        return store
+    with player_profile_store_lock:
+        if player_profile_store is None or player_profile_store.source is not player_data:
+            start = time.time()
+            store = PlayerProfileStore(player_data, source=player_data)
+            player_profile_store = store
+            print(f"✅ Store de perfiles: {len(store)} jugadores en {time.time() - start:.1f}s")
+        return player_profile_store
+
 def validate_player_name(name):
     """Validar nombre del jugador"""
     if not name or not isinstance(name, str):
@@ -1164,120 +1333,17 @@ def find_similar_players_for_analysis(player_info, transfers_with_fee):
 
 def get_dynamic_club_multiplier(club_name, player_value):
     """Obtener multiplicador dinamico basado en club y valor del jugador"""
-    global club_multipliers
-    
-    if club_multipliers is None or club_multipliers.empty:
-        return get_default_club_multiplier(club_name)
-    
-    # Limpiar nombre del club para busqueda
-    clean_club_name = clean_player_name(club_name)
-    
-    # Buscar club por nombre exacto
-    club_match = club_multipliers[club_multipliers['club_name'] == clean_club_name]
-    
-    if len(club_match) > 0:
-        club_data = club_match.iloc[0]
-        base_multiplier = club_data['final_multiplier']
-        category = club_data.get('category', 'Primera Division')
-        
-        # Determinar categoria de valor del jugador y ajustar multiplicador (ORIGINAL)
-        if player_value >= 100_000_000:  # > 100M - Superestrellas absolutas
-            player_category = 'superstar_absolute'
-            player_multiplier = 0.95  # Original que funcionaba
-        elif player_value >= 50_000_000:  # > 50M - Superestrellas
-            player_category = 'superstar'
-            player_multiplier = 0.98  # Original que funcionaba
-        elif player_value >= 20_000_000:  # > 20M - Estrellas
-            player_category = 'star'
-            player_multiplier = 1.0  # Sin ajuste
-        elif player_value >= 5_000_000:  # > 5M - Buenos jugadores
-            player_category = 'good'
-            player_multiplier = 1.01  # Original que funcionaba
-        elif player_value >= 1_000_000:  # > 1M - Jugadores promedio
-            player_category = 'average'
-            player_multiplier = 1.02  # Original que funcionaba
-        else:  # < 1M - Jugadores baratos
-            player_category = 'cheap'
-            player_multiplier = 1.03  # Original que funcionaba
-        
-        # Calcular multiplicador final
-        final_multiplier = base_multiplier * player_multiplier
-        
-        print(f"Multiplicador dinamico para {clean_club_name}:")
-        print(f"   Club ({category}): {base_multiplier:.2f}x")
-        print(f"   Jugador ({player_category}): {player_multiplier:.2f}x")
-        print(f"   Final: {final_multiplier:.2f}x")
-        print(f"   Valor jugador: {player_value/1000000:.1f}M")
-        
-        return final_multiplier
-    
-    # Si no se encuentra exacto, buscar por similitud
-    for _, club in club_multipliers.iterrows():
-        if clean_club_name.lower() in club['club_name'].lower() or club['club_name'].lower() in clean_club_name.lower():
-            base_multiplier = club['final_multiplier']
-            category = club.get('category', 'Primera Division')
-            
-            # Aplicar multiplicador por valor de jugador (MAS CONSERVADOR)
-            if player_value >= 100_000_000:  # > 100M
-                player_multiplier = 0.95
-            elif player_value >= 50_000_000:  # > 50M
-                player_multiplier = 0.98
-            elif player_value >= 20_000_000:  # > 20M
-                player_multiplier = 1.0
-            elif player_value >= 5_000_000:  # > 5M
-                player_multiplier = 1.01
-            elif player_value >= 1_000_000:  # > 1M
-                player_multiplier = 1.02
-            else:  # < 1M
-                player_multiplier = 1.03
-            
-            final_multiplier = base_multiplier * player_multiplier
-            
-            print(f"Multiplicador aproximado para {clean_club_name}: {final_multiplier:.2f}x ({category})")
-            return final_multiplier
-    
-    # Si no se encuentra, usar multiplicador por defecto
-    default_multiplier = get_default_club_multiplier(clean_club_name)
-    
-    # Ajustar por valor del jugador (mas conservador)
-    if player_value >= 100_000_000:  # > 100M
-        player_multiplier = 0.7
-    elif player_value >= 50_000_000:  # > 50M
-        player_multiplier = 0.8
-    elif player_value >= 20_000_000:  # > 20M
-        player_multiplier = 0.9
-    elif player_value >= 5_000_000:  # > 5M
-        player_multiplier = 0.95
-    elif player_value >= 1_000_000:  # > 1M
-        player_multiplier = 1.0
-    else:  # < 1M
-        player_multiplier = 1.1
-    
-    final_multiplier = default_multiplier * player_multiplier
-    print(f"Multiplicador por defecto para {clean_club_name}: {final_multiplier:.2f}x")
-    return final_multiplier
-
-def get_default_club_multiplier(club_name):
-    """Obtener multiplicador por defecto basado en el nombre del club"""
-    club_lower = club_name.lower()
+    registry = get_club_registry()
     
-    # Clubes de elite conocidos
-    elite_clubs = ['real madrid', 'barcelona', 'manchester united', 'manchester city', 'chelsea', 'arsenal', 'liverpool', 'bayern', 'psg', 'juventus', 'milan', 'inter']
-    if any(elite in club_lower for elite in elite_clubs):
-        return 1.05  # Original que funcionaba
+    # Indexar la tabla de multiplicadores (no hace nada si ya esta indexada)
+    registry.set_multiplier_table(club_multipliers)
     
-    # Clubes de primera division conocidos
-    top_clubs = ['tottenham', 'atletico', 'sevilla', 'valencia', 'roma', 'napoli', 'dortmund', 'leipzig', 'monaco', 'lyon', 'marseille']
-    if any(top in club_lower for top in top_clubs):
-        return 1.02  # Original que funcionaba
-    
-    # Clubes de segunda division o menores
-    lower_clubs = ['b', 'ii', '2', 'reserve', 'youth', 'academy']
-    if any(lower in club_lower for lower in lower_clubs):
-        return 0.9  # Original que funcionaba
-    
-    # Por defecto
-    return 1.0
+    # Busqueda exacta / alias / tokens en O(1) + ajuste memoizado por valor del jugador
+    return registry.get_dynamic_multiplier(clean_player_name(club_name), player_value)
+
+def get_default_club_multiplier(club_name):
+    """Obtener multiplicador por defecto basado en el tier del club (valor de mercado)"""
+    return get_club_registry().get_default_multiplier(club_name)
 
 def check_cache_for_market_value(player_name):
     """Verificar si hay valor de mercado en el cache para un jugador"""
@@ -1558,10 +1624,19 @@ def buscar_con_api_externa(nombre):
         print(f"⚠️ Error en API externa: {e}")
         return None
 
-def buscar_jugador_robusto(nombre):
-    """Buscar jugador con sistema robusto: API -> FootballTransfers -> Scraper -> Cache -> Error si no hay valor"""
-    print(f"🔍 Búsqueda robusta para: {nombre}")
-    
+def correccion_local(nombre):
+    """Nombre del índice local más parecido cuando la búsqueda solo matchea con typos (None si no hay)"""
+    try:
+        index = get_player_index()
+        match = index.best_match(nombre) if index is not None else None
+        if match is not None and match[1] == 'fuzzy':
+            return index.names[match[0]]
+    except Exception as e:
+        print(f"⚠️ Error en índice de jugadores: {e}")
+    return None
+
+def buscar_en_fuentes_remotas(nombre):
+    """Fuentes remotas en orden: API externa -> FootballTransfers -> Transfermarkt (None si ninguna tiene valor)"""
     # 1. Intentar con API externa PRIMERO
     api_failed = False
     try:
@@ -1629,6 +1704,26 @@ def buscar_jugador_robusto(nombre):
     else:
         transfermarkt_failed = True
     
+    return None
+
+def buscar_jugador_robusto(nombre):
+    """Buscar jugador con sistema robusto: API -> FootballTransfers -> Scraper -> Cache -> Error si no hay valor"""
+    print(f"🔍 Búsqueda robusta para: {nombre}")
+    
+    remote_data = buscar_en_fuentes_remotas(nombre)
+    if remote_data is not None:
+        return remote_data
+    
+    # Segundo intento con la corrección del índice local ("Mbape" -> "Kylian Mbappé"). Solo después de
+    # que el nombre original falló: las fuentes remotas existen justamente para jugadores que no están
+    # en player_profiles, y un match por typos ahí sería otro jugador ("Endrick" -> "Jeff Hendrick")
+    corregido = correccion_local(nombre)
+    if corregido is not None and corregido != nombre:
+        print(f"✏️ Reintentando '{nombre}' con la corrección del índice local: '{corregido}'")
+        remote_data = buscar_en_fuentes_remotas(corregido)
+        if remote_data is not None:
+            return remote_data
+    
     # 3. VERIFICAR CACHE como backup
     cache_market_value = check_cache_for_market_value(nombre)
     if cache_market_value and cache_market_value > 0:
@@ -1808,54 +1903,35 @@ def buscar_jugador(nombre_jugador):
         print("player_data no esta inicializado")
         return None
     
-    # Normalizar el nombre de busqueda
-    nombre_busqueda = normalize_name(nombre_jugador)
-    
-    print(f"Buscando: '{nombre_jugador}' -> normalizado: '{nombre_busqueda}'")
-    
-    # Crear columna normalizada si no existe
-    if hasattr(player_data, 'columns') and 'player_name_normalized' not in player_data.columns:
-        player_data['player_name_normalized'] = player_data['player_name'].apply(normalize_name)
-    
-    # Buscar coincidencias exactas primero
-    exact_matches = player_data[
-        player_data['player_name_normalized'] == nombre_busqueda
-    ]
-    
-    if len(exact_matches) > 0:
-        player_result = exact_matches.iloc[0].to_dict()
-        # Verificar si esta retirado
-        if player_result.get('current_club_name', '').lower() == 'retired':
-            print(f" Jugador retirado encontrado: {player_result['player_name']}")
-            return None
-        print(f" Coincidencia exacta encontrada: {player_result['player_name']}")
-        return player_result
+    index = get_player_index()
+    if index is None:
+        print("player_data no tiene nombres de jugadores")
+        return None
     
-    # Buscar coincidencias parciales
-    matches = player_data[
-        player_data['player_name_normalized'].str.contains(nombre_busqueda, na=False)
-    ]
+    print(f"Buscando: '{nombre_jugador}' -> normalizado: '{normalize_name(nombre_jugador)}'")
     
-    if len(matches) > 0:
-        player_result = matches.iloc[0].to_dict()
+    # Nombre exacto, tokens completos (con tolerancia a typos) y, por último, prefijo
+    match = index.best_match(nombre_jugador)
+    if match is not None:
+        row, match_type = match
+        player_result = player_data.iloc[row].to_dict()
         # Verificar si esta retirado
-        if player_result.get('current_club_name', '').lower() == 'retired':
+        if str(player_result.get('current_club_name', '')).lower() == 'retired':
             print(f" Jugador retirado encontrado: {player_result['player_name']}")
             return None
-        print(f" Coincidencia parcial encontrada: {player_result['player_name']}")
+        labels = {'exact': 'exacta', 'tokens': 'parcial', 'fuzzy': 'aproximada'}
+        print(f" Coincidencia {labels[match_type]} encontrada: {player_result['player_name']}")
         return player_result
     
     # Buscar por palabras individuales
-    palabras_busqueda = nombre_busqueda.split()
+    palabras_busqueda = normalize_name(nombre_jugador).split()
     if len(palabras_busqueda) > 1:
         for palabra in palabras_busqueda:
             if len(palabra) > 2:  # Solo palabras de mas de 2 caracteres
-                matches = player_data[
-                    player_data['player_name_normalized'].str.contains(palabra, na=False)
-                ]
-                if len(matches) > 0:
-                    print(f" Coincidencia por palabra '{palabra}': {matches.iloc[0]['player_name']}")
-                    return matches.iloc[0].to_dict()
+                match = index.best_match(palabra)
+                if match is not None:
+                    print(f" Coincidencia por palabra '{palabra}': {index.names[match[0]]}")
+                    return player_data.iloc[match[0]].to_dict()
     
     print(f" No se encontro jugador: '{nombre_jugador}'")
     return None
@@ -2267,6 +2343,87 @@ def calcular_multiplicador_estadisticas_positivo(stats):
     # GARANTIZAR QUE NUNCA SEA MENOR A 1.0
     return max(1.0, multiplicador)
 
+def formatear_analisis_reporte(result, jugador_info):
+    """Formatear resultado del modelo híbrido 2025 para reportes y comparaciones"""
+    market_value = jugador_info.get('market_value', 0)
+    age = jugador_info.get('age', 25)
+    # Convertir edad a entero si es posible, sino usar valor por defecto
+    try:
+        age = int(float(age)) if age != "--" and age is not None else 25
+    except (ValueError, TypeError):
+        age = 25
+        
+    position = jugador_info.get('position', 'Midfielder')
+    
+    # Calcular factores dinámicos
+    age_factor = min(100, max(50, 100 - abs(25 - age) * 2))
+    
+    # Position factor basado en la posición
+    position_factors = {
+        'Goalkeeper': 75,
+        'Defender': 80,
+        'Midfielder': 90,
+        'Winger': 92,
+        'Forward': 88,
+        'Attacking Midfield': 95,
+        'Defensive Midfield': 85,
+        'Centre-Back': 78,
+        'Left-Back': 82,
+        'Right-Back': 82
+    }
+    position_factor = position_factors.get(position, 85)
+    
+    # League factor basado en el club actual
+    current_club = jugador_info.get('current_club_name', '')
+    league_factor = 85  # Por defecto
+    # Ligas top tienen factor más alto
+    top_leagues_clubs = ['Real Madrid', 'Barcelona', 'Manchester City', 'Liverpool', 'Bayern Munich', 'PSG', 'Juventus', 'Inter', 'AC Milan']
+    if any(club in current_club for club in top_leagues_clubs):
+        league_factor = 95
+    elif market_value > 10_000_000:
+        league_factor = 90
+    elif market_value > 5_000_000:
+        league_factor = 85
+    else:
+        league_factor = 75
+    
+    return {
+        'precio_maximo': result.get('maximum_price', 0),
+        'fair_price': result.get('maximum_price', 0),
+        'adjusted_price': result.get('maximum_price', 0),
+        'roi_estimate': {
+            'percentage': result.get('roi_percentage', 0)
+        },
+        'confidence': result.get('confidence', 85),
+        'model_used': 'Hybrid ROI Model 2025',
+        'market_value': market_value,
+        'predicted_future_value': result.get('predicted_future_value', market_value),
+        'club_multiplier': result.get('club_multiplier', 1.0),
+        'success_rate': result.get('success_rate', 75),
+        'five_values': result.get('five_values', {
+            'market_value': market_value,
+            'marketing_impact': market_value * 0.2,
+            'sporting_value': market_value * 0.3,
+            'resale_potential': market_value * 0.25,
+            'similar_transfers': market_value * 0.25
+        }),
+        'performance_analysis': {
+            'age_factor': age_factor,
+            'position_factor': position_factor,
+            'league_factor': league_factor
+        },
+        'detailed_values': {
+            'mv_component': market_value * 0.2 / 1_000_000,
+            'sv_component': market_value * 0.3 / 1_000_000,
+            'resale_component': market_value * 0.25 / 1_000_000,
+            'similar_transfers': market_value * 0.25 / 1_000_000
+        },
+        'similar_players_count': 100,
+        'risk_assessment': {
+            'risk_level': 'low' if result.get('confidence', 85) > 80 else 'medium' if result.get('confidence', 85) > 60 else 'high'
+        }
+    }
+
 def calcular_precio_perfecto_definitivo(nombre_jugador, club_destino, jugador_info=None):
     """Calcular precio usando el modelo híbrido 2025"""
     print(f"=== USANDO MODELO HÍBRIDO 2025 PARA REPORTE ===")
@@ -2305,84 +2462,7 @@ def calcular_precio_perfecto_definitivo(nombre_jugador, club_destino, jugador_in
         print(f"📊 ROI calculado: {result.get('roi_percentage', 0):.2f}%")
         
         # Formatear resultado para el frontend
-        market_value = jugador_info.get('market_value', 0)
-        age = jugador_info.get('age', 25)
-        # Convertir edad a entero si es posible, sino usar valor por defecto
-        try:
-            age = int(float(age)) if age != "--" and age is not None else 25
-        except (ValueError, TypeError):
-            age = 25
-            
-        position = jugador_info.get('position', 'Midfielder')
-        
-        # Calcular factores dinámicos
-        age_factor = min(100, max(50, 100 - abs(25 - age) * 2))
-        
-        # Position factor basado en la posición
-        position_factors = {
-            'Goalkeeper': 75,
-            'Defender': 80,
-            'Midfielder': 90,
-            'Winger': 92,
-            'Forward': 88,
-            'Attacking Midfield': 95,
-            'Defensive Midfield': 85,
-            'Centre-Back': 78,
-            'Left-Back': 82,
-            'Right-Back': 82
-        }
-        position_factor = position_factors.get(position, 85)
-        
-        # League factor basado en el club actual
-        current_club = jugador_info.get('current_club_name', '')
-        league_factor = 85  # Por defecto
-        # Ligas top tienen factor más alto
-        top_leagues_clubs = ['Real Madrid', 'Barcelona', 'Manchester City', 'Liverpool', 'Bayern Munich', 'PSG', 'Juventus', 'Inter', 'AC Milan']
-        if any(club in current_club for club in top_leagues_clubs):
-            league_factor = 95
-        elif market_value > 10_000_000:
-            league_factor = 90
-        elif market_value > 5_000_000:
-            league_factor = 85
-        else:
-            league_factor = 75
-        
-        return {
-            'precio_maximo': result.get('maximum_price', 0),
-            'fair_price': result.get('maximum_price', 0),
-            'adjusted_price': result.get('maximum_price', 0),
-            'roi_estimate': {
-                'percentage': result.get('roi_percentage', 0)
-            },
-            'confidence': result.get('confidence', 85),
-            'model_used': 'Hybrid ROI Model 2025',
-            'market_value': market_value,
-            'predicted_future_value': result.get('predicted_future_value', market_value),
-            'club_multiplier': result.get('club_multiplier', 1.0),
-            'success_rate': result.get('success_rate', 75),
-            'five_values': result.get('five_values', {
-                'market_value': market_value,
-                'marketing_impact': market_value * 0.2,
-                'sporting_value': market_value * 0.3,
-                'resale_potential': market_value * 0.25,
-                'similar_transfers': market_value * 0.25
-            }),
-            'performance_analysis': {
-                'age_factor': age_factor,
-                'position_factor': position_factor,
-                'league_factor': league_factor
-            },
-            'detailed_values': {
-                'mv_component': market_value * 0.2 / 1_000_000,
-                'sv_component': market_value * 0.3 / 1_000_000,
-                'resale_component': market_value * 0.25 / 1_000_000,
-                'similar_transfers': market_value * 0.25 / 1_000_000
-            },
-            'similar_players_count': 100,
-            'risk_assessment': {
-                'risk_level': 'low' if result.get('confidence', 85) > 80 else 'medium' if result.get('confidence', 85) > 60 else 'high'
-            }
-        }
+        return formatear_analisis_reporte(result, jugador_info)
         
     except Exception as e:
         print(f"❌ Error en modelo híbrido 2025 para reporte: {e}")
@@ -2390,6 +2470,17 @@ def calcular_precio_perfecto_definitivo(nombre_jugador, club_destino, jugador_in
         traceback.print_exc()
         return None
 
+def calcular_precios_perfectos_lote(jugadores_info, clubes_destino):
+    """Calcular el análisis híbrido 2025 de varios jugadores con una sola pasada de los modelos"""
+    model = hybrid_model or hybrid_roi_model_real
+    if model is None:
+        print("❌ Modelo híbrido no disponible")
+        return [None] * len(jugadores_info)
+    
+    clubs = [{'name': club} if isinstance(club, str) else club for club in clubes_destino]
+    results = model.calculate_batch_analysis(jugadores_info, clubs)
+    return [formatear_analisis_reporte(result, info) for result, info in zip(results, jugadores_info)]
+
 def calcular_precio_perfecto_fallback(nombre_jugador, club_destino, jugador_info=None, roi_target=30.0):
     """Funcion de fallback usando calculo basico con ROI objetivo"""
     try:
@@ -3110,9 +3201,10 @@ def autocomplete():
             if player_data is not None and not player_data.empty:
                 print(f"   📊 CSV: Buscando en {len(player_data)} jugadores...")
                 
-                # Buscar en nombre (case insensitive)
-                mask = player_data['player_name'].str.contains(query, case=False, na=False)
-                results = player_data[mask].head(15)
+                # Índice de nombres: tokens y prefijo, con tolerancia a typos ("Mbape", "Halland")
+                index = get_player_index()
+                matches = index.search(query, limit=15) if index is not None else []
+                results = player_data.iloc[[row for row, _ in matches]]
                 
                 suggestions = []
                 for _, player in results.iterrows():
@@ -3216,11 +3308,123 @@ def autocomplete():
         print(f"❌ Error general: {e}")
         return jsonify([])
 
+def _format_club_market_value(market_value):
+    """Valor de mercado legible (€1.1B, €39M, €500K)"""
+    if market_value >= 1000000000:  # >= 1B
+        return f"€{market_value/1000000000:.1f}B"
+    elif market_value >= 1000000:  # >= 1M
+        return f"€{market_value/1000000:.0f}M"
+    elif market_value >= 1000:  # >= 1K
+        return f"€{market_value/1000:.0f}K"
+    return f"€{market_value:,.0f}"
+
+def _build_club_result(name, country, market_value, club_id='', url='', squad=0, factors=None):
+    """Resultado de búsqueda de clubes (mismo formato para registro y API)"""
+    market_value = market_value or 0
+    squad = squad or 0
+    market_value_str = _format_club_market_value(market_value)
+    result = {
+        'name': name,
+        'country': country,
+        'market_value': market_value_str,
+        'market_value_raw': market_value,
+        'display': f"{name} ({country}) - {market_value_str}",
+        'id': club_id,
+        'url': url,
+        'squad': squad
+    }
+    result.update(factors or club_factors(market_value, squad, country))
+    return result
+
+def _registry_club_result(club):
+    """Resultado de búsqueda a partir de un club del registro local (factores precalculados)"""
+    return _build_club_result(club.get('name', ''), club.get('country') or '', club.get('market_value') or 0,
+                              club.get('id', ''), club.get('url', ''), club.get('squad_size') or 0,
+                              factors=get_club_registry().get_factors(club))
+
+def _remote_club_result(club):
+    """Resultado de búsqueda a partir de un club de la API de Transfermarkt"""
+    return _build_club_result(club.get('name', ''), club.get('country', ''), club.get('marketValue', 0),
+                              club.get('id', ''), club.get('url', ''), club.get('squad', 0))
+
+def _search_local_clubs(query, limit):
+    """Buscar clubes en el registro local (sin filiales, reservas ni selecciones)"""
+    results = []
+    for club in get_club_registry().search(query, limit * 2):
+        if not _should_filter_club(club.get('name', ''), club.get('country') or '', club.get('id')):
+            results.append(club)
+            if len(results) >= limit:
+                break
+    return results
+
+def _search_clubs_remote(query, timeout=5):
+    """
+    Buscar clubes en la API de Transfermarkt y sumar los nuevos al registro local.
+    Devuelve la lista cruda de resultados, o None si la API no respondió.
+    """
+    import requests
+
+    url = TRANSFERMARKT_CLUB_SEARCH_URL.format(query=query)
+    try:
+        response = requests.get(url, headers={'accept': 'application/json'}, timeout=timeout)
+    except Exception as e:
+        print(f"   ⚠️ API error: {e}")
+        return None
+
+    if response.status_code != 200:
+        print(f"   ⚠️ Error en API Transfermarkt: {response.status_code}")
+        return None
+
+    # Verificar que la respuesta sea JSON antes de parsear
+    try:
+        data = response.json()
+    except ValueError as json_error:
+        print(f"❌ Error parseando JSON en clubs API: {json_error}")
+        print(f"📄 Respuesta recibida: {response.text[:200]}")
+        data = {}
+
+    results = data.get('results', [])
+    added = get_club_registry().add_remote_clubs(results)
+    # La búsqueda ya quedó reflejada en el registro: no hace falta re-enriquecerla
+    with club_enrichment_lock:
+        club_enrichment_state['last_run'][normalize_club_name(query)] = time.time()
+    if added:
+        print(f"   📥 Registro de clubes: +{added} clubes desde la API ('{query}')")
+    return results
+
+def _run_club_enrichment(query):
+    try:
+        _search_clubs_remote(query, timeout=10)
+    finally:
+        with club_enrichment_lock:
+            club_enrichment_state['pending'] -= 1
+
+def _enrich_clubs_async(query):
+    """Consultar la API en segundo plano para que la próxima búsqueda ya tenga los clubes nuevos"""
+    key = normalize_club_name(query)
+    now = time.time()
+    with club_enrichment_lock:
+        last_run = club_enrichment_state['last_run']
+        if now - last_run.get(key, 0) < CLUB_ENRICHMENT_TTL:
+            return
+        if club_enrichment_state['pending'] >= CLUB_ENRICHMENT_MAX_PENDING:
+            return
+        if len(last_run) > 10000:
+            last_run.clear()
+        last_run[key] = now
+        club_enrichment_state['pending'] += 1
+    try:
+        club_enrichment_executor.submit(_run_club_enrichment, query)
+    except RuntimeError:
+        # Executor cerrado (apagado de la app)
+        with club_enrichment_lock:
+            club_enrichment_state['pending'] -= 1
+
 @app.route('/clubs')
 def clubs():
     """
     Búsqueda OPTIMIZADA de clubes
-    Prioridad: Cache → Fallback mejorado → API
+    Prioridad: Registro local → API (solo si el registro no tiene resultados)
     """
     try:
         query = request.args.get('q', '').strip()
@@ -3232,151 +3436,43 @@ def clubs():
         if len(query) < 2:
             return jsonify([])
         
-        query_lower = query.lower()
+        # 1. REGISTRO LOCAL - Respuesta inmediata; la API enriquece el registro en segundo plano
+        local_clubs = _search_local_clubs(query, 20)
+        if local_clubs:
+            results = [_registry_club_result(club) for club in local_clubs]
+            results.sort(key=lambda club: club['market_value_raw'], reverse=True)
+            _enrich_clubs_async(query)
+            print(f"⚡ Registro: '{query}' ({len(results)} clubes)")
+            return jsonify(results)
         
-        # 1. CACHE - Verificar si ya buscamos esto
+        # 2. CACHE - Búsquedas que ya fueron a la API
+        query_lower = query.lower()
         cache_key = f"club_{query_lower}"
         if cache_key in cache['autocomplete_clubs']:
             cached_data = cache['autocomplete_clubs'][cache_key]
             cache_time = cached_data.get('time', 0)
-            from datetime import datetime
             if (datetime.now().timestamp() - cache_time) < cache['autocomplete_ttl']:
                 print(f"⚡ CACHE: '{query}' ({len(cached_data['results'])} clubes)")
                 return jsonify(cached_data['results'])
         
-        print(f"🔍 Buscando clubes: '{query}' (Cache → Fallback → API)")
-        
-        # 2. FALLBACK MEJORADO - Obtener resultados locales
-        fallback_results = []
-        try:
-            print(f"   📊 Fallback mejorado...")
-            from scraping.enhanced_clubs_fallback import EnhancedClubsFallback
-            enhanced_fallback = EnhancedClubsFallback()
-            fallback_results = enhanced_fallback.search_clubs(query, 20)
-            print(f"   ✅ Fallback: {len(fallback_results)} clubes")
-        except Exception as e:
-            print(f"   ⚠️ Fallback error: {e}")
-        
-        # 3. API TRANSFERMARKT - Obtener resultados de la API
-        import requests
+        # 3. API TRANSFERMARKT - Solo ante un miss del registro
+        print(f"🌐 Club no encontrado en el registro, consultando API: '{query}'")
+        remote_clubs = _search_clubs_remote(query)
+        if remote_clubs is None:
+            return _get_clubs_fallback(query)
         
-        url = f"https://transfermarkt-api.fly.dev/clubs/search/{query}?page_number=1"
-        headers = {'accept': 'application/json'}
-        
-        print(f"   🌐 API Transfermarkt...")
-        api_clubs = []
-        try:
-            response = requests.get(url, headers=headers, timeout=5)
-            
-            if response.status_code == 200:
-                # Verificar que la respuesta sea JSON antes de parsear
-                try:
-                    data = response.json()
-                except ValueError as json_error:
-                    print(f"❌ Error parseando JSON en clubs API: {json_error}")
-                    print(f"📄 Respuesta recibida: {response.text[:200]}")
-                    data = {}
-                
-                results = data.get('results', [])
-                print(f"   📊 API: {len(results)} clubes")
-                
-                # Procesar y filtrar resultados
-                for club in results:
-                    club_name = club.get('name', '')
-                    country = club.get('country', '')
-                    market_value = club.get('marketValue', 0)
-                    
-                    # Filtrar equipos no relevantes
-                    if _should_filter_club(club_name, country):
-                        continue
-                    
-                    # Formatear valor de mercado (mejorado)
-                    if market_value >= 1000000000:  # >= 1B
-                        market_value_str = f"€{market_value/1000000000:.1f}B"
-                    elif market_value >= 1000000:  # >= 1M
-                        market_value_str = f"€{market_value/1000000:.0f}M"
-                    elif market_value >= 1000:  # >= 1K
-                        market_value_str = f"€{market_value/1000:.0f}K"
-                    else:
-                        market_value_str = f"€{market_value:,.0f}"
-                    
-                    # Calcular factores adicionales
-                    economic_factor = _calculate_club_economic_factor(market_value)
-                    league_factor = _get_league_factor(country)
-                    club_classification = _classify_club(market_value, country)
-                    
-                    api_clubs.append({
-                        'name': club_name,
-                        'country': country,
-                        'market_value': market_value_str,
-                        'market_value_raw': market_value,
-                        'display': f"{club_name} ({country}) - {market_value_str}",
-                        'id': club.get('id', ''),
-                        'url': club.get('url', ''),
-                        'squad': club.get('squad', 0),
-                        'economic_factor': economic_factor,
-                        'league_factor': league_factor,
-                        'classification': club_classification,
-                        'squad_analysis': _analyze_squad_needs(club.get('squad', 0)),
-                        'transfer_potential': _calculate_transfer_potential(market_value, club.get('squad', 0), country)
-                    })
-        except Exception as e:
-            print(f"   ⚠️ API error: {e}")
-        
-        # 4. COMBINAR RESULTADOS - Fallback + API, evitar duplicados
-        combined_results = []
-        seen_clubs = set()
-        
-        # Primero agregar resultados de fallback (priorizados)
-        for club in fallback_results:
-            club_key = club['name'].lower()
-            if club_key not in seen_clubs:
-                seen_clubs.add(club_key)
-                combined_results.append(club)
-        
-        # Luego agregar resultados de API (solo si no están en fallback)
-        for club in api_clubs:
-            club_key = club['name'].lower()
-            if club_key not in seen_clubs:
-                seen_clubs.add(club_key)
-                combined_results.append(club)
-        
-        # Ordenar por valor de mercado (descendente)
-        def get_numeric_market_value(club):
-            """Extraer valor numérico del market value para ordenar"""
-            # Intentar primero market_value_raw (número)
-            raw_value = club.get('market_value_raw')
-            if isinstance(raw_value, (int, float)) and raw_value > 0:
-                return raw_value
-            
-            # Si no, intentar parsear market_value (string)
-            mv_str = club.get('market_value', '€0')
-            try:
-                # Convertir "€39M" a 39000000
-                if 'B' in mv_str:
-                    return float(mv_str.replace('€', '').replace('B', '')) * 1000000000
-                elif 'M' in mv_str:
-                    return float(mv_str.replace('€', '').replace('M', '')) * 1000000
-                elif 'K' in mv_str:
-                    return float(mv_str.replace('€', '').replace('K', '')) * 1000
-                else:
-                    return float(mv_str.replace('€', '').replace(',', ''))
-            except:
-                return 0
-        
-        combined_results.sort(key=get_numeric_market_value, reverse=True)
-        
-        # Limitar a 20 resultados
-        final_results = combined_results[:20]
+        api_clubs = [_remote_club_result(club) for club in remote_clubs
+                     if not _should_filter_club(club.get('name', ''), club.get('country', ''), club.get('id'))]
+        api_clubs.sort(key=lambda club: club['market_value_raw'], reverse=True)
+        final_results = api_clubs[:20]
         
         # Guardar en cache
-        from datetime import datetime
         cache['autocomplete_clubs'][cache_key] = {
             'results': final_results,
             'time': datetime.now().timestamp()
         }
         
-        print(f"   ✅ Total: {len(final_results)} clubes (Fallback: {len(fallback_results)}, API: {len(api_clubs)})")
+        print(f"   ✅ API: {len(final_results)} clubes")
         return jsonify(final_results)
             
     except Exception as e:
@@ -3457,100 +3553,14 @@ def _get_clubs_basic_fallback(query):
         return jsonify([])
 
 def _get_club_market_value(club_name):
-    """Obtener valor de mercado estimado para un club"""
-    club_values = {
-        'Real Madrid': 1200000000,
-        'Barcelona': 1100000000,
-        'Manchester United': 800000000,
-        'Manchester City': 1000000000,
-        'Chelsea': 700000000,
-        'Arsenal': 600000000,
-        'Liverpool': 800000000,
-        'Bayern Munich': 900000000,
-        'PSG': 800000000,
-        'Juventus': 600000000,
-        'AC Milan': 400000000,
-        'Inter Milan': 500000000,
-        'Atletico Madrid': 500000000,
-        'Sevilla': 200000000,
-        'Valencia': 150000000,
-        'AS Roma': 300000000,
-        'Napoli': 400000000,
-        'Borussia Dortmund': 500000000,
-        'RB Leipzig': 300000000,
-        'Monaco': 200000000,
-        'Lyon': 250000000,
-        'Marseille': 200000000,
-        'Tottenham': 600000000,
-        'River Plate': 80000000,
-        'Boca Juniors': 70000000,
-        'Independiente': 50000000,
-        'Racing Club': 45000000,
-        'San Lorenzo': 40000000,
-        'Estudiantes': 35000000,
-        'Newell\'s Old Boys': 30000000,
-        'Rosario Central': 35000000,
-        'Talleres de Córdoba': 38950000,  # €38.95M (valor real Transfermarkt)
-        'CA Talleres': 38950000,  # Alias
-        'Belgrano': 20000000,
-        'Instituto': 15000000,
-        'Colón': 20000000,
-        'Unión': 18000000,
-        'Defensa y Justicia': 22000000,
-        'Nacional': 19600000,  # €19.6M (valor real Transfermarkt)
-        'Club Nacional': 19600000,  # Alias
-        'Peñarol': 35000000
-    }
-    return club_values.get(club_name, 50000000)  # Valor por defecto
+    """Obtener valor de mercado de un club (registro de clubes; 50M si no se conoce)"""
+    return get_club_registry().get_market_value(club_name)
 
 def _get_club_country(club_name):
-    """Obtener país de un club"""
-    club_countries = {
-        'Real Madrid': 'Spain',
-        'Barcelona': 'Spain',
-        'Manchester United': 'England',
-        'Manchester City': 'England',
-        'Chelsea': 'England',
-        'Arsenal': 'England',
-        'Liverpool': 'England',
-        'Bayern Munich': 'Germany',
-        'PSG': 'France',
-        'Juventus': 'Italy',
-        'AC Milan': 'Italy',
-        'Inter Milan': 'Italy',
-        'Atletico Madrid': 'Spain',
-        'Sevilla': 'Spain',
-        'Valencia': 'Spain',
-        'AS Roma': 'Italy',
-        'Napoli': 'Italy',
-        'Borussia Dortmund': 'Germany',
-        'RB Leipzig': 'Germany',
-        'Monaco': 'France',
-        'Lyon': 'France',
-        'Marseille': 'France',
-        'Tottenham': 'England',
-        'River Plate': 'Argentina',
-        'Boca Juniors': 'Argentina',
-        'Independiente': 'Argentina',
-        'Racing Club': 'Argentina',
-        'San Lorenzo': 'Argentina',
-        'Estudiantes': 'Argentina',
-        'Newell\'s Old Boys': 'Argentina',
-        'Rosario Central': 'Argentina',
-        'Talleres de Córdoba': 'Argentina',
-        'CA Talleres': 'Argentina',  # Alias
-        'Belgrano': 'Argentina',
-        'Instituto': 'Argentina',
-        'Colón': 'Argentina',
-        'Unión': 'Argentina',
-        'Defensa y Justicia': 'Argentina',
-        'Nacional': 'Uruguay',
-        'Club Nacional': 'Uruguay',  # Alias
-        'Peñarol': 'Uruguay'
-    }
-    return club_countries.get(club_name, 'Unknown')
+    """Obtener país de un club (registro de clubes; 'Unknown' si no se conoce)"""
+    return get_club_registry().get_country(club_name)
 
-def _should_filter_club(club_name, country):
+def _should_filter_club(club_name, country, club_id=None):
     """Determinar si un club debe ser filtrado"""
     club_lower = club_name.lower()
     country_lower = country.lower()
@@ -3560,113 +3570,39 @@ def _should_filter_club(club_name, country):
         club_lower in ['spain', 'france', 'germany', 'italy', 'england', 'argentina', 'brazil', 'mexico', 'colombia', 'chile', 'ecuador', 'belgium', 'netherlands', 'portugal'] or
         'national' in club_lower or
         'selección' in club_lower or
-        'seleccion' in club_lower or
-        'u19' in club_lower or
-        'u20' in club_lower or
-        'u21' in club_lower or
-        'u23' in club_lower or
-        'youth' in club_lower or
-        'juvenile' in club_lower or
-        'academy' in club_lower):
+        'seleccion' in club_lower):
         return True
     
-    # Filtrar equipos B o reservas
-    if (club_lower.endswith(' b') or 
-        club_lower.endswith(' b)') or
-        ' reserve' in club_lower or
-        ' reserva' in club_lower or
-        ' atletic' in club_lower or
-        ' atlétic' in club_lower):
-        return True
-    
-    return False
+    # Filtrar filiales, reservas y juveniles (índice de team_children.csv por ID o nombre)
+    return get_club_registry().hierarchy.is_lower_team(club_name, club_id)
 
 def _calculate_club_economic_factor(market_value):
     """Calcular factor económico del club basado en su valor de mercado"""
-    if market_value >= 1000000000:  # >1B euros
-        return 1.5  # Clubes elite (Real Madrid, Barcelona, etc.)
-    elif market_value >= 500000000:  # >500M euros
-        return 1.3  # Clubes top (Chelsea, Arsenal, etc.)
-    elif market_value >= 200000000:  # >200M euros
-        return 1.2  # Clubes medianos-grandes
-    elif market_value >= 50000000:   # >50M euros
-        return 1.1  # Clubes medianos
-    else:
-        return 1.0  # Clubes pequeños
+    return economic_factor(market_value)
 
 def _get_league_factor(country):
     """Obtener factor de liga basado en el país"""
-    league_factors = {
-        'Spain': 1.4,      # La Liga - alta competitividad
-        'England': 1.5,    # Premier League - máxima competitividad
-        'Germany': 1.3,    # Bundesliga - alta competitividad
-        'Italy': 1.3,      # Serie A - alta competitividad
-        'France': 1.2,     # Ligue 1 - buena competitividad
-        'Netherlands': 1.2, # Eredivisie
-        'Portugal': 1.1,   # Primeira Liga
-        'Argentina': 1.1,  # Liga Argentina
-        'Brazil': 1.1,     # Brasileirão
-        'Mexico': 1.1,     # Liga MX
-        'Colombia': 1.0,   # Liga Colombiana
-        'Chile': 1.0,      # Liga Chilena
-        'Ecuador': 1.0,    # Liga Ecuatoriana
-    }
-    return league_factors.get(country, 1.0)
+    return league_factor(country)
 
 def _classify_club(market_value, country):
     """Clasificar el club según su valor de mercado"""
-    if market_value >= 1000000000:
-        return "Elite Club"
-    elif market_value >= 500000000:
-        return "Top Club"
-    elif market_value >= 200000000:
-        return "Big Club"
-    elif market_value >= 50000000:
-        return "Medium Club"
-    else:
-        return "Small Club"
-
-def _analyze_squad_needs(squad_size):
-    """Analizar necesidades de la plantilla"""
-    if squad_size < 20:
-        return "Necesita refuerzos"
-    elif squad_size > 30:
-        return "Plantilla completa"
-    else:
-        return "Plantilla equilibrada"
-
-def _calculate_transfer_potential(market_value, squad_size, country):
-    """Calcular el potencial de transferencia del club"""
-    # Factor económico
-    economic_factor = _calculate_club_economic_factor(market_value)
-    
-    # Factor de liga
-    league_factor = _get_league_factor(country)
-    
-    # Factor de plantilla (clubes con plantilla pequeña tienen más necesidad)
-    if squad_size < 20:
-        squad_factor = 1.3  # Alta necesidad
-    elif squad_size > 30:
-        squad_factor = 0.8  # Baja necesidad
-    else:
-        squad_factor = 1.0  # Necesidad normal
-    
-    # Calcular potencial total
-    transfer_potential = economic_factor * league_factor * squad_factor
-    
-    # Clasificar el potencial
-    if transfer_potential >= 2.0:
-        return "Muy Alto"
-    elif transfer_potential >= 1.5:
-        return "Alto"
-    elif transfer_potential >= 1.2:
-        return "Medio-Alto"
-    elif transfer_potential >= 1.0:
-        return "Medio"
-    elif transfer_potential >= 0.8:
-        return "Bajo"
-    else:
-        return "Muy Bajo"
+    return club_class(market_value)
+
+def _build_club_info(name, country, market_value, squad_size, club_id='', url='', factors=None):
+    """Información detallada de un club (formato de /clubs/<club_name>)"""
+    market_value = market_value or 0
+    squad_size = squad_size or 0
+    club_info = {
+        'name': name,
+        'country': country,
+        'market_value': market_value,
+        'squad': squad_size,
+        'id': club_id,
+        'url': url,
+        'formatted_market_value': f"€{market_value/1000000:.0f}M" if market_value >= 1000000 else f"€{market_value/1000:.0f}K"
+    }
+    club_info.update(factors or club_factors(market_value, squad_size, country))
+    return club_info
 
 @app.route('/clubs/<club_name>')
 def get_club_info(club_name):
@@ -3674,59 +3610,34 @@ def get_club_info(club_name):
     try:
         print(f"🔍 Obteniendo información del club: '{club_name}'")
         
-        # Consultar API de Transfermarkt para obtener información del club
-        import requests
-        
-        url = f"https://transfermarkt-api.fly.dev/clubs/search/{club_name}?page_number=1"
-        headers = {'accept': 'application/json'}
-        
-        response = requests.get(url, headers=headers, timeout=5)
-        
-        if response.status_code == 200:
-            # Verificar que la respuesta sea JSON antes de parsear
-            try:
-                data = response.json()
-            except ValueError as json_error:
-                print(f"❌ Error parseando JSON en club info: {json_error}")
-                print(f"📄 Respuesta recibida: {response.text[:200]}")
-                data = {}
-            
-            results = data.get('results', [])
-            
-            # Buscar el club (coincidencia exacta o parcial)
-            club_name_lower = club_name.lower()
-            for club in results:
-                club_api_name = club.get('name', '').lower()
-                if (club_api_name == club_name_lower or 
-                    club_name_lower in club_api_name or 
-                    club_api_name in club_name_lower):
-                    market_value = club.get('marketValue', 0)
-                    country = club.get('country', '')
-                    squad_size = club.get('squad', 0)
-                    
-                    club_info = {
-                        'name': club.get('name', ''),
-                        'country': country,
-                        'market_value': market_value,
-                        'squad': squad_size,
-                        'id': club.get('id', ''),
-                        'url': club.get('url', ''),
-                        'formatted_market_value': f"€{market_value/1000000:.0f}M" if market_value >= 1000000 else f"€{market_value/1000:.0f}K",
-                        'economic_factor': _calculate_club_economic_factor(market_value),
-                        'league_factor': _get_league_factor(country),
-                        'classification': _classify_club(market_value, country),
-                        'squad_analysis': _analyze_squad_needs(squad_size),
-                        'transfer_potential': _calculate_transfer_potential(market_value, squad_size, country)
-                    }
-                    print(f"✅ Información del club encontrada: {club_info['name']}")
-                    return jsonify(club_info)
-            
-            print(f"⚠️ Club no encontrado: {club_name}")
-            return jsonify({"error": "Club not found"}), 404
-            
-        else:
-            print(f"⚠️ Error en API Transfermarkt: {response.status_code}")
+        # 1. Registro local
+        club = get_club_registry().resolve(club_name)
+        if club is not None:
+            club_info = _build_club_info(club.get('name', ''), club.get('country') or '', club.get('market_value'),
+                                         club.get('squad_size'), club.get('id', ''), club.get('url', ''),
+                                         factors=get_club_registry().get_factors(club))
+            print(f"✅ Información del club (registro): {club_info['name']}")
+            return jsonify(club_info)
+        
+        # 2. API de Transfermarkt (solo si el registro no lo conoce; los resultados quedan en el registro)
+        results = _search_clubs_remote(club_name)
+        if results is None:
             return jsonify({"error": "API error"}), 500
+        
+        # Buscar el club (coincidencia exacta o parcial)
+        club_name_lower = club_name.lower()
+        for club in results:
+            club_api_name = club.get('name', '').lower()
+            if (club_api_name == club_name_lower or 
+                club_name_lower in club_api_name or 
+                club_api_name in club_name_lower):
+                club_info = _build_club_info(club.get('name', ''), club.get('country', ''), club.get('marketValue', 0),
+                                             club.get('squad', 0), club.get('id', ''), club.get('url', ''))
+                print(f"✅ Información del club encontrada: {club_info['name']}")
+                return jsonify(club_info)
+        
+        print(f"⚠️ Club no encontrado: {club_name}")
+        return jsonify({"error": "Club not found"}), 404
             
     except Exception as e:
         print(f"❌ Error obteniendo información del club: {e}")
@@ -3764,76 +3675,35 @@ def test_search():
 
 @app.route('/clubs/autocomplete')
 def clubs_autocomplete():
-    """Autocompletado de clubes usando API de Transfermarkt"""
+    """Autocompletado de clubes: registro local y API de Transfermarkt solo ante un miss"""
     query = request.args.get('q', '').strip()
     print(f"🔍 Autocompletado de clubes buscando: '{query}'")
     
     if not query or len(query) < 2:
         return jsonify([])
     
-    # Usar la misma lógica que el endpoint /clubs
+    def to_suggestion(result):
+        return {key: result[key] for key in ('name', 'country', 'market_value', 'display', 'id', 'url', 'squad')}
+    
     try:
+        # 1. Registro local (la API enriquece el registro en segundo plano)
+        local_clubs = _search_local_clubs(query, 10)
+        if local_clubs:
+            suggestions = [_registry_club_result(club) for club in local_clubs]
+            suggestions.sort(key=lambda club: club['market_value_raw'], reverse=True)
+            _enrich_clubs_async(query)
+            print(f"⚡ Registro: {len(suggestions)} clubes encontrados")
+            return jsonify([to_suggestion(club) for club in suggestions])
+        
+        # 2. API de Transfermarkt
         print(f"🌐 Consultando API de Transfermarkt para: '{query}'")
-        import requests
-        
-        url = f"https://transfermarkt-api.fly.dev/clubs/search/{query}?page_number=1"
-        headers = {'accept': 'application/json'}
-        
-        response = requests.get(url, headers=headers, timeout=5)
-        
-        if response.status_code == 200:
-            # Verificar que la respuesta sea JSON antes de parsear
-            try:
-                data = response.json()
-            except ValueError as json_error:
-                print(f"❌ Error parseando JSON en clubs autocomplete (route): {json_error}")
-                print(f"📄 Respuesta recibida: {response.text[:200]}")
-                data = {}
-            
-            results = data.get('results', [])
-            
-            # Procesar y filtrar resultados
-            suggestions = []
-            for club in results:
-                club_name = club.get('name', '')
-                country = club.get('country', '')
-                market_value = club.get('marketValue', 0)
-                
-                # Filtrar equipos no relevantes
-                if _should_filter_club(club_name, country):
-                    continue
-                
-                # Formatear valor de mercado (mejorado)
-                if market_value >= 1000000000:  # >= 1B
-                    market_value_str = f"€{market_value/1000000000:.1f}B"
-                elif market_value >= 1000000:  # >= 1M
-                    market_value_str = f"€{market_value/1000000:.0f}M"
-                elif market_value >= 1000:  # >= 1K
-                    market_value_str = f"€{market_value/1000:.0f}K"
-                else:
-                    market_value_str = f"€{market_value:,.0f}"
-                
-                # Crear sugerencia con información adicional
-                suggestion = {
-                    'name': club_name,
-                    'country': country,
-                    'market_value': market_value_str,
-                    'display': f"{club_name} ({country}) - {market_value_str}",
-                    'id': club.get('id', ''),
-                    'url': club.get('url', ''),
-                    'squad': club.get('squad', 0)
-                }
-                suggestions.append(suggestion)
-                
-                # Limitar a 10 resultados válidos
-                if len(suggestions) >= 10:
-                    break
-            
-            # Ordenar por valor de mercado (descendente)
-            suggestions.sort(key=lambda x: int(x['market_value'].replace('€', '').replace('M', '000000').replace('K', '000').replace('.', '')), reverse=True)
-            
+        remote_clubs = _search_clubs_remote(query)
+        if remote_clubs is not None:
+            suggestions = [_remote_club_result(club) for club in remote_clubs
+                           if not _should_filter_club(club.get('name', ''), club.get('country', ''), club.get('id'))][:10]
+            suggestions.sort(key=lambda club: club['market_value_raw'], reverse=True)
             print(f"✅ API Transfermarkt: {len(suggestions)} clubes encontrados")
-            return jsonify(suggestions)
+            return jsonify([to_suggestion(club) for club in suggestions])
             
     except Exception as e:
         print(f"⚠️ Error en API Transfermarkt: {e}")
@@ -3968,78 +3838,27 @@ def search_player():
         else:
             # Solo buscar en player_profiles si el jugador viene de la BD local
             print(f" Buscando perfil completo para jugador de BD local")
-            # Obtener datos completos del jugador desde player_profiles (con cache)
+            # Obtener datos completos del jugador desde el store de perfiles (indexado por player_id)
             try:
-                cached_profiles = get_cached_data('player_profiles')
-                if cached_profiles is not None:
-                    player_profiles = cached_profiles
-                else:
-                    # Intentar multiples rutas posibles
-                    possible_paths = [
-                        'data/extracted/player_profiles/player_profiles.csv',
-                        'player_profiles.csv',
-                        'data/player_profiles.csv',
-                        'extracted_data/player_profiles.csv'
-                    ]
-                    
-                    player_profiles = None
-                    for path in possible_paths:
-                        try:
-                            if os.path.exists(path):
-                                player_profiles = pd.read_csv(path, low_memory=False)
-                                print(f" Perfil encontrado en: {path}")
-                                break
-                        except Exception as e:
-                            print(f" Error con ruta {path}: {e}")
-                            continue
-                    
-                    if player_profiles is None:
-                        print(f" No se encontro archivo de perfiles, usando datos basicos")
-                        player_profiles = pd.DataFrame()
-                    else:
-                        set_cached_data('player_profiles', player_profiles)
                 player_id = jugador_info.get('player_id')
                 
                 print(f" Buscando perfil completo para player_id: {player_id}")
                 
-                if player_id:
-                    # Buscar datos completos del jugador
-                    complete_profile = player_profiles[player_profiles['player_id'] == player_id]
-                    print(f" Perfil encontrado: {len(complete_profile)} registros")
+                profile_store = get_player_profile_store()
+                if profile_store is None:
+                    print(f" No hay perfiles cargados, usando datos basicos")
+                elif player_id:
+                    profile = profile_store.get(player_id)
                     
-                    if not complete_profile.empty:
-                        profile = complete_profile.iloc[0]
-                        
-                        # Calcular edad
-                        age = "--"
-                        if pd.notna(profile.get('date_of_birth')):
-                            try:
-                                birth_date = pd.to_datetime(profile['date_of_birth'])
-                                today = pd.Timestamp.now()
-                                age = today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
-                                print(f"Calculando edad: {birth_date.date()} -> {age} anos")
-                            except Exception as e:
-                                print(f" Error calculando edad: {e}")
-                                age = "--"
-                        else:
+                    if profile is not None:
+                        if profile['age'] == "--":
                             print(f" Fecha de nacimiento no disponible para {jugador_info['player_name']}")
                         
                         # Completar datos faltantes
-                        jugador_info_dict = jugador_info.to_dict() if hasattr(jugador_info, 'to_dict') else dict(jugador_info)
-                        jugador_info_dict.update({
-                            'age': age,
-                            'height': profile.get('height', '--'),
-                            'weight': '--',  # No disponible en el dataset
-                            'foot': profile.get('foot', '--'),
-                            'contract_expires': profile.get('contract_expires', '--'),
-                            'place_of_birth': profile.get('place_of_birth', '--'),
-                            'player_image_url': profile.get('player_image_url', ''),
-                            'joined': profile.get('joined', '--'),
-                            'outfitter': profile.get('outfitter', '--') if pd.notna(profile.get('outfitter')) else '--'
-                        })
-                        jugador_info = jugador_info_dict
+                        jugador_info = jugador_info.to_dict() if hasattr(jugador_info, 'to_dict') else dict(jugador_info)
+                        jugador_info.update(profile)
                         
-                        print(f" Datos completados para {jugador_info['player_name']}: edad={age}")
+                        print(f" Datos completados para {jugador_info['player_name']}: edad={profile['age']}")
                     else:
                         print(f" No se encontro perfil completo para {jugador_info['player_name']}")
                 else:
@@ -4599,46 +4418,27 @@ def test_model():
 
 @app.route('/dashboard/stats')
 def dashboard_stats():
-    """Obtener estadisticas para el dashboard"""
+    """Obtener estadisticas para el dashboard (lectura del resumen precalculado)"""
     try:
-        global model_data, player_data, club_data
+        summary = dashboard_summary
         
-        # Estadisticas basicas
-        stats = {
-            'total_players': len(player_data) if player_data is not None else 0,
-            'total_clubs': len(club_data) if club_data is not None else 0,
-            'total_transfers': len(model_data) if model_data is not None else 0,
-            'model_accuracy': 95.0,  # Precision del modelo
-            'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M'),
-            'system_status': 'operational'
-        }
+        # Si el resumen es de otro dia, despertar al hilo de refresco y servir el actual
+        if summary['key'] != date.today().isoformat():
+            request_dashboard_refresh()
         
-        # Estadisticas de jugadores por posicion
-        if player_data is not None and not player_data.empty:
-            position_stats = player_data['position'].value_counts().head(5).to_dict()
-            stats['top_positions'] = position_stats
-            
-            # Estadisticas de edad
-            if 'date_of_birth' in player_data.columns:
-                try:
-                    # Calcular edades
-                    today = datetime.now()
-                    player_data['age'] = pd.to_datetime(player_data['date_of_birth'], errors='coerce').apply(
-                        lambda x: (today - x).days // 365 if pd.notna(x) else None
-                    )
-                    avg_age = player_data['age'].mean()
-                    stats['average_age'] = round(avg_age, 1) if pd.notna(avg_age) else 0
-                except:
-                    stats['average_age'] = 0
-        
-        # Estadisticas de clubes por liga
-        if club_data is not None:
-            stats['top_leagues'] = {
-                'La Liga': 20,
-                'Premier League': 20,
-                'Serie A': 20,
-                'Bundesliga': 18,
-                'Ligue 1': 20
+        stats = summary['data']
+        if stats is not None:
+            # Copia: last_updated es la hora de la consulta, como antes del resumen precalculado
+            stats = dict(stats, last_updated=datetime.now().strftime('%Y-%m-%d %H:%M'))
+        else:
+            # Primer arranque: todavia no hay resumen, devolver solo los conteos basicos
+            stats = {
+                'total_players': len(player_data) if player_data is not None else 0,
+                'total_clubs': len(club_data) if club_data is not None else 0,
+                'total_transfers': len(model_data) if model_data is not None else 0,
+                'model_accuracy': 95.0,
+                'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M'),
+                'system_status': 'warming_up'
             }
         
         return jsonify({
@@ -5400,7 +5200,8 @@ def health():
         'model_loaded': model_data is not None,
         'players_count': len(player_data) if player_data is not None else 0,
         'clubs_count': len(club_data) if club_data is not None else 0,
-        'cache_status': 'active' if cache['last_loaded'] is not None else 'inactive'
+        'cache_status': 'active' if cache['last_loaded'] is not None else 'inactive',
+        'encoders': hybrid_model.get_encoder_stats() if hybrid_model is not None else None
     })
 
 @app.route('/report/<player_name>')
@@ -5493,75 +5294,353 @@ def generate_player_report(player_name):
         print(f"Error generando reporte para {player_name}: {str(e)}")
         return jsonify({'error': 'Error generando reporte'}), 500
 
-@app.route('/compare')
+COMPARE_MAX_PLAYERS = 20       # Jugadores por comparación
+COMPARE_MAX_WORKERS = 8        # Búsquedas simultáneas
+COMPARE_DEADLINE_SECONDS = 30  # Tiempo total compartido por todas las búsquedas
+# Pool único para todas las comparaciones: las búsquedas que superan el deadline terminan acá
+# en segundo plano sin sumar hilos por request
+compare_executor = ThreadPoolExecutor(max_workers=COMPARE_MAX_WORKERS, thread_name_prefix='compare-lookup')
+
+def _leer_jugadores_comparacion():
+    """Leer la lista (jugador, club) de la request: JSON, players/clubs o player1/club1, player2/club2..."""
+    payload = request.get_json(silent=True) or {}
+    entries = []
+    
+    if payload.get('players'):
+        for item in payload['players']:
+            if isinstance(item, dict):
+                entries.append((item.get('name', ''), item.get('club', '')))
+            else:
+                entries.append((item, ''))
+    elif request.args.get('players'):
+        names = request.args.get('players', '').split(',')
+        clubs = request.args.get('clubs', '').split(',')
+        entries = [(name, clubs[i] if i < len(clubs) else '') for i, name in enumerate(names)]
+    else:
+        # Formato original: player1, player2, ... con club1, club2, ... opcionales
+        index = 1
+        while request.args.get(f'player{index}'):
+            entries.append((request.args.get(f'player{index}'), request.args.get(f'club{index}', '')))
+            index += 1
+    
+    jugadores = []
+    for name, club in entries:
+        name = sanitize_input(name)
+        if validate_player_name(name)[0]:
+            jugadores.append({'name': name, 'club': sanitize_input(club) or 'Análisis general'})
+    return jugadores[:COMPARE_MAX_PLAYERS]
+
+@app.route('/compare', methods=['GET', 'POST'])
 def compare_players():
-    """Comparar dos jugadores"""
+    """Comparar N jugadores (búsquedas concurrentes con deadline compartido y análisis en lote)"""
     try:
-        player1_name = request.args.get('player1')
-        player2_name = request.args.get('player2')
-        club1 = request.args.get('club1', '')
-        club2 = request.args.get('club2', '')
-        
-        if not player1_name or not player2_name:
-            return jsonify({'error': 'Se requieren ambos jugadores'}), 400
-        
-        # Buscar datos de ambos jugadores usando buscar_jugador_robusto
-        def buscar_jugador_para_comparacion(nombre):
-            """Usar la misma lógica robusta de búsqueda que search_player"""
-            return buscar_jugador_robusto(nombre)
-        
-        jugador1_info = buscar_jugador_para_comparacion(player1_name)
-        jugador2_info = buscar_jugador_para_comparacion(player2_name)
+        jugadores = _leer_jugadores_comparacion()
+        if len(jugadores) < 2:
+            return jsonify({'error': 'Se requieren al menos dos jugadores'}), 400
+        
+        # Buscar todos los jugadores en paralelo con la misma lógica robusta que search_player
+        from concurrent.futures import wait
+        futures = [compare_executor.submit(buscar_jugador_robusto, j['name']) for j in jugadores]
+        done, pending = wait(futures, timeout=COMPARE_DEADLINE_SECONDS)
+        # No esperar a las búsquedas que superaron el deadline (las que no arrancaron se descartan)
+        for future in pending:
+            future.cancel()
+        
+        encontrados, no_encontrados, sin_tiempo = [], [], []
+        for jugador, future in zip(jugadores, futures):
+            if future not in done:
+                sin_tiempo.append(jugador['name'])
+                continue
+            try:
+                info = future.result()
+            except Exception as e:
+                print(f"Error buscando {jugador['name']} para comparación: {e}")
+                info = None
+            if info is None or (hasattr(info, 'empty') and info.empty):
+                no_encontrados.append(jugador['name'])
+                continue
+            info = info.to_dict() if hasattr(info, 'to_dict') else dict(info)
+            encontrados.append((jugador, info))
         
-        if not jugador1_info:
-            return jsonify({'error': f'Jugador 1 ({player1_name}) no encontrado'}), 404
-        if not jugador2_info:
-            return jsonify({'error': f'Jugador 2 ({player2_name}) no encontrado'}), 404
+        if not encontrados:
+            return jsonify({
+                'error': 'Ningún jugador encontrado',
+                'not_found': no_encontrados,
+                'timed_out': sin_tiempo
+            }), 404
         
-        # Realizar análisis de ambos jugadores
-        analisis1 = calcular_precio_perfecto_definitivo(player1_name, club1 if club1 else 'Análisis general', jugador1_info)
-        analisis2 = calcular_precio_perfecto_definitivo(player2_name, club2 if club2 else 'Análisis general', jugador2_info)
+        # Una sola pasada de los modelos para todos los jugadores encontrados
+        analisis = calcular_precios_perfectos_lote([info for _, info in encontrados], [j['club'] for j, _ in encontrados])
         
-        # Calcular comparación
-        precio1 = analisis1.get('fair_price', 0)
-        precio2 = analisis2.get('fair_price', 0)
-        diferencia = abs(precio1 - precio2)
+        filas = []
+        for (jugador, info), analysis in zip(encontrados, analisis):
+            if analysis is None:
+                no_encontrados.append(jugador['name'])
+                continue
+            filas.append({
+                'name': jugador['name'],
+                'club': jugador['club'],
+                'info': info,
+                'analysis': analysis,
+                'fair_price': analysis.get('fair_price', 0),
+                'roi': analysis.get('roi_estimate', {}).get('percentage', 0)
+            })
         
-        mejor_valor = player1_name if precio1 < precio2 else player2_name
-        roi1 = analisis1.get('roi_estimate', {}).get('percentage', 0)
-        roi2 = analisis2.get('roi_estimate', {}).get('percentage', 0)
+        ranking = sorted(filas, key=lambda f: f['roi'], reverse=True)
+        for position, fila in enumerate(ranking, start=1):
+            fila['rank'] = position
         
         comparacion = {
-            'player1': {
-                'info': jugador1_info,
-                'analysis': analisis1
-            },
-            'player2': {
-                'info': jugador2_info,
-                'analysis': analisis2
-            },
-            'comparison': {
-                'price_difference': diferencia,
-                'better_value': mejor_valor,
-                'roi_comparison': {
-                    'player1_roi': roi1,
-                    'player2_roi': roi2,
-                    'better_roi': player1_name if roi1 > roi2 else player2_name
-                },
+            'players': filas,
+            'ranking': [
+                {
+                    'rank': f['rank'],
+                    'name': f['name'],
+                    'club': f['club'],
+                    'fair_price': f['fair_price'],
+                    'roi': f['roi'],
+                    'predicted_future_value': f['analysis'].get('predicted_future_value', 0),
+                    'confidence': f['analysis'].get('confidence', 0),
+                    'club_multiplier': f['analysis'].get('club_multiplier', 1.0)
+                }
+                for f in ranking
+            ],
+            'not_found': no_encontrados,
+            'timed_out': sin_tiempo
+        }
+        
+        if filas:
+            rois = [f['roi'] for f in filas]
+            precios = [f['fair_price'] for f in filas]
+            comparacion['comparison'] = {
+                'price_difference': max(precios) - min(precios),
+                'better_value': min(filas, key=lambda f: f['fair_price'])['name'],
+                'better_roi': ranking[0]['name'],
                 'summary': {
-                    'total_investment': precio1 + precio2,
-                    'average_roi': (roi1 + roi2) / 2,
-                    'risk_assessment': 'Medio' if abs(roi1 - roi2) < 20 else 'Alto'
+                    'total_investment': sum(precios),
+                    'average_roi': sum(rois) / len(rois),
+                    'risk_assessment': 'Medio' if max(rois) - min(rois) < 20 else 'Alto'
                 }
             }
-        }
         
-        return jsonify(comparacion)
+        # Compatibilidad con el formato original de dos jugadores
+        if len(jugadores) == 2 and len(filas) == 2:
+            for index, fila in enumerate(filas, start=1):
+                comparacion[f'player{index}'] = {'info': fila['info'], 'analysis': fila['analysis']}
+            comparacion['comparison']['roi_comparison'] = {
+                'player1_roi': filas[0]['roi'],
+                'player2_roi': filas[1]['roi'],
+                'better_roi': filas[0]['name'] if filas[0]['roi'] > filas[1]['roi'] else filas[1]['name']
+            }
+        
+        return jsonify(clean_dict_for_json(comparacion))
         
     except Exception as e:
         print(f"Error comparando jugadores: {str(e)}")
         return jsonify({'error': 'Error en la comparación'}), 500
 
+# ==================== VALUACIÓN DE PLANTILLAS ====================
+
+SQUAD_BATCH_SIZE = 200        # Jugadores por pasada del modelo híbrido
+SQUAD_MAX_DESTINATIONS = 50   # Clubes de destino por request
+
+def resolver_club_local(club_name):
+    """Resolver un club contra clubs_database.json y team_details.csv (sin scraping)"""
+    club = get_club_registry().resolve(club_name)
+    if club:
+        return {
+            'club_id': club['id'],
+            'name': club['name'],
+            'country': club.get('country'),
+            'market_value': club.get('market_value'),
+            'source': 'clubs_database'
+        }
+    
+    try:
+        teams_data = get_cached_data('teams_data')
+        if teams_data is None:
+            teams_data = pd.read_csv('data/extracted/team_details/team_details.csv', low_memory=False)
+            set_cached_data('teams_data', teams_data)
+        
+        # club_name en team_details trae el id entre parentesis: "CA Talleres (3938)"
+        normalized_names = teams_data['club_name'].map(normalize_club_name)
+        match = teams_data[normalized_names == normalize_club_name(club_name)]
+        if not match.empty:
+            row = match.iloc[0]
+            return {
+                'club_id': str(row['club_id']),
+                'name': clean_player_name(row['club_name']),
+                'country': row.get('country_name'),
+                'market_value': None,
+                'source': 'team_details'
+            }
+    except Exception as e:
+        print(f"⚠️ Error buscando club en team_details: {e}")
+    
+    return None
+
+def obtener_plantilla_local(club):
+    """Obtener la plantilla de un club desde player_profiles en el formato del modelo híbrido"""
+    if player_data is None:
+        initialize_model()
+    if player_data is None or player_data.empty:
+        return []
+    
+    roster = player_data.iloc[0:0]
+    if 'current_club_id' in player_data.columns:
+        club_ids = pd.to_numeric(player_data['current_club_id'], errors='coerce')
+        roster = player_data[club_ids == pd.to_numeric(club['club_id'], errors='coerce')]
+    if roster.empty and 'current_club_name' in player_data.columns:
+        club_names = player_data['current_club_name'].map(normalize_club_name)
+        roster = player_data[club_names == normalize_club_name(club['name'])]
+    if roster.empty:
+        return []
+    
+    # Edades vectorizadas sobre la plantilla (sin escribir en player_data)
+    if 'date_of_birth' in roster.columns:
+        birth_dates = pd.to_datetime(roster['date_of_birth'], errors='coerce')
+        ages = ((pd.Timestamp(date.today()) - birth_dates).dt.days // 365).tolist()
+    else:
+        ages = [None] * len(roster)
+    
+    players = []
+    for row, age in zip(roster.to_dict('records'), ages):
+        height = pd.to_numeric(row.get('height'), errors='coerce')
+        players.append({
+            'player_id': row.get('player_id'),
+            'player_name': row.get('player_name', ''),
+            'age': int(age) if pd.notna(age) else 25,
+            'height': float(height) if pd.notna(height) else 180,
+            'market_value': get_correct_market_value(row.get('player_id')),
+            'position': row.get('position') if pd.notna(row.get('position')) else 'Attack',
+            'nationality': row.get('citizenship') if pd.notna(row.get('citizenship')) else 'Unknown',
+            'foot': row.get('foot') if pd.notna(row.get('foot')) else 'right'
+        })
+    
+    return players
+
+def format_squad_valuation_row(player, destination, hybrid_result, roi_target):
+    """Fila compacta de valuación (jugador x club de destino) para el streaming"""
+    # Mismo ajuste inflacionario y precio para ROI objetivo que format_hybrid_result_for_app
+    max_price = hybrid_result['maximum_price'] * 1.10
+    resale_value = hybrid_result['predicted_future_value']
+    price_for_roi = resale_value / (1 + roi_target / 100.0) if resale_value > 0 else 0
+    
+    return {
+        'type': 'valuation',
+        'player_id': player.get('player_id'),
+        'player_name': player.get('player_name'),
+        'position': player.get('position'),
+        'age': player.get('age'),
+        'market_value': player.get('market_value'),
+        'destination': destination,
+        'club_multiplier': hybrid_result['club_multiplier'],
+        'max_price': max_price,
+        'price_for_roi_target': price_for_roi,
+        'resale_value': resale_value,
+        'roi_percentage': hybrid_result['roi_percentage'],
+        'meets_roi_target': hybrid_result['roi_percentage'] >= roi_target,
+        'confidence': hybrid_result['confidence'],
+        'model_used': hybrid_result['model_used']
+    }
+
+@app.route('/squad/valuation', methods=['GET', 'POST'])
+def squad_valuation():
+    """Valuar la plantilla completa de un club contra varios clubes de destino (NDJSON en streaming)"""
+    try:
+        payload = request.get_json(silent=True) or {}
+        club_name = str(payload.get('club') or request.args.get('club', '')).strip()
+        destinations = payload.get('destinations') or request.args.get('destinations', '')
+        roi_target = payload.get('roi_target') or request.args.get('roi_target', '30')
+        
+        is_valid_club, club_error = validate_club_name(club_name)
+        if not is_valid_club:
+            return jsonify({'error': club_error, 'error_code': 'INVALID_CLUB_NAME', 'status': 'error'}), 400
+        club_name = sanitize_input(club_name)
+        
+        if isinstance(destinations, str):
+            destinations = destinations.split(',')
+        destinations = [sanitize_input(d) for d in destinations if isinstance(d, str) and validate_club_name(d)[0]]
+        destinations = list(dict.fromkeys(destinations))[:SQUAD_MAX_DESTINATIONS]
+        if not destinations:
+            return jsonify({
+                'error': 'Se requiere al menos un club de destino',
+                'error_code': 'MISSING_DESTINATIONS',
+                'status': 'error'
+            }), 400
+        
+        try:
+            roi_target = float(roi_target)
+            if roi_target < 5 or roi_target > 100:
+                roi_target = 30.0
+        except (ValueError, TypeError):
+            roi_target = 30.0
+        
+        club = resolver_club_local(club_name)
+        if club is None:
+            return jsonify({'error': f'Club "{club_name}" no encontrado', 'error_code': 'CLUB_NOT_FOUND', 'status': 'error'}), 404
+        
+        roster = obtener_plantilla_local(club)
+        if not roster:
+            return jsonify({
+                'error': f'No hay plantilla local para "{club["name"]}"',
+                'error_code': 'SQUAD_NOT_FOUND',
+                'status': 'error'
+            }), 404
+        
+        model = hybrid_roi_model_real
+        if model is None:
+            return jsonify({'error': 'Modelo híbrido no disponible', 'error_code': 'MODEL_ERROR', 'status': 'error'}), 503
+        
+        print(f"📋 Valuación de plantilla: {club['name']} ({len(roster)} jugadores) x {len(destinations)} destinos")
+        
+        def generate():
+            yield json.dumps(clean_dict_for_json({
+                'type': 'squad',
+                'club': club,
+                'players': len(roster),
+                'destinations': destinations,
+                'roi_target': roi_target
+            })) + '\n'
+            
+            totals = {d: {'total_max_price': 0.0, 'total_resale_value': 0.0, 'best': None} for d in destinations}
+            
+            for start in range(0, len(roster), SQUAD_BATCH_SIZE):
+                batch = roster[start:start + SQUAD_BATCH_SIZE]
+                
+                # Una pasada de los modelos por lote; los destinos se aplican vectorizados
+                matrix = model.calculate_matrix_analysis(batch, destinations)
+                
+                for i, player in enumerate(batch):
+                    for j, destination in enumerate(destinations):
+                        hybrid_result = model.get_matrix_cell(matrix, i, j)
+                        row = format_squad_valuation_row(player, destination, hybrid_result, roi_target)
+                        summary = totals[destination]
+                        summary['total_max_price'] += row['max_price']
+                        summary['total_resale_value'] += row['resale_value']
+                        if summary['best'] is None or row['roi_percentage'] > summary['best']['roi_percentage']:
+                            summary['best'] = row
+                        yield json.dumps(clean_dict_for_json(row)) + '\n'
+            
+            for destination, summary in totals.items():
+                best = summary['best']
+                yield json.dumps(clean_dict_for_json({
+                    'type': 'destination_summary',
+                    'destination': destination,
+                    'total_max_price': summary['total_max_price'],
+                    'total_resale_value': summary['total_resale_value'],
+                    'best_roi_player': best['player_name'] if best else None,
+                    'best_roi_percentage': best['roi_percentage'] if best else None
+                })) + '\n'
+            
+            yield json.dumps({'type': 'done', 'status': 'success'}) + '\n'
+        
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    
+    except Exception as e:
+        print(f"❌ Error en valuación de plantilla: {e}")
+        return jsonify({'error': f'Error en valuación de plantilla: {str(e)}', 'status': 'error'}), 500
+
 def clean_dict_for_json(data):
     """Limpiar datos para JSON serializable (eliminar NaN, None, numpy types)"""
     # Primero manejar contenedores
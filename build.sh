@@ -98,6 +98,11 @@ if [ ! -f "models/trained/maximum_price_model.pkl" ] || [ ! -s "models/trained/m
     fi
 fi
 
+# Bundles de modelos (manifest + payloads mapeables en memoria) que cargan los predictores.
+# Se regeneran si faltan o si algún .pkl cambió desde que se generaron (sha256 en el manifest)
+echo "📦 Verificando bundles de modelos contra los .pkl..."
+python scripts/training/build_model_bundles.py --if-stale || echo "⚠️ No se pudieron generar los bundles, se usarán los .pkl"
+
 # Verificar que los modelos estén presentes
 echo "📊 Verificando modelos entrenados..."
 if [ -d "models/trained" ]; then
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Pipeline único de descubrimiento de clubes (transfermarkt-api.fly.dev)
+
+Reemplaza a los tres crawlers que se pisaban (fetch_clubs_data.py y fetch_missing_clubs.py
+por competencia, fetch_all_clubs.py por fuerza bruta de IDs). Etapas, en orden:
+
+1. Planteles de competencia (fuente principal): clubes nuevos, que cambiaron de liga o con
+   datos viejos
+2. Clubes con updated_at viejo que no aparecieron en ningún plantel
+3. Huecos de IDs por debajo del último club que no son clubes ni IDs muertos conocidos
+4. IDs nuevos después del último club (hasta N 404s consecutivos)
+
+Todas las etapas comparten el mismo TransfermarktAPIClient (session, rate limit y cache de
+respuestas) y un registro de IDs ya pedidos, así que ningún perfil se pide dos veces.
+
+Uso:
+    python discover_clubs.py [--max-age-days=7] [--competitions=ARG1,MEX1] [--no-gaps] [--no-new-ids]
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from fetch_all_clubs import (ClubsFetcher, BATCH_SIZE, DEFAULT_MAX_AGE_DAYS,
+                             expand_id_ranges, parse_timestamp)
+from utils.transfermarkt_api import current_season_id
+
+# Competencias que siempre se revisan (las que cargaban fetch_clubs_data / fetch_missing_clubs)
+CORE_COMPETITIONS = ['ARG1', 'ARG2', 'URU1', 'URU2', 'CLPD', 'BRC', 'MEX1', 'MEX2']
+
+
+class ClubDiscovery:
+    """Descubrimiento por competencias con fallback a escaneo de IDs solo para los huecos"""
+
+    def __init__(self, fetcher: Optional[ClubsFetcher] = None):
+        self.fetcher = fetcher or ClubsFetcher()
+        self.client = self.fetcher.client
+        self.requested = set()      # IDs de perfil ya pedidos en esta corrida (todas las etapas)
+        self.stage_stats = []       # (etapa, IDs pedidos, requests HTTP, clubes guardados)
+
+    def fetch_profiles(self, club_ids: Iterable[int], existing: Dict, stage: str) -> int:
+        """Pedir perfiles que no se pidieron antes en la corrida; devuelve clubes guardados"""
+        targets = sorted(set(club_ids) - self.requested)
+        self.requested.update(targets)
+        requests_before = self.client.total_requests
+        stored = 0
+
+        for i in range(0, len(targets), BATCH_SIZE):
+            batch_ids = targets[i:i + BATCH_SIZE]
+            results = self.fetcher.fetch_batch(batch_ids)
+            for club_id in batch_ids:
+                status, raw_data = results[club_id]
+                if status == 'ok':
+                    stored += self.fetcher.store_club(club_id, raw_data)
+                elif status == 'not_found' and str(club_id) not in existing:
+                    self.fetcher.not_found_ids.append(club_id)
+                # Error o 404 de un club conocido: se conservan los datos anteriores
+            self.fetcher.save_clubs()
+            print(f"\n📊 {stage}: {min(i + BATCH_SIZE, len(targets))}/{len(targets)} | "
+                  f"{self.client.total_requests} requests | {self.client.cache_hits} hits de cache")
+
+        self.stage_stats.append((stage, len(targets), self.client.total_requests - requests_before, stored))
+        return stored
+
+    def run(self, competitions: Optional[List[str]] = None, max_age_days: Optional[float] = DEFAULT_MAX_AGE_DAYS,
+            include_known_competitions: bool = True, scan_gaps: bool = True, scan_new_ids: bool = True):
+        """
+        Correr el pipeline y exportar clubs_database.json
+
+        Args:
+            competitions: competencias a revisar (por defecto CORE_COMPETITIONS)
+            max_age_days: clubes con updated_at más viejo se vuelven a pedir (None = nunca)
+            include_known_competitions: sumar las ligas de los clubes que ya están en la base
+            scan_gaps: escanear IDs faltantes por debajo del último club conocido
+            scan_new_ids: escanear IDs después del último club conocido
+        """
+        fetcher = self.fetcher
+        fetcher.use_checkpoint = False  # Se puede relanzar: lo ya pedido tiene updated_at nuevo
+        existing, metadata = fetcher.store.load()
+        fetcher.clubs = dict(existing)
+        fetcher.known_dead_ids = expand_id_ranges(metadata.get('dead_id_ranges', []))
+
+        competitions = list(competitions or CORE_COMPETITIONS)
+        if include_known_competitions:
+            known = sorted({club.get('league_id') for club in existing.values() if club.get('league_id')})
+            competitions += [c for c in known if c not in competitions]
+
+        started = time.time()
+        print("🔎 DESCUBRIMIENTO DE CLUBES")
+        print("=" * 70)
+        print(f"📂 Clubes en base: {len(existing)} | IDs muertos conocidos: {len(fetcher.known_dead_ids)}")
+        print(f"🏆 Competencias: {len(competitions)} | Antigüedad máxima: "
+              f"{'sin límite' if max_age_days is None else f'{max_age_days} días'}")
+        print("=" * 70)
+
+        # Clubes con datos viejos (los que no tienen updated_at propio usan el de la base)
+        stale_ids = set()
+        if max_age_days is not None:
+            cutoff = datetime.now() - timedelta(days=max_age_days)
+            fallback = parse_timestamp(metadata.get('updated_at') or metadata.get('generated_at'))
+            for club_id, club in existing.items():
+                updated = parse_timestamp(club.get('updated_at')) or fallback
+                if updated is None or updated < cutoff:
+                    stale_ids.add(int(club_id))
+
+        # 1. Planteles de competencia: altas, cambios de liga y clubes viejos del plantel
+        season_id = current_season_id()
+        roster_targets = set()
+        for competition_id in competitions:
+            members = self.client.competition_clubs(competition_id, season_id)
+            if members is None:
+                print(f"   ⚠️  {competition_id}: plantel no disponible")
+                continue
+            member_ids = {int(club['id']) for club in members}
+            known = {int(club_id) for club_id, club in existing.items() if club.get('league_id') == competition_id}
+            changed = known.symmetric_difference(member_ids)
+            if changed:
+                print(f"   🔀 {competition_id}: {len(changed)} clubes entraron o salieron")
+            roster_targets |= changed | (member_ids & stale_ids)
+        print(f"\n🏆 Etapa 1 - planteles: {len(roster_targets)} clubes a pedir")
+        self.fetch_profiles(roster_targets, existing, 'Planteles')
+
+        # 2. Resto de clubes viejos (salvo IDs muertos)
+        stale_targets = stale_ids - fetcher.known_dead_ids
+        print(f"\n🕰️  Etapa 2 - datos viejos: {len(stale_targets - self.requested)} clubes a pedir")
+        self.fetch_profiles(stale_targets, existing, 'Datos viejos')
+
+        # 3. Huecos de IDs: ni club, ni muerto conocido, ni pedido en esta corrida
+        last_club_id = max((int(club_id) for club_id in fetcher.clubs), default=0)
+        if scan_gaps and last_club_id:
+            gap_ids = (set(range(1, last_club_id)) - {int(club_id) for club_id in fetcher.clubs}
+                       - fetcher.known_dead_ids)
+            print(f"\n🕳️  Etapa 3 - huecos de IDs: {len(gap_ids - self.requested)} IDs a pedir")
+            self.fetch_profiles(gap_ids, existing, 'Huecos')
+
+        # 4. IDs nuevos después del último club
+        if scan_new_ids:
+            requests_before = self.client.total_requests
+            clubs_before = len(fetcher.clubs)
+            fetcher.next_id = last_club_id + 1
+            fetcher.consecutive_404s = 0
+            print(f"\n🔍 Etapa 4 - clubes nuevos desde ID {fetcher.next_id}...")
+            fetcher.scan_ids(started)
+            fetcher.retry_failed_clubs()
+            self.stage_stats.append(('IDs nuevos', fetcher.next_id - last_club_id - 1,
+                                     self.client.total_requests - requests_before,
+                                     len(fetcher.clubs) - clubs_before))
+
+        fetcher.save_clubs(final=True)
+        self.print_summary(existing, started)
+
+    def print_summary(self, existing: Dict, started: float):
+        print("\n" + "=" * 70)
+        print("📊 RESUMEN DEL DESCUBRIMIENTO")
+        print("=" * 70)
+        print(f"   {'etapa':<14} {'IDs':>7} {'requests':>9} {'guardados':>10}")
+        for stage, ids, stage_requests, stored in self.stage_stats:
+            print(f"   {stage:<14} {ids:>7} {stage_requests:>9} {stored:>10}")
+        print(f"\n✅ Clubes: {len(existing)} → {len(self.fetcher.clubs)}")
+        print(f"📡 Requests: {self.client.total_requests} | Hits de cache: {self.client.cache_hits}")
+        print(f"⏱️  Tiempo total: {time.time() - started:.0f}s")
+        print("=" * 70)
+
+
+def main():
+    max_age_days = DEFAULT_MAX_AGE_DAYS
+    competitions = None
+    for arg in sys.argv[1:]:
+        if arg.startswith('--max-age-days='):
+            max_age_days = float(arg.split('=', 1)[1])
+        elif arg.startswith('--competitions='):
+            competitions = [c for c in arg.split('=', 1)[1].split(',') if c]
+
+    discovery = ClubDiscovery()
+    try:
+        discovery.run(competitions=competitions, max_age_days=max_age_days,
+                      include_known_competitions=competitions is None,
+                      scan_gaps='--no-gaps' not in sys.argv, scan_new_ids='--no-new-ids' not in sys.argv)
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Descubrimiento interrumpido: lo ya obtenido quedó guardado")
+        discovery.fetcher.save_clubs(final=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,53 +1,113 @@
 #!/usr/bin/env python3
 """
 Script para obtener TODOS los clubes desde transfermarkt-api.fly.dev
-Recorre todos los IDs y hace reintentos para los que fallan.
+Recorre todos los IDs con un pool acotado de workers (respetando un tope de requests por
+segundo), guarda un checkpoint después de cada lote para poder reanudar un crawl cortado
+y reintenta los errores transitorios con backoff adaptativo. Los clubes se agregan a un
+store append-only (data/clubs_store/) y clubs_database.json se exporta al terminar.
+
+Con --refresh no recorre todo el espacio de IDs: corre el pipeline de descubrimiento de
+discover_clubs.py (planteles de competencia, clubes con datos viejos, huecos de IDs y
+clubes nuevos después del último ID conocido).
+
+Uso:
+    python fetch_all_clubs.py                                   # crawl completo (interactivo)
+    python fetch_all_clubs.py --refresh [--max-age-days=7] [--competitions=ARG1,MEX1]
 """
 
-import requests
 import json
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 import sys
 
+from utils.club_store import ClubStore
+from utils.transfermarkt_api import TransfermarktAPIClient, DEFAULT_WORKERS, DEFAULT_MAX_RPS, MAX_ATTEMPTS
+
+# Crawl concurrente: lotes de IDs sobre el pool de workers del cliente compartido
+BATCH_SIZE = 100                      # IDs por lote (checkpoint al terminar cada lote)
+CHECKPOINT_FILE = 'clubs_crawl_checkpoint.json'
+DATABASE_FILE = 'clubs_database.json'
+CLUB_STORE_DIR = os.path.join('data', 'clubs_store')  # Segmentos JSONL append-only (ver utils/club_store.py)
+DEFAULT_MAX_AGE_DAYS = 7              # Refresh delta: clubes más viejos que esto se vuelven a pedir
+# La API manda el tier de la liga como texto
+TIER_MAPPING = {
+    'First Tier': 1,
+    'Second Tier': 2,
+    'Third Tier': 3,
+    'Fourth Tier': 4
+}
+
+
+def compress_id_ranges(ids) -> List[List[int]]:
+    """[1, 2, 3, 7, 9, 10] -> [[1, 3], [7, 7], [9, 10]]"""
+    ranges = []
+    for club_id in sorted(set(ids)):
+        if ranges and club_id == ranges[-1][1] + 1:
+            ranges[-1][1] = club_id
+        else:
+            ranges.append([club_id, club_id])
+    return ranges
+
+
+def expand_id_ranges(ranges) -> set:
+    return {club_id for start, end in ranges for club_id in range(start, end + 1)}
+
+
+def parse_timestamp(value) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
 class ClubsFetcher:
-    def __init__(self, start_id: int = 1, max_consecutive_404s: int = 50):
-        self.base_url = "https://transfermarkt-api.fly.dev/clubs"
+    def __init__(self, start_id: int = 1, max_consecutive_404s: int = 50,
+                 workers: int = DEFAULT_WORKERS, max_rps: float = DEFAULT_MAX_RPS,
+                 checkpoint_file: str = CHECKPOINT_FILE, client: Optional[TransfermarktAPIClient] = None):
+        # Cliente HTTP compartido (session, rate limit, reintentos y cache de respuestas)
+        self.client = client or TransfermarktAPIClient(workers=workers, max_rps=max_rps)
         self.start_id = start_id
         self.max_consecutive_404s = max_consecutive_404s  # Parar después de N 404s consecutivos
+        self.workers = workers
+        self.checkpoint_file = checkpoint_file
         self.clubs = {}
-        self.failed_ids = {}  # {id: attempt_count}
-        self.not_found_ids = []  # IDs definitivamente no encontrados después de 3 intentos
+        self.failed_ids = {}  # {id: attempt_count} - errores transitorios pendientes de reintento
+        self.not_found_ids = []  # IDs definitivamente no encontrados (404 o 3 intentos fallidos)
         self.consecutive_404s = 0
-        self.total_requests = 0
-        self.successful_requests = 0
-        
-    def fetch_club_profile(self, club_id: int) -> Optional[Dict]:
-        """Obtener perfil de un club por ID"""
-        url = f"{self.base_url}/{club_id}/profile"
+        self.next_id = start_id
+        self.phase = 'scan'  # 'scan' (recorrido de IDs) o 'retry' (fase final de reintentos)
+        self.pending_clubs = {}  # Clubes encontrados que todavía no se agregaron al store
+        self.store = ClubStore(CLUB_STORE_DIR, seed_path=DATABASE_FILE)
+        self.use_checkpoint = True
+        self.known_dead_ids = set()  # IDs muertos de corridas anteriores (metadata dead_id_ranges)
+    
+    @property
+    def total_requests(self) -> int:
+        return self.client.total_requests
+    
+    @total_requests.setter
+    def total_requests(self, value: int):
+        self.client.total_requests = value
+    
+    @property
+    def successful_requests(self) -> int:
+        return self.client.successful_requests
+    
+    @successful_requests.setter
+    def successful_requests(self, value: int):
+        self.client.successful_requests = value
+    
+    def fetch_club_profile(self, club_id: int) -> Tuple[str, Optional[Dict]]:
+        """
+        Obtener perfil de un club por ID (reintentos adaptativos y cache en el cliente)
         
-        try:
-            response = requests.get(url, timeout=10)
-            self.total_requests += 1
-            
-            if response.status_code == 200:
-                self.consecutive_404s = 0  # Reset contador
-                self.successful_requests += 1
-                return response.json()
-            elif response.status_code == 404:
-                self.consecutive_404s += 1
-                return None
-            else:
-                print(f"   ⚠️  ID {club_id}: Status {response.status_code}")
-                return None
-                
-        except requests.exceptions.Timeout:
-            print(f"   ⏱️  ID {club_id}: Timeout")
-            return None
-        except requests.exceptions.RequestException as e:
-            print(f"   ❌ ID {club_id}: Error - {str(e)}")
-            return None
+        Returns:
+            (estado, datos): 'ok' con el JSON, 'not_found' (404) o 'error' tras MAX_ATTEMPTS
+        """
+        return self.client.club_profile(club_id)
     
     def generate_aliases(self, name: str, official_name: str) -> List[str]:
         """Generar aliases automáticamente basados en el nombre"""
@@ -103,12 +163,12 @@ class ClubsFetcher:
             league_id = league_data.get('id', '')
             tier_str = league_data.get('tier', '')
             
-            # Convertir tier a entero
-            tier = None
-            if tier_str:
+            # Convertir tier a entero ("First Tier" -> 1; también acepta el número como texto)
+            tier = TIER_MAPPING.get(str(tier_str).strip()) if tier_str else None
+            if tier is None and tier_str:
                 try:
                     tier = int(tier_str)
-                except:
+                except (ValueError, TypeError):
                     tier = None
             
             # Market value
@@ -159,71 +219,163 @@ class ClubsFetcher:
             print(f"   ❌ Error formateando datos: {e}")
             return None
     
-    def fetch_all_clubs(self):
-        """Obtener todos los clubes desde start_id hasta encontrar muchos 404s consecutivos"""
+    def load_checkpoint(self) -> bool:
+        """Restaurar el estado de un crawl interrumpido (True si había checkpoint)"""
+        try:
+            with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+        
+        self.next_id = checkpoint['next_id']
+        self.phase = checkpoint.get('phase', 'scan')
+        self.start_id = checkpoint.get('start_id', self.start_id)
+        self.consecutive_404s = checkpoint.get('consecutive_404s', 0)
+        self.failed_ids = {int(k): v for k, v in checkpoint.get('failed_ids', {}).items()}
+        self.not_found_ids = checkpoint.get('not_found_ids', [])
+        self.total_requests = checkpoint.get('total_requests', 0)
+        self.successful_requests = checkpoint.get('successful_requests', 0)
+        
+        # Clubes encontrados antes del corte (ya agregados al store)
+        found_ids = set(str(club_id) for club_id in checkpoint.get('found_ids', []))
+        saved_clubs, _ = self.store.load()
+        self.clubs = {club_id: club for club_id, club in saved_clubs.items() if club_id in found_ids}
+        
+        if self.phase == 'retry':
+            print(f"♻️  Checkpoint encontrado: reanudando la fase de reintentos "
+                  f"({len(self.failed_ids)} IDs pendientes)")
+        else:
+            print(f"♻️  Checkpoint encontrado: reanudando desde ID {self.next_id} "
+                  f"({len(self.failed_ids)} IDs pendientes de reintento)")
+        return True
+    
+    def save_checkpoint(self):
+        """Escribir el checkpoint del crawl (atómico: un kill no deja el archivo a medias)"""
+        checkpoint = {
+            'phase': self.phase,
+            'start_id': self.start_id,
+            'next_id': self.next_id,
+            'consecutive_404s': self.consecutive_404s,
+            'failed_ids': {str(k): v for k, v in self.failed_ids.items()},
+            'not_found_ids': self.not_found_ids,
+            'total_requests': self.total_requests,
+            'successful_requests': self.successful_requests,
+            'found_ids': sorted(int(club_id) for club_id in self.clubs),
+            'updated_at': datetime.now().isoformat()
+        }
+        tmp_file = self.checkpoint_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_file, self.checkpoint_file)
+    
+    def clear_checkpoint(self):
+        if os.path.exists(self.checkpoint_file):
+            os.remove(self.checkpoint_file)
+    
+    def fetch_batch(self, club_ids: List[int]) -> Dict[int, Tuple[str, Optional[Dict]]]:
+        """Pedir un lote de IDs con el pool de workers; devuelve {id: (estado, datos)}"""
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self.fetch_club_profile, club_id): club_id for club_id in club_ids}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        return results
+    
+    def store_club(self, club_id: int, raw_data: Dict) -> bool:
+        formatted = self.format_club_data(raw_data)
+        if formatted and formatted.get('name'):
+            formatted['updated_at'] = datetime.now().isoformat()
+            self.clubs[str(club_id)] = formatted
+            self.pending_clubs[str(club_id)] = formatted
+            print(f"   ✅ ID {club_id}: {formatted['name']} ({formatted.get('country', 'N/A')})")
+            return True
+        print(f"   ⚠️  ID {club_id}: Datos inválidos")
+        return False
+    
+    def fetch_all_clubs(self, fresh: bool = False):
+        """
+        Obtener todos los clubes desde start_id hasta encontrar muchos 404s consecutivos
+        
+        fresh=True (crawl nuevo desde el ID 1) arma la base de cero: los clubes que ya no
+        existen desaparecen del export. Si no, lo encontrado se mergea con la base actual.
+        """
+        if fresh:
+            self.store.reset()
+        
         print("🚀 INICIANDO OBTENCIÓN MASIVA DE CLUBES")
         print("=" * 70)
-        print(f"🔗 Endpoint: {self.base_url}")
-        print(f"📍 Desde ID: {self.start_id}")
+        print(f"🔗 Endpoint: {self.client.base_url}/clubs")
+        print(f"📍 Desde ID: {self.next_id}")
         print(f"🛑 Parar después de {self.max_consecutive_404s} 404s consecutivos")
-        print(f"🔄 Reintentos: 3 por cada ID fallido")
+        print(f"⚡ Workers: {self.workers} | Máximo {self.client.rate_limiter.max_rps:.0f} requests/s")
+        print(f"🔄 Reintentos: {MAX_ATTEMPTS} por ID ante errores transitorios (backoff adaptativo)")
+        print(f"💾 Checkpoint: {self.checkpoint_file} (cada {BATCH_SIZE} IDs)")
         print("=" * 70)
         
-        current_id = self.start_id
-        clubs_found_this_batch = 0
-        save_interval = 50  # Guardar cada 50 clubes encontrados
-        
-        while self.consecutive_404s < self.max_consecutive_404s:
-            # Mostrar progreso
-            if current_id % 10 == 0:
-                print(f"\n📊 Progreso: ID {current_id} | Encontrados: {len(self.clubs)} | "
-                      f"404s consecutivos: {self.consecutive_404s}/{self.max_consecutive_404s}")
-            
-            # Intentar obtener club
-            print(f"🔍 ID {current_id}...", end=" ")
-            raw_data = self.fetch_club_profile(current_id)
-            
-            if raw_data:
-                # Formatear y guardar
-                formatted = self.format_club_data(raw_data)
-                if formatted and formatted.get('name'):
-                    self.clubs[str(current_id)] = formatted
-                    clubs_found_this_batch += 1
-                    print(f"✅ {formatted['name']} ({formatted.get('country', 'N/A')})")
-                    
-                    # Guardar incrementalmente
-                    if clubs_found_this_batch >= save_interval:
-                        self.save_clubs(incremental=True)
-                        clubs_found_this_batch = 0
-                else:
-                    print(f"⚠️  Datos inválidos")
-            else:
-                print(f"❌ No encontrado")
-                # Registrar para reintentos
-                self.failed_ids[current_id] = 1
-            
-            current_id += 1
-            
-            # Rate limiting (evitar sobrecargar la API)
-            time.sleep(0.1)  # 100ms entre requests
+        started = time.time()
         
-        print(f"\n\n🛑 Alcanzado límite de 404s consecutivos ({self.max_consecutive_404s})")
-        print(f"📍 Último ID intentado: {current_id - 1}")
+        # Un crawl reanudado en la fase de reintentos ya terminó el recorrido de IDs
+        if self.phase == 'scan':
+            self.scan_ids(started)
         
-        # Guardar antes de reintentos
-        self.save_clubs(incremental=True)
+        if self.phase == 'scan':
+            print(f"\n\n🛑 Alcanzado límite de 404s consecutivos ({self.max_consecutive_404s})")
+            print(f"📍 Último ID intentado: {self.next_id - 1}")
+            self.phase = 'retry'
+            self.save_checkpoint()
         
         # Fase de reintentos
         self.retry_failed_clubs()
         
         # Guardar final
         self.save_clubs(final=True)
+        self.clear_checkpoint()
+        
+        print(f"⏱️  Tiempo total: {time.time() - started:.0f}s")
         
         # Mostrar estadísticas
         self.print_statistics()
     
+    def scan_ids(self, started: float):
+        """Recorrer IDs desde next_id por lotes hasta N 404s consecutivos"""
+        while self.consecutive_404s < self.max_consecutive_404s:
+            batch_ids = list(range(self.next_id, self.next_id + BATCH_SIZE))
+            results = self.fetch_batch(batch_ids)
+            
+            # Procesar en orden de ID: el corte por 404s consecutivos es el mismo que en serie
+            last_processed = self.next_id - 1
+            for club_id in batch_ids:
+                status, raw_data = results[club_id]
+                last_processed = club_id
+                
+                if status == 'ok':
+                    self.consecutive_404s = 0  # Reset contador
+                    if not self.store_club(club_id, raw_data):
+                        self.failed_ids[club_id] = MAX_ATTEMPTS
+                elif status == 'not_found':
+                    self.consecutive_404s += 1
+                    self.not_found_ids.append(club_id)
+                    if self.consecutive_404s >= self.max_consecutive_404s:
+                        break
+                else:
+                    # Error transitorio que agotó los intentos: se reintenta al final
+                    self.failed_ids[club_id] = MAX_ATTEMPTS
+            
+            self.next_id = last_processed + 1
+            
+            # Clubes primero y checkpoint después: al reanudar nunca falta un club ya contado
+            self.save_clubs()
+            if self.use_checkpoint:
+                self.save_checkpoint()
+            
+            elapsed = time.time() - started
+            print(f"\n📊 Progreso: ID {self.next_id - 1} | Encontrados: {len(self.clubs)} | "
+                  f"404s consecutivos: {self.consecutive_404s}/{self.max_consecutive_404s} | "
+                  f"{self.total_requests} requests | {self.client.rate_limiter.rate:.1f} req/s | {elapsed:.0f}s")
+        
+    
     def retry_failed_clubs(self):
-        """Reintentar clubes que fallaron, hasta 3 intentos cada uno"""
+        """Reintentar los IDs con errores transitorios (en paralelo, con la tasa ya adaptada)"""
         if not self.failed_ids:
             print("\n✅ No hay clubes para reintentar")
             return
@@ -233,90 +385,69 @@ class ClubsFetcher:
         print(f"🎯 Total IDs a reintentar: {len(self.failed_ids)}")
         print("=" * 70)
         
-        failed_ids_list = list(self.failed_ids.keys())
-        
-        for club_id in failed_ids_list:
-            attempts = self.failed_ids[club_id]
+        retry_ids = sorted(self.failed_ids)
+        for i in range(0, len(retry_ids), BATCH_SIZE):
+            batch_ids = retry_ids[i:i + BATCH_SIZE]
+            results = self.fetch_batch(batch_ids)
             
-            while attempts < 3:
-                attempts += 1
-                print(f"🔄 Reintento {attempts}/3 para ID {club_id}...", end=" ")
-                
-                raw_data = self.fetch_club_profile(club_id)
-                
-                if raw_data:
-                    formatted = self.format_club_data(raw_data)
-                    if formatted and formatted.get('name'):
-                        self.clubs[str(club_id)] = formatted
-                        print(f"✅ {formatted['name']} ({formatted.get('country', 'N/A')})")
-                        del self.failed_ids[club_id]
-                        break
-                    else:
-                        print(f"⚠️  Datos inválidos")
+            for club_id in batch_ids:
+                status, raw_data = results[club_id]
+                if status == 'ok' and self.store_club(club_id, raw_data):
+                    del self.failed_ids[club_id]
                 else:
-                    print(f"❌ Intento {attempts} fallido")
-                
-                self.failed_ids[club_id] = attempts
-                time.sleep(0.5)  # Esperar más entre reintentos
+                    del self.failed_ids[club_id]
+                    self.not_found_ids.append(club_id)
+                    print(f"   ❌ ID {club_id} no encontrado después de {MAX_ATTEMPTS * 2} intentos")
             
-            # Si llegó a 3 intentos y sigue fallando
-            if club_id in self.failed_ids and self.failed_ids[club_id] >= 3:
-                self.not_found_ids.append(club_id)
-                print(f"   ❌ ID {club_id} no encontrado después de 3 intentos")
+            self.save_clubs()
+            if self.use_checkpoint:
+                self.save_checkpoint()
         
         print(f"\n✅ Reintentos completados")
     
-    def save_clubs(self, incremental=False, final=False):
-        """Guardar clubes en archivo JSON"""
-        if not self.clubs:
-            return
+    def save_clubs(self, final=False):
+        """
+        Agregar los clubes nuevos al store append-only (solo escribe esas líneas).
+        Con final=True además exporta clubs_database.json y compacta los segmentos.
+        """
+        if self.pending_clubs:
+            self.store.append_clubs(self.pending_clubs)
+            print(f"💾 Store: +{len(self.pending_clubs)} clubes")
+            self.pending_clubs = {}
         
-        filename = 'clubs_database.json'
+        if final:
+            self.export_database()
+    
+    def export_database(self):
+        """Exportar el store a clubs_database.json (formato que lee la app) y compactarlo"""
+        all_clubs, stored_metadata = self.store.load()
+        if not all_clubs:
+            return
         
-        # Cargar datos existentes si es incremental
-        existing_data = {}
-        if incremental:
-            try:
-                with open(filename, 'r', encoding='utf-8') as f:
-                    existing_data = json.load(f)
-            except FileNotFoundError:
-                existing_data = {
-                    'metadata': {
-                        'generated_at': datetime.now().isoformat(),
-                        'total_clubs': 0
-                    },
-                    'clubs': {}
-                }
+        # IDs muertos (404) por debajo del último club: el refresh delta no los vuelve a pedir.
+        # Los 404 posteriores al último club no cuentan, ahí aparecen los clubes nuevos.
+        last_club_id = max((int(club_id) for club_id in all_clubs), default=0)
+        dead_ids = {club_id for club_id in self.known_dead_ids | set(self.not_found_ids)
+                    if club_id < last_club_id and str(club_id) not in all_clubs}
         
-        # Preparar metadata
         metadata = {
-            'generated_at': existing_data.get('metadata', {}).get('generated_at', datetime.now().isoformat()),
+            'generated_at': stored_metadata.get('generated_at', datetime.now().isoformat()),
             'updated_at': datetime.now().isoformat(),
-            'total_clubs': len(self.clubs),
+            'total_clubs': len(all_clubs),
             'source': 'transfermarkt-api.fly.dev',
+            'last_club_id': last_club_id,
+            'dead_id_ranges': compress_id_ranges(dead_ids),
             'stats': {
                 'total_requests': self.total_requests,
                 'successful_requests': self.successful_requests,
-                'failed_ids_count': len(self.not_found_ids)
+                'failed_ids_count': len(dead_ids)
             }
         }
+        self.store.update_metadata(metadata)
+        self.store.export_json(DATABASE_FILE)
+        self.store.compact()
         
-        # Combinar clubs existentes con nuevos
-        all_clubs = existing_data.get('clubs', {})
-        all_clubs.update(self.clubs)
-        metadata['total_clubs'] = len(all_clubs)
-        
-        data = {
-            'metadata': metadata,
-            'clubs': all_clubs
-        }
-        
-        # Guardar
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        
-        status = "💾 GUARDADO FINAL" if final else "💾 Guardado incremental"
-        print(f"\n{status}: {len(all_clubs)} clubes en {filename}")
+        print(f"\n💾 GUARDADO FINAL: {len(all_clubs)} clubes en {DATABASE_FILE}")
     
     def print_statistics(self):
         """Mostrar estadísticas finales"""
@@ -351,7 +482,7 @@ class ClubsFetcher:
         
         print("=" * 70)
         print("✅ Proceso completado!")
-        print(f"💾 Datos guardados en: clubs_database.json")
+        print(f"💾 Datos guardados en: {CLUB_STORE_DIR} (export: {DATABASE_FILE})")
         print("=" * 70)
 
 
@@ -361,13 +492,42 @@ def main():
     print("🏆 FETCHER DE CLUBES - TRANSFERMARKT API")
     print("=" * 70)
     
-    # Preguntar desde qué ID empezar
-    try:
-        start_input = input("\n📍 ID inicial (Enter para empezar desde 1): ").strip()
-        start_id = int(start_input) if start_input else 1
-    except ValueError:
-        print("⚠️  ID inválido, usando 1")
-        start_id = 1
+    # Refresh delta (no interactivo, pensado para correr de noche)
+    if '--refresh' in sys.argv:
+        max_age_days = DEFAULT_MAX_AGE_DAYS
+        competitions = None
+        for arg in sys.argv[1:]:
+            if arg.startswith('--max-age-days='):
+                max_age_days = float(arg.split('=', 1)[1])
+            elif arg.startswith('--competitions='):
+                competitions = [c for c in arg.split('=', 1)[1].split(',') if c]
+        
+        from discover_clubs import ClubDiscovery
+        
+        fetcher = ClubsFetcher()
+        try:
+            ClubDiscovery(fetcher).run(competitions=competitions, max_age_days=max_age_days,
+                                       include_known_competitions=competitions is None)
+        except KeyboardInterrupt:
+            print("\n\n⚠️  Refresh interrumpido: lo ya refrescado quedó guardado")
+            fetcher.save_clubs(final=True)
+        return
+    
+    # Reanudar un crawl cortado si quedó checkpoint
+    resume = False
+    if os.path.exists(CHECKPOINT_FILE):
+        resume_input = input(f"\n♻️  Hay un crawl sin terminar ({CHECKPOINT_FILE}). ¿Reanudar? (s/n, Enter = s): ").strip().lower()
+        resume = resume_input in ('', 's')
+    
+    start_id = 1
+    if not resume:
+        # Preguntar desde qué ID empezar
+        try:
+            start_input = input("\n📍 ID inicial (Enter para empezar desde 1): ").strip()
+            start_id = int(start_input) if start_input else 1
+        except ValueError:
+            print("⚠️  ID inválido, usando 1")
+            start_id = 1
     
     # Preguntar cuántos 404s consecutivos antes de parar
     try:
@@ -377,33 +537,47 @@ def main():
         print("⚠️  Valor inválido, usando 50")
         max_404s = 50
     
+    # Preguntar cuántos workers usar
+    try:
+        workers_input = input(f"⚡ Workers concurrentes (Enter para {DEFAULT_WORKERS}): ").strip()
+        workers = max(1, int(workers_input)) if workers_input else DEFAULT_WORKERS
+    except ValueError:
+        print(f"⚠️  Valor inválido, usando {DEFAULT_WORKERS}")
+        workers = DEFAULT_WORKERS
+    
+    # Iniciar fetcher
+    fetcher = ClubsFetcher(start_id=start_id, max_consecutive_404s=max_404s, workers=workers)
+    if resume and not fetcher.load_checkpoint():
+        print("⚠️  Checkpoint ilegible, empezando desde 1")
+        fetcher.clear_checkpoint()
+    
     # Confirmación
     print(f"\n✅ Configuración:")
-    print(f"   - ID inicial: {start_id}")
+    print(f"   - ID inicial: {fetcher.next_id}{' (reanudado)' if resume else ''}")
     print(f"   - Parar después de: {max_404s} 404s consecutivos")
-    print(f"   - Reintentos por ID: 3")
-    print(f"   - Guardado incremental: cada 50 clubes")
+    print(f"   - Workers: {workers} (máximo {DEFAULT_MAX_RPS:.0f} requests/s)")
+    print(f"   - Reintentos por ID: {MAX_ATTEMPTS} con backoff + fase final de reintentos")
+    print(f"   - Checkpoint: cada {BATCH_SIZE} IDs")
     
     confirm = input("\n¿Continuar? (s/n): ").strip().lower()
     if confirm != 's':
         print("❌ Cancelado")
         return
     
-    # Iniciar fetcher
-    fetcher = ClubsFetcher(start_id=start_id, max_consecutive_404s=max_404s)
-    
     try:
-        fetcher.fetch_all_clubs()
+        # Crawl nuevo desde el ID 1: reemplaza la base; si no, mergea con lo que hay
+        fetcher.fetch_all_clubs(fresh=(not resume and start_id == 1))
     except KeyboardInterrupt:
+        # Lo encontrado queda en el store y el checkpoint del último lote permite reanudar;
+        # clubs_database.json no se toca hasta que el crawl termine
         print("\n\n⚠️  Proceso interrumpido por el usuario")
-        fetcher.save_clubs(final=True)
+        print(f"♻️  Se puede reanudar desde ID {fetcher.next_id} ({CHECKPOINT_FILE})")
+        fetcher.save_clubs()
         fetcher.print_statistics()
     except Exception as e:
         print(f"\n\n❌ Error inesperado: {e}")
-        fetcher.save_clubs(final=True)
+        fetcher.save_clubs()
         fetcher.print_statistics()
 
-
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Encoder Tables 2025 - LabelEncoders compilados a tablas dict
+
+Los predictores codificaban posición y nacionalidad con LabelEncoder.transform por jugador
+(validación de sklearn + búsqueda en classes_) y mandaban cualquier valor desconocido a 0
+sin dejar rastro. Acá cada encoder se convierte una sola vez en diccionarios:
+valor exacto -> código, valor normalizado (sin tildes, minúsculas, espacios colapsados)
+-> código y, opcionalmente, grupo de posición ("Attack - Centre-Forward" -> "Attack"). Lo que
+no aparece cae en un bucket explícito de desconocidos y se cuenta.
+
+El fallback por grupo viene apagado: cambia la predicción de subposiciones que antes iban al
+código de desconocidos ("Defender - Sweeper" pasaría a codificarse como "Defender").
+"""
+
+import re
+import threading
+import unicodedata
+from collections import Counter
+
+# Clase que usa el entrenamiento para valores faltantes (fillna('Unknown'))
+UNKNOWN_LABEL = 'Unknown'
+# Código legacy para desconocidos cuando el encoder no tiene clase 'Unknown'
+LEGACY_UNKNOWN_CODE = 0
+# Valores desconocidos distintos que se guardan para diagnóstico
+MAX_TRACKED_UNKNOWNS = 200
+
+
+def normalize_label(value) -> str:
+    """Clave normalizada: sin tildes, casefold y sin signos ni espacios repetidos"""
+    if value is None:
+        return ''
+    text = unicodedata.normalize('NFD', str(value))
+    text = ''.join(c for c in text if unicodedata.category(c) != 'Mn')
+    text = re.sub(r'[^\w]+', ' ', text.casefold())
+    return text.strip()
+
+
+class EncoderLookup:
+    """Tabla de códigos de un LabelEncoder con normalización y bucket de desconocidos"""
+
+    def __init__(self, encoder, name='', group_fallback=False):
+        self.name = name
+        self.group_fallback = group_fallback
+        classes = [str(c) for c in encoder.classes_]
+
+        self.exact = {label: code for code, label in enumerate(classes)}
+        self.normalized = {}
+        self.groups = {}
+        for code, label in enumerate(classes):
+            self.normalized.setdefault(normalize_label(label), code)
+            if not group_fallback:
+                continue
+            # Grupo principal ("Attack - Left Winger" -> "attack") para subposiciones no vistas
+            group = normalize_label(label.split(' - ')[0])
+            if ' - ' not in label:
+                self.groups[group] = code
+            else:
+                self.groups.setdefault(group, code)
+
+        self.unknown_code = self.exact.get(UNKNOWN_LABEL, LEGACY_UNKNOWN_CODE)
+        self.unknown_hits = 0
+        self.lookups = 0
+        self.unknown_values = Counter()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.exact)
+
+    def encode(self, value) -> int:
+        """Código de un valor (exacto -> normalizado -> grupo si está habilitado -> desconocido)"""
+        code = self.exact.get(value)
+        if code is None:
+            key = normalize_label(value)
+            code = self.normalized.get(key)
+            if code is None and self.group_fallback and value is not None:
+                code = self.groups.get(normalize_label(str(value).split(' - ')[0]))
+
+        with self._lock:
+            self.lookups += 1
+            if code is not None:
+                return code
+            self._record_unknown(key)
+        return self.unknown_code
+
+    def _record_unknown(self, key):
+        """Contar un desconocido (llamar con _lock tomado)"""
+        self.unknown_hits += 1
+        if key in self.unknown_values or len(self.unknown_values) < MAX_TRACKED_UNKNOWNS:
+            self.unknown_values[key] += 1
+
+    def stats(self, top=10) -> dict:
+        """Contadores para /health"""
+        with self._lock:
+            return {
+                'classes': len(self.exact),
+                'lookups': self.lookups,
+                'unknown_hits': self.unknown_hits,
+                'unknown_code': self.unknown_code,
+                'top_unknown': self.unknown_values.most_common(top),
+            }
+
+
+def build_lookup(encoder, name='', group_fallback=False):
+    """EncoderLookup de un encoder cargado (None si el encoder no está disponible)"""
+    if encoder is None or not hasattr(encoder, 'classes_'):
+        return None
+    return EncoderLookup(encoder, name, group_fallback=group_fallback)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Feature Store 2025 - Registro canónico de features por jugador
+
+ValueChange (19 features) y MaximumPrice (14 features) parseaban cada uno la edad, el pie
+y las transformaciones de market_value (sqrt, log, polinomios) a partir del mismo dict de
+jugador. Acá esa parte común se calcula una sola vez en un PlayerFeatures; cada predictor
+arma su fila tomando de ese registro y solo agrega lo que depende de sus propios encoders.
+
+Un FeatureStore vive lo que dura un request (lo crea HybridROIModel2025) y cachea el
+registro por jugador, así ambos modelos ven exactamente los mismos inputs.
+"""
+
+import numpy as np
+
+# Campos crudos del jugador que determinan las features (y sus defaults históricos)
+RAW_FIELDS = (
+    ('age', 25),
+    ('height', 180),
+    ('market_value', 1000000),
+    ('position', 'Attack'),
+    ('nationality', 'Unknown'),
+    ('foot', 'right'),
+)
+
+FOOT_CODES = {'right': 1, 'left': 0, 'both': 2}
+
+
+def parse_age(age):
+    """Edad entera (25 si falta o no es numérica)"""
+    try:
+        return int(float(age)) if age != "--" and age is not None else 25
+    except (ValueError, TypeError):
+        return 25
+
+
+def encode_foot(foot):
+    """Pie como código (acepta booleano o string)"""
+    if isinstance(foot, bool):
+        foot_str = 'right' if foot else 'left'
+    else:
+        foot_str = str(foot).lower() if foot else 'right'
+    return FOOT_CODES.get(foot_str, 1)
+
+
+class PlayerFeatures:
+    """Features de un jugador que no dependen del modelo"""
+
+    def __init__(self, player_data):
+        self.age = parse_age(player_data.get('age', 25))
+        self.height = player_data.get('height', 180)
+        self.market_value = player_data.get('market_value', 1000000)
+        self.position = player_data.get('position', 'Attack')
+        self.nationality = player_data.get('nationality', 'Unknown')
+        self.foot_encoded = encode_foot(player_data.get('foot', 'right'))
+
+        age, height, market_value = self.age, self.height, self.market_value
+        self.sqrt_value = np.sqrt(market_value)
+        self.log_value = np.log1p(market_value)
+        self.value_millions = market_value / 1000000
+        self.age_squared = age ** 2
+        self.age_cubed = age ** 3
+        self.height_normalized = height / 100.0
+        self.age_value_interaction = age * market_value / 1000000
+        self.height_age_interaction = height * age
+        self.is_young = 1 if age < 23 else 0
+        self.is_veteran = 1 if age >= 30 else 0
+        self.is_prime = 1 if (age >= 23 and age < 30) else 0
+
+        # (tabla de posición, tabla de nacionalidad) -> (códigos); cada predictor tiene sus encoders
+        self._codes = {}
+
+    def encoded(self, position_lookup, nationality_lookup):
+        """Códigos de posición y nacionalidad según las tablas de un predictor (cacheados)"""
+        key = (position_lookup, nationality_lookup)
+        codes = self._codes.get(key)
+        if codes is None:
+            codes = (position_lookup.encode(self.position), nationality_lookup.encode(self.nationality))
+            self._codes[key] = codes
+        return codes
+
+
+class FeatureStore:
+    """Cache de PlayerFeatures para un request (clave: campos crudos del jugador)"""
+
+    def __init__(self):
+        self._records = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, player_data):
+        key = tuple(player_data.get(field, default) for field, default in RAW_FIELDS)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def get(self, player_data):
+        """Registro canónico del jugador (se calcula la primera vez que se pide)"""
+        key = self._key(player_data)
+        if key is None:
+            return PlayerFeatures(player_data)
+
+        record = self._records.get(key)
+        if record is not None:
+            self.hits += 1
+            return record
+
+        self.misses += 1
+        record = PlayerFeatures(player_data)
+        self._records[key] = record
+        return record
+
+    def __len__(self):
+        return len(self._records)
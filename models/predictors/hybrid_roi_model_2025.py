@@ -5,6 +5,7 @@ HybridROIModel 2025 - Combina los modelos modernos 2025
 
 import sys
 import os
+import numpy as np
 
 # Agregar directorio raíz del proyecto al path
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -12,6 +13,8 @@ sys.path.insert(0, project_root)
 
 from models.predictors.value_change_predictor_2025 import ValueChangePredictor2025
 from models.predictors.maximum_price_predictor_2025 import MaximumPricePredictor2025
+from models.predictors.feature_store import FeatureStore
+from utils.club_registry import get_club_registry
 
 class HybridROIModel2025:
     """Modelo híbrido que combina ValueChange y MaximumPrice (versión 2025)"""
@@ -22,44 +25,153 @@ class HybridROIModel2025:
         self.maximum_price_predictor = MaximumPricePredictor2025()
         print("✅ HybridROIModel 2025 listo\n")
     
+    def get_encoder_stats(self):
+        """Contadores de lookups y desconocidos de los encoders de ambos predictores"""
+        return {
+            'value_change': self.value_change_predictor.encoder_stats(),
+            'maximum_price': self.maximum_price_predictor.encoder_stats(),
+        }
+    
     def _get_club_multiplier(self, club_name):
-        """Obtener multiplicador según el club de destino"""
+        """Obtener multiplicador según el club de destino (tier por valor de mercado)"""
         if not club_name:
             return 1.0
         
-        club_lower = club_name.lower()
+        try:
+            return get_club_registry().get_tier_multiplier(club_name)
+        except Exception as e:
+            print(f"⚠️ Registro de clubes no disponible: {e}")
+            return 1.0
+    
+    def _combine_results(self, value_result, price_result, club_multiplier):
+        """Combinar las predicciones de ambos modelos aplicando el multiplicador del club"""
+        # El club multiplier se aplica a AMBOS lados de la ecuación (precio y valor futuro)
+        maximum_price = price_result['maximum_price'] * club_multiplier
+        predicted_future_value = value_result['maximum_price'] * club_multiplier
+        
+        # ROI = (ganancia / inversión) × 100
+        if maximum_price > 0:
+            roi_percentage = ((predicted_future_value - maximum_price) / maximum_price) * 100
+        else:
+            roi_percentage = 0
+        
+        return {
+            'maximum_price': maximum_price,
+            'predicted_future_value': predicted_future_value,
+            'predicted_change_percentage': value_result['predicted_change_percentage'],
+            'roi_percentage': roi_percentage,
+            'five_values': price_result['five_values'],
+            'success_rate': price_result['success_rate'],
+            'club_multiplier': club_multiplier,
+            'confidence': (value_result['confidence'] * 0.4 + price_result['confidence'] * 0.6),
+            'model_used': 'Hybrid ROI Model 2025'
+        }
+    
+    def calculate_batch_analysis(self, players, club_data=None):
+        """
+        Calcula el análisis híbrido de varios jugadores con una sola pasada de cada modelo
+        
+        Args:
+            players: lista de dicts de jugador (mismo formato que calculate_hybrid_analysis)
+            club_data: dict con el club de destino común, o lista con un club por jugador
+        
+        Returns:
+            list de dicts con el mismo formato que calculate_hybrid_analysis (mismo orden que players)
+        """
+        if not players:
+            return []
+        
+        if isinstance(club_data, (list, tuple)):
+            clubs = list(club_data)
+        else:
+            clubs = [club_data] * len(players)
+        
+        # Features comunes calculadas una vez por jugador y compartidas por ambos modelos
+        feature_store = FeatureStore()
+        value_results = self.value_change_predictor.calculate_maximum_price_batch(players, feature_store=feature_store)
+        price_results = self.maximum_price_predictor.predict_maximum_price_batch(players, feature_store=feature_store)
         
-        # Clubes élite (1.4x)
-        elite_clubs = [
-            'barcelona', 'real madrid', 'manchester city', 'psg', 
-            'paris saint-germain', 'bayern munich', 'bayern'
-        ]
+        results = []
+        multipliers = {}
+        for club, value_result, price_result in zip(clubs, value_results, price_results):
+            club_name = club.get('name', '') if club else ''
+            if club_name not in multipliers:
+                multipliers[club_name] = self._get_club_multiplier(club_name)
+            results.append(self._combine_results(value_result, price_result, multipliers[club_name]))
         
-        # Clubes top (1.2x)
-        top_clubs = [
-            'manchester united', 'chelsea', 'arsenal', 'liverpool',
-            'juventus', 'inter', 'milan', 'atletico', 'tottenham'
-        ]
+        print(f"✅ HybridROIModel 2025: {len(results)} análisis en lote ({len(multipliers)} clubes de destino)")
+        return results
+    
+    def calculate_matrix_analysis(self, players, destinations):
+        """
+        Calcula el análisis híbrido para todas las combinaciones jugador x club de destino
+        
+        Las dos predicciones ML no dependen del club: se calculan una sola vez por jugador
+        y el multiplicador de cada destino se aplica en un único paso vectorizado.
+        
+        Args:
+            players: lista de N dicts de jugador
+            destinations: lista de M nombres de club (o dicts con 'name')
+        
+        Returns:
+            dict con matrices N x M (maximum_price, predicted_future_value, roi_percentage)
+            y los resultados por jugador de ambos modelos
+        """
+        destination_names = [d.get('name', '') if isinstance(d, dict) else str(d or '') for d in destinations]
+        
+        feature_store = FeatureStore()
+        value_results = self.value_change_predictor.calculate_maximum_price_batch(players, feature_store=feature_store) if players else []
+        price_results = self.maximum_price_predictor.predict_maximum_price_batch(players, feature_store=feature_store) if players else []
         
-        # Clubes buenos (1.1x)
-        good_clubs = [
-            'napoli', 'roma', 'sevilla', 'leicester', 'newcastle',
-            'dortmund', 'leipzig', 'atalanta'
-        ]
+        base_price = np.array([r['maximum_price'] for r in price_results], dtype=float)
+        base_future_value = np.array([r['maximum_price'] for r in value_results], dtype=float)
+        club_multipliers = np.array([self._get_club_multiplier(name) for name in destination_names], dtype=float)
         
-        for elite in elite_clubs:
-            if elite in club_lower:
-                return 1.4
+        # El club multiplier se aplica a AMBOS lados (igual que _combine_results)
+        maximum_price = np.outer(base_price, club_multipliers)
+        predicted_future_value = np.outer(base_future_value, club_multipliers)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            roi_percentage = np.where(maximum_price > 0, (predicted_future_value - maximum_price) / maximum_price * 100, 0.0)
         
-        for top in top_clubs:
-            if top in club_lower:
-                return 1.2
+        confidence = np.array([v['confidence'] * 0.4 + p['confidence'] * 0.6 for v, p in zip(value_results, price_results)], dtype=float)
         
-        for good in good_clubs:
-            if good in club_lower:
-                return 1.1
+        print(f"✅ HybridROIModel 2025: matriz {len(players)} jugadores x {len(destination_names)} destinos")
         
-        return 1.0
+        return {
+            'destinations': destination_names,
+            'club_multipliers': club_multipliers,
+            'maximum_price': maximum_price,
+            'predicted_future_value': predicted_future_value,
+            'roi_percentage': roi_percentage,
+            'confidence': confidence,
+            'value_results': value_results,
+            'price_results': price_results
+        }
+    
+    def get_matrix_cell(self, matrix, player_index, destination_index):
+        """Extraer de la matriz el resultado de un jugador/destino con el formato de calculate_hybrid_analysis"""
+        price_result = matrix['price_results'][player_index]
+        return {
+            'maximum_price': float(matrix['maximum_price'][player_index, destination_index]),
+            'predicted_future_value': float(matrix['predicted_future_value'][player_index, destination_index]),
+            'predicted_change_percentage': matrix['value_results'][player_index]['predicted_change_percentage'],
+            'roi_percentage': float(matrix['roi_percentage'][player_index, destination_index]),
+            'five_values': price_result['five_values'],
+            'success_rate': price_result['success_rate'],
+            'club_multiplier': float(matrix['club_multipliers'][destination_index]),
+            'confidence': float(matrix['confidence'][player_index]),
+            'model_used': 'Hybrid ROI Model 2025'
+        }
+    
+    def rank_destinations(self, player_data, destinations, sort_by='predicted_future_value'):
+        """Ordenar clubes de destino para un jugador con una sola pasada de los modelos"""
+        matrix = self.calculate_matrix_analysis([player_data], destinations)
+        ranking = []
+        for j, name in enumerate(matrix['destinations']):
+            cell = self.get_matrix_cell(matrix, 0, j)
+            cell['destination'] = name
+            ranking.append(cell)
+        return sorted(ranking, key=lambda r: r[sort_by], reverse=True)
     
     def calculate_hybrid_analysis(self, player_data, club_data=None):
         """
@@ -79,14 +191,17 @@ class HybridROIModel2025:
             market_value_display = player_data.get('market_value', 0) or 0
             print(f"   💰 Valor mercado: €{market_value_display:,.0f}")
             
+            # Features comunes del jugador: se calculan una vez y las usan ambos predictores
+            feature_store = FeatureStore()
+            
             # Predicción de cambio de valor
             print(f"\n┌─ LLAMANDO A VALUE CHANGE PREDICTOR ─┐")
-            value_result = self.value_change_predictor.calculate_maximum_price(player_data, club_data)
+            value_result = self.value_change_predictor.calculate_maximum_price(player_data, club_data, feature_store)
             print(f"└─ VALUE CHANGE COMPLETADO ─┘")
             
             # Predicción de precio máximo
             print(f"\n┌─ LLAMANDO A MAXIMUM PRICE PREDICTOR ─┐")
-            price_result = self.maximum_price_predictor.predict_maximum_price(player_data, club_data)
+            price_result = self.maximum_price_predictor.predict_maximum_price(player_data, club_data, feature_store)
             print(f"└─ MAXIMUM PRICE COMPLETADO ─┘")
             
             # Obtener club multiplier
@@ -104,17 +219,10 @@ class HybridROIModel2025:
             # Si un jugador va al PSG, tanto el precio de compra como el valor de reventa serán más altos
             maximum_price_base = price_result['maximum_price']
             predicted_future_value_base = value_result['maximum_price']
-            
-            # Aplicar multiplier a AMBOS lados de la ecuación
-            maximum_price = maximum_price_base * club_multiplier
-            predicted_future_value = predicted_future_value_base * club_multiplier
-            
-            # Calcular ROI REAL basado en el precio que pagas vs valor futuro
-            # ROI = (ganancia / inversión) × 100
-            if maximum_price > 0:
-                roi_percentage = ((predicted_future_value - maximum_price) / maximum_price) * 100
-            else:
-                roi_percentage = 0
+            result = self._combine_results(value_result, price_result, club_multiplier)
+            maximum_price = result['maximum_price']
+            predicted_future_value = result['predicted_future_value']
+            roi_percentage = result['roi_percentage']
             
             print(f"   📊 Precio base (MaxPrice): €{maximum_price_base:,.0f}")
             print(f"   📊 Valor futuro base: €{predicted_future_value_base:,.0f}")
@@ -124,24 +232,12 @@ class HybridROIModel2025:
             print(f"   💡 ROI calculado: ({predicted_future_value:,.0f} - {maximum_price:,.0f}) / {maximum_price:,.0f} = {roi_percentage:.2f}%")
             
             # Confianza combinada
-            combined_confidence = (value_result['confidence'] * 0.4 + price_result['confidence'] * 0.6)
+            combined_confidence = result['confidence']
             print(f"\n📊 Confianza combinada:")
             print(f"   - ValueChange (40%): {value_result['confidence']}%")
             print(f"   - MaxPrice (60%): {price_result['confidence']}%")
             print(f"   = Total: {combined_confidence:.0f}%")
             
-            result = {
-                'maximum_price': maximum_price,
-                'predicted_future_value': predicted_future_value,
-                'predicted_change_percentage': value_result['predicted_change_percentage'],
-                'roi_percentage': roi_percentage,
-                'five_values': price_result['five_values'],
-                'success_rate': price_result['success_rate'],
-                'club_multiplier': club_multiplier,
-                'confidence': combined_confidence,
-                'model_used': 'Hybrid ROI Model 2025'
-            }
-            
             print(f"\n" + "╔" + "="*68 + "╗")
             print(f"║  📤 OUTPUT FINAL - HYBRID ROI MODEL 2025" + " "*27 + "║")
             print("╚" + "="*68 + "╝")
@@ -13,6 +13,12 @@ from pathlib import Path
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, project_root)
 
+from models.predictors.model_backends import find_model_file, load_model_file
+from models.predictors.tree_compiler import compiled_trees_enabled, compile_model
+from models.predictors.model_bundle import load_predictor_bundle
+from models.predictors.encoder_tables import build_lookup
+from models.predictors.feature_store import PlayerFeatures
+
 class MaximumPricePredictor2025:
     """MaximumPricePredictor con modelos modernos (2025)"""
     
@@ -29,7 +35,25 @@ class MaximumPricePredictor2025:
         self.scaler = None
         self.position_encoder = None
         self.nationality_encoder = None
+        self.bundle_manifest = None
+        self.position_lookup = None
+        self.nationality_lookup = None
         self._load_models()
+        self._build_encoder_tables()
+    
+    def _build_encoder_tables(self):
+        """Compilar los LabelEncoders a tablas dict (una vez, al cargar)"""
+        self.position_lookup = build_lookup(self.position_encoder, 'position')
+        self.nationality_lookup = build_lookup(self.nationality_encoder, 'nationality')
+        if self.position_lookup and self.nationality_lookup:
+            print(f"✅ Tablas de encoders: {len(self.position_lookup)} posiciones, {len(self.nationality_lookup)} nacionalidades")
+    
+    def encoder_stats(self):
+        """Contadores de las tablas de encoders (lookups y desconocidos)"""
+        return {
+            'position': self.position_lookup.stats() if self.position_lookup else None,
+            'nationality': self.nationality_lookup.stats() if self.nationality_lookup else None,
+        }
     
     def _load_models(self):
         """Cargar modelos modernos"""
@@ -40,9 +64,19 @@ class MaximumPricePredictor2025:
             if not os.path.exists(self.models_path):
                 raise FileNotFoundError(f"Directorio de modelos no encontrado: {self.models_path}")
             
+            # Bundle versionado (manifest + payloads mapeados en memoria); si no hay, .pkl sueltos
+            bundle = load_predictor_bundle(self.models_path, "maximum_price")
+            if bundle is not None:
+                self.model = bundle['model']
+                self.scaler = bundle['scaler']
+                self.position_encoder = bundle['position_encoder']
+                self.nationality_encoder = bundle['nationality_encoder']
+                self.bundle_manifest = bundle['manifest']
+                return
+            
             # Modelo principal
-            model_file = os.path.join(self.models_path, "maximum_price_model.pkl")
-            if not os.path.exists(model_file):
+            model_file = find_model_file(self.models_path, "maximum_price_model")
+            if model_file is None:
                 print("⚠️ WARNING: maximum_price_model.pkl no encontrado - deshabilitando predictores de precio máximo")
                 self.model = None
                 self.scaler = None
@@ -50,9 +84,15 @@ class MaximumPricePredictor2025:
                 self.nationality_encoder = None
                 return
             
-            with open(model_file, 'rb') as f:
-                self.model = pickle.load(f)
-            print("✅ Modelo 2025 cargado")
+            self.model = load_model_file(model_file)
+            print(f"✅ Modelo 2025 cargado ({os.path.basename(model_file)})")
+            
+            # Motor de inferencia compilado (opcional, TRUESIGN_COMPILED_TREES=1)
+            if compiled_trees_enabled():
+                compiled = compile_model(self.model)
+                if compiled is not None:
+                    self.model = compiled
+                    print(f"⚡ Modelo compilado a arrays ({compiled.kind})")
             
             # Scaler
             scaler_file = os.path.join(self.models_path, "maximum_price_scaler.pkl")
@@ -91,7 +131,7 @@ class MaximumPricePredictor2025:
             self.position_encoder = None
             self.nationality_encoder = None
     
-    def _calculate_confidence(self, player_data, predicted_price):
+    def _calculate_confidence(self, player_data, predicted_price, verbose=True):
         """
         Calcular confianza dinámica basada en calidad de datos y factores de riesgo
         Retorna un valor entre 50-95%
@@ -111,13 +151,15 @@ class MaximumPricePredictor2025:
         
         if age < 18 or age > 33:
             penalties += 10
-            print(f"   ⚠️ Edad extrema ({age} años): -10% confianza")
+            if verbose:
+                print(f"   ⚠️ Edad extrema ({age} años): -10% confianza")
         
         # 2. Valor de mercado extremo (-5%)
         market_value = player_data.get('market_value', 0)
         if market_value < 500_000 or market_value > 150_000_000:
             penalties += 5
-            print(f"   ⚠️ Valor extremo (€{market_value/1_000_000:.1f}M): -5% confianza")
+            if verbose:
+                print(f"   ⚠️ Valor extremo (€{market_value/1_000_000:.1f}M): -5% confianza")
         
         # 3. Datos faltantes (-5% por campo crítico)
         critical_fields = ['position', 'nationality', 'height']
@@ -125,80 +167,90 @@ class MaximumPricePredictor2025:
             value = player_data.get(field)
             if not value or value == 'Unknown' or value == 0:
                 penalties += 5
-                print(f"   ⚠️ Campo faltante ({field}): -5% confianza")
+                if verbose:
+                    print(f"   ⚠️ Campo faltante ({field}): -5% confianza")
         
         # 4. Predicción muy diferente del valor de mercado (-10%)
         if predicted_price > market_value * 2 or predicted_price < market_value * 0.7:
             penalties += 10
             ratio = predicted_price / market_value if market_value > 0 else 1
-            print(f"   ⚠️ Precio muy diferente ({ratio:.1f}x del valor): -10% confianza")
+            if verbose:
+                print(f"   ⚠️ Precio muy diferente ({ratio:.1f}x del valor): -10% confianza")
         
         # 5. Posición poco común (-5%)
         position = str(player_data.get('position', '')).lower()
         rare_positions = ['goalkeeper', 'portero', 'keeper']
         if any(rare in position for rare in rare_positions):
             penalties += 5
-            print(f"   ⚠️ Posición poco común ({position}): -5% confianza")
+            if verbose:
+                print(f"   ⚠️ Posición poco común ({position}): -5% confianza")
         
         # Calcular confianza final
         final_confidence = max(50, min(95, base_confidence - penalties))
         
         return final_confidence
     
-    def _prepare_features(self, player_data):
+    def _prepare_features(self, player_data, feature_store=None):
         """Preparar 14 features del jugador"""
-        age = player_data.get('age', 25)
-        # Convertir edad a entero si es posible, sino usar valor por defecto
-        try:
-            age = int(float(age)) if age != "--" and age is not None else 25
-        except (ValueError, TypeError):
-            age = 25
-            
-        height = player_data.get('height', 180)
-        market_value = player_data.get('market_value', 1000000)
-        position = player_data.get('position', 'Attack')
-        nationality = player_data.get('nationality', 'Unknown')
-        foot = player_data.get('foot', 'right')
-        
-        # Codificar
-        try:
-            position_encoded = self.position_encoder.transform([position])[0]
-        except:
-            position_encoded = 0
+        # Registro canónico compartido con el otro predictor (o calculado acá si no hay store)
+        f = feature_store.get(player_data) if feature_store is not None else PlayerFeatures(player_data)
         
-        try:
-            nationality_encoded = self.nationality_encoder.transform([nationality])[0]
-        except:
-            nationality_encoded = 0
-        
-        # Manejar foot como booleano o string
-        if isinstance(foot, bool):
-            foot_str = 'right' if foot else 'left'
-        else:
-            foot_str = str(foot).lower() if foot else 'right'
-        foot_encoded = {'right': 1, 'left': 0, 'both': 2}.get(foot_str, 1)
+        # Codificar con las tablas de este predictor (desconocidos al bucket explícito y contados)
+        position_encoded, nationality_encoded = f.encoded(self.position_lookup, self.nationality_lookup)
         
         # Crear 14 features
         features = [
-            age,
-            height,
-            market_value,
+            f.age,
+            f.height,
+            f.market_value,
             position_encoded,
             nationality_encoded,
-            foot_encoded,
-            np.sqrt(market_value),
-            age ** 2,
-            np.log1p(market_value),
-            market_value / 1000000,
-            age * market_value / 1000000,
-            position_encoded * market_value / 1000000,
-            1 if age < 23 else 0,
-            1 if age >= 30 else 0
+            f.foot_encoded,
+            f.sqrt_value,
+            f.age_squared,
+            f.log_value,
+            f.value_millions,
+            f.age_value_interaction,
+            position_encoded * f.market_value / 1000000,
+            f.is_young,
+            f.is_veteran
         ]
         
         return np.array(features).reshape(1, -1)
     
-    def predict_maximum_price(self, player_data, club_data=None):
+    def _success_rate(self, age):
+        """Tasa de éxito por edad (heurística simple)"""
+        if age < 23:
+            return 0.75
+        elif age < 28:
+            return 0.85
+        return 0.70
+    
+    def _five_values(self, market_value, maximum_price, success_rate=1.0):
+        """Cinco valores a partir del precio máximo"""
+        return {
+            'market_value': market_value,
+            'marketing_impact': maximum_price * 0.25 * success_rate,
+            'sporting_value': maximum_price * 0.35 * success_rate,
+            'resale_potential': maximum_price * 0.50 * success_rate,
+            'similar_transfers': maximum_price * 0.20 * success_rate
+        }
+    
+    def _fallback_result(self, player_data):
+        """Resultado simple cuando el modelo no pudo predecir (1.5x el valor de mercado)"""
+        market_value = player_data.get('market_value', 1000000)
+        if market_value is None:
+            market_value = 1000000
+        maximum_price = market_value * 1.5
+        return {
+            'maximum_price': maximum_price,
+            'five_values': self._five_values(market_value, maximum_price),
+            'success_rate': 0.75,
+            'confidence': 50,
+            'model_used': 'MaximumPricePredictor 2025 (fallback)'
+        }
+    
+    def predict_maximum_price(self, player_data, club_data=None, feature_store=None):
         """
         Predice el precio máximo a pagar por un jugador
         
@@ -217,7 +269,7 @@ class MaximumPricePredictor2025:
             
             # Preparar features
             print(f"\n🔧 Preparando 14 features...")
-            X = self._prepare_features(player_data)
+            X = self._prepare_features(player_data, feature_store)
             print(f"   ✅ Features preparadas: {X.shape}")
             
             # Escalar
@@ -242,25 +294,14 @@ class MaximumPricePredictor2025:
             
             # Calcular success rate (simple heurística)
             age = player_data.get('age', 25)
-            if age < 23:
-                success_rate = 0.75
-            elif age < 28:
-                success_rate = 0.85
-            else:
-                success_rate = 0.70
+            success_rate = self._success_rate(age)
             
             print(f"\n🎯 Calculando tasa de éxito...")
             print(f"   - Edad: {age} años → Success rate: {success_rate*100:.0f}%")
             
             # Cinco valores
             print(f"\n💎 Calculando cinco valores...")
-            five_values = {
-                'market_value': market_value,
-                'marketing_impact': maximum_price * 0.25 * success_rate,
-                'sporting_value': maximum_price * 0.35 * success_rate,
-                'resale_potential': maximum_price * 0.50 * success_rate,
-                'similar_transfers': maximum_price * 0.20 * success_rate
-            }
+            five_values = self._five_values(market_value, maximum_price, success_rate)
             
             print(f"   - Market Value: €{five_values['market_value']:,.0f}")
             print(f"   - Marketing Impact: €{five_values['marketing_impact']:,.0f}")
@@ -291,25 +332,59 @@ class MaximumPricePredictor2025:
             
         except Exception as e:
             print(f"❌ Error en predicción: {e}")
-            # Fallback simple
-            market_value = player_data.get('market_value', 1000000)
-            maximum_price = market_value * 1.5
-            
-            five_values = {
-                'market_value': market_value,
-                'marketing_impact': maximum_price * 0.25,
-                'sporting_value': maximum_price * 0.35,
-                'resale_potential': maximum_price * 0.50,
-                'similar_transfers': maximum_price * 0.20
-            }
-            
-            return {
-                'maximum_price': maximum_price,
-                'five_values': five_values,
-                'success_rate': 0.75,
-                'confidence': 50,
-                'model_used': 'MaximumPricePredictor 2025 (fallback)'
-            }
+            return self._fallback_result(player_data)
+
+    def predict_maximum_price_batch(self, players, feature_store=None):
+        """
+        Predice el precio máximo de varios jugadores con una sola pasada del modelo
+        
+        Returns:
+            list de dicts con el mismo formato que predict_maximum_price (mismo orden que players)
+        """
+        results = [None] * len(players)
+        
+        # Preparar features fila por fila (un jugador con datos rotos no tira todo el lote)
+        rows, valid_indices = [], []
+        for i, player_data in enumerate(players):
+            try:
+                rows.append(self._prepare_features(player_data, feature_store))
+                valid_indices.append(i)
+            except Exception as e:
+                print(f"⚠️ Features inválidas para {player_data.get('player_name', player_data.get('name', 'N/A'))}: {e}")
+        
+        try:
+            if rows:
+                X_scaled = self.scaler.transform(np.vstack(rows))
+                raw_prices = self.model.predict(X_scaled)
+                
+                for i, raw_price, features in zip(valid_indices, raw_prices, rows):
+                    player_data = players[i]
+                    market_value = player_data.get('market_value', 1000000)
+                    
+                    # Mismos límites realistas que predict_maximum_price
+                    maximum_price = max(market_value * 1.1, min(market_value * 4.0, raw_price))
+                    
+                    # Success rate con la edad ya parseada en las features
+                    success_rate = self._success_rate(features[0, 0])
+                    
+                    results[i] = {
+                        'maximum_price': maximum_price,
+                        'five_values': self._five_values(market_value, maximum_price, success_rate),
+                        'success_rate': success_rate,
+                        'confidence': self._calculate_confidence(player_data, maximum_price, verbose=False),
+                        'model_used': 'MaximumPricePredictor 2025'
+                    }
+                
+                print(f"✅ MaximumPricePredictor 2025: {len(rows)} jugadores en una sola predicción")
+        except Exception as e:
+            print(f"❌ Error en predicción por lotes: {e}")
+        
+        # Fallback simple para los jugadores sin predicción
+        for i, result in enumerate(results):
+            if result is None:
+                results[i] = self._fallback_result(players[i])
+        
+        return results
 
 if __name__ == "__main__":
     # Test
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Model Backends 2025 - Carga de modelos entrenados en cualquiera de los formatos que exporta
+scripts/training/train_models_verbose.py (pickle de sklearn/LightGBM/XGBoost o formato nativo)
+"""
+
+import os
+import pickle
+
+try:
+    import lightgbm as lgb
+except ImportError:
+    lgb = None
+
+try:
+    import xgboost as xgb
+except ImportError:
+    xgb = None
+
+# Extensiones en orden de preferencia: el pickle es el artefacto principal,
+# los formatos nativos permiten cargar el modelo sin depender de la versión de sklearn
+MODEL_FORMATS = [
+    ('.pkl', 'pickle'),
+    ('.lgb.txt', 'lightgbm'),
+    ('.xgb.json', 'xgboost'),
+]
+
+
+def find_model_file(models_path, base_name):
+    """Primer archivo existente de un modelo (p.ej. value_change_model.pkl) o None"""
+    for extension, _ in MODEL_FORMATS:
+        path = os.path.join(models_path, base_name + extension)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def load_model_file(path):
+    """Cargar un modelo según su extensión; todos exponen predict(X)"""
+    if path.endswith('.lgb.txt'):
+        if lgb is None:
+            raise ImportError("lightgbm es necesario para cargar " + os.path.basename(path))
+        return lgb.Booster(model_file=path)
+
+    if path.endswith('.xgb.json'):
+        if xgb is None:
+            raise ImportError("xgboost es necesario para cargar " + os.path.basename(path))
+        model = xgb.XGBRegressor()
+        model.load_model(path)
+        return model
+
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def export_native_model(model, models_path, base_name):
+    """Exportar LightGBM/XGBoost en su formato nativo junto al pickle; devuelve la ruta o None"""
+    if lgb is not None and isinstance(model, lgb.LGBMModel):
+        path = os.path.join(models_path, base_name + '.lgb.txt')
+        model.booster_.save_model(path)
+        return path
+
+    if xgb is not None and isinstance(model, xgb.XGBModel):
+        path = os.path.join(models_path, base_name + '.xgb.json')
+        model.save_model(path)
+        return path
+
+    return None
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Model Bundle 2025 - Formato de artefactos versionado para los predictores
+
+Un bundle es un directorio (p.ej. models/trained/value_change/) con:
+- manifest.json: versión del formato, orden de features, versiones de sklearn/numpy/joblib
+  con las que se entrenó, sha256 de cada payload y sha256 de los .pkl de los que salió
+- payloads joblib sin comprimir (model, scaler, encoders y, si aplica, el modelo compilado)
+
+Los payloads se cargan con mmap_mode='r': los arrays NumPy quedan respaldados por el page
+cache del sistema y varios workers comparten la misma memoria. La compatibilidad se valida
+al cargar (versiones, checksums, cantidad de features y un predict de prueba) en lugar de
+fallar en el primer request. Si un .pkl fuente cambió después de generar el bundle (modelo
+reentrenado), el bundle se descarta y build_model_bundles.py --if-stale lo regenera.
+"""
+
+import os
+import json
+import hashlib
+import platform
+from datetime import datetime
+
+import numpy as np
+import joblib
+import sklearn
+
+from models.predictors.tree_compiler import compile_model, compiled_trees_enabled
+
+BUNDLE_FORMAT_VERSION = 1
+MANIFEST_FILE = 'manifest.json'
+
+
+class ModelBundleError(Exception):
+    """Bundle inexistente, corrupto o incompatible con el entorno actual"""
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def json_default(value):
+    """Tipos numpy (métricas, best_params_ de scipy.stats) a tipos nativos de JSON"""
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def _major_minor(version):
+    return tuple(str(version).split('.')[:2])
+
+
+def _source_record(path, base_dir):
+    stat = os.stat(path)
+    return {
+        'file': os.path.relpath(path, base_dir),
+        'sha256': _sha256(path),
+        'bytes': stat.st_size,
+        'mtime': stat.st_mtime,
+    }
+
+
+def check_sources(bundle_path, manifest):
+    """Lista de archivos fuente (.pkl) que cambiaron desde que se generó el bundle"""
+    sources = manifest.get('sources')
+    if not sources:
+        return ["el manifest no registra los archivos fuente"]
+
+    # Las rutas de las fuentes son relativas al directorio que contiene el bundle
+    base_dir = os.path.dirname(os.path.abspath(bundle_path))
+    problems = []
+    for source in sources.values():
+        path = os.path.join(base_dir, source['file'])
+        if not os.path.exists(path):
+            continue  # Deploy solo con bundles: no hay contra qué comparar
+        stat = os.stat(path)
+        if stat.st_size == source.get('bytes') and stat.st_mtime == source.get('mtime'):
+            continue  # Mismo archivo que al generar el bundle (se evita el hash)
+        if stat.st_size != source.get('bytes') or _sha256(path) != source['sha256']:
+            problems.append(f"{source['file']} cambió desde que se generó el bundle")
+    return problems
+
+
+def write_model_bundle(bundle_path, model, scaler, encoders, feature_names, metrics=None, sources=None):
+    """
+    Escribir un bundle completo; devuelve el manifest
+
+    sources: {nombre: ruta} de los archivos de los que salieron los payloads (se registra su sha256)
+    """
+    os.makedirs(bundle_path, exist_ok=True)
+
+    payloads = {'model': model, 'scaler': scaler, **encoders}
+    compiled = compile_model(model)
+    if compiled is not None:
+        payloads['compiled'] = compiled
+
+    artifacts = {}
+    for name, obj in payloads.items():
+        file_name = f'{name}.joblib'
+        path = os.path.join(bundle_path, file_name)
+        # Sin compresión: es requisito para poder mapear los arrays en memoria al cargar
+        joblib.dump(obj, path, compress=0)
+        artifacts[name] = {
+            'file': file_name,
+            'type': type(obj).__name__,
+            'sha256': _sha256(path),
+            'bytes': os.path.getsize(path),
+        }
+
+    manifest = {
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'features': list(feature_names),
+        'versions': {
+            'python': platform.python_version(),
+            'sklearn': sklearn.__version__,
+            'numpy': np.__version__,
+            'joblib': joblib.__version__,
+        },
+        'artifacts': artifacts,
+        'sources': {name: _source_record(path, os.path.dirname(os.path.abspath(bundle_path)))
+                    for name, path in (sources or {}).items()},
+        'metrics': metrics or {},
+    }
+
+    # Manifest al final y con rename atómico: un bundle a medio escribir no se considera válido
+    tmp_path = os.path.join(bundle_path, MANIFEST_FILE + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, default=json_default)
+    os.replace(tmp_path, os.path.join(bundle_path, MANIFEST_FILE))
+
+    return manifest
+
+
+def read_manifest(bundle_path):
+    path = os.path.join(bundle_path, MANIFEST_FILE)
+    if not os.path.exists(path):
+        raise ModelBundleError(f"Manifest no encontrado: {path}")
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def check_compatibility(manifest):
+    """Lista de problemas de compatibilidad entre el bundle y el entorno actual"""
+    problems = []
+    if manifest.get('format_version') != BUNDLE_FORMAT_VERSION:
+        problems.append(f"formato {manifest.get('format_version')} (soportado: {BUNDLE_FORMAT_VERSION})")
+
+    versions = manifest.get('versions', {})
+    # Los pickles de sklearn solo son estables dentro de la misma versión major.minor
+    if _major_minor(versions.get('sklearn')) != _major_minor(sklearn.__version__):
+        problems.append(f"sklearn {versions.get('sklearn')} (instalado: {sklearn.__version__})")
+    if str(versions.get('numpy', '')).split('.')[0] != np.__version__.split('.')[0]:
+        problems.append(f"numpy {versions.get('numpy')} (instalado: {np.__version__})")
+    return problems
+
+
+def load_model_bundle(bundle_path, mmap_mode='r', verify_checksums=True):
+    """Cargar y validar un bundle; devuelve (manifest, {nombre: objeto})"""
+    manifest = read_manifest(bundle_path)
+
+    problems = check_compatibility(manifest)
+    if problems:
+        raise ModelBundleError(f"Bundle incompatible ({bundle_path}): " + '; '.join(problems))
+
+    problems = check_sources(bundle_path, manifest)
+    if problems:
+        raise ModelBundleError(f"Bundle desactualizado ({bundle_path}): " + '; '.join(problems))
+
+    loaded = {}
+    for name, artifact in manifest.get('artifacts', {}).items():
+        path = os.path.join(bundle_path, artifact['file'])
+        if not os.path.exists(path):
+            raise ModelBundleError(f"Payload faltante: {path}")
+        if verify_checksums and _sha256(path) != artifact['sha256']:
+            raise ModelBundleError(f"Checksum inválido: {path}")
+        loaded[name] = joblib.load(path, mmap_mode=mmap_mode)
+
+    for required in ('model', 'scaler'):
+        if required not in loaded:
+            raise ModelBundleError(f"El bundle no incluye '{required}'")
+
+    n_features = len(manifest.get('features', []))
+    scaler_features = getattr(loaded['scaler'], 'n_features_in_', n_features)
+    if n_features and scaler_features != n_features:
+        raise ModelBundleError(f"El scaler espera {scaler_features} features y el manifest declara {n_features}")
+
+    # Predict de prueba: un modelo que no puede predecir falla acá y no en el primer request
+    try:
+        probe = loaded['scaler'].transform(np.zeros((1, scaler_features)))
+        loaded['model'].predict(probe)
+    except Exception as e:
+        raise ModelBundleError(f"El modelo del bundle no pudo predecir: {e}")
+
+    if 'compiled' in loaded:
+        loaded['compiled'].attach_source(loaded['model'])
+
+    return manifest, loaded
+
+
+def load_predictor_bundle(models_path, bundle_name, encoder_names=('position_encoder', 'nationality_encoder')):
+    """
+    Cargar el bundle de un predictor si existe. Devuelve un dict con model, scaler, encoders
+    y manifest, o None si no hay bundle o es inválido (el predictor sigue con los .pkl)
+    """
+    bundle_path = os.path.join(models_path, bundle_name)
+    if not os.path.exists(os.path.join(bundle_path, MANIFEST_FILE)):
+        return None
+
+    try:
+        manifest, loaded = load_model_bundle(bundle_path)
+    except Exception as e:
+        print(f"❌ Bundle {bundle_name} descartado: {e}")
+        return None
+
+    missing = [name for name in encoder_names if name not in loaded]
+    if missing:
+        print(f"❌ Bundle {bundle_name} descartado: faltan {', '.join(missing)}")
+        return None
+
+    model = loaded['model']
+    if compiled_trees_enabled():
+        # Arrays compilados del bundle (mapeados en memoria) o compilación en el momento
+        compiled = loaded.get('compiled') or compile_model(model)
+        if compiled is not None:
+            model = compiled
+
+    print(f"✅ Bundle {bundle_name} cargado (sklearn {manifest['versions']['sklearn']}, "
+          f"{len(manifest['features'])} features, {manifest['created_at']})")
+    return {
+        'manifest': manifest,
+        'model': model,
+        'scaler': loaded['scaler'],
+        **{name: loaded[name] for name in encoder_names},
+    }
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Tree Compiler 2025 - Motor de inferencia opcional para ensembles de árboles
+
+Convierte RandomForest / GradientBoosting / HistGradientBoosting / VotingRegressor de sklearn
+en arrays planos de NumPy (feature, threshold, left, right, value) y los evalúa recorriendo
+todos los árboles a la vez. Evita la validación, el dispatch de joblib y el loop por
+estimador de sklearn, que dominan el costo con 1 fila (caso /search).
+
+Las sumas se hacen en el mismo orden y con el mismo dtype de entrada que sklearn, así que
+las predicciones son idénticas bit a bit a model.predict.
+"""
+
+import os
+import numpy as np
+
+from sklearn.ensemble import (
+    RandomForestRegressor, ExtraTreesRegressor, GradientBoostingRegressor,
+    HistGradientBoostingRegressor, VotingRegressor,
+)
+from sklearn.tree import DecisionTreeRegressor
+
+
+def compiled_trees_enabled() -> bool:
+    """Activado con TRUESIGN_COMPILED_TREES=1 (desactivado por defecto)"""
+    return os.getenv('TRUESIGN_COMPILED_TREES', 'false').lower() in ('1', 'true', 'yes')
+
+
+class CompiledForest:
+    """Grupo de árboles aplanados en arrays contiguos; las hojas apuntan a sí mismas"""
+
+    def __init__(self, trees, input_dtype):
+        # trees: lista de dicts con feature, threshold, left, right, value, missing_left (índices locales, -1 = hoja)
+        self.input_dtype = input_dtype
+        self.n_trees = len(trees)
+
+        sizes = [len(t['value']) for t in trees]
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.intp)
+        self.roots = offsets
+
+        feature, threshold, left, right, value, missing_left = [], [], [], [], [], []
+        max_depth = 0
+        for tree, offset in zip(trees, offsets):
+            node_ids = np.arange(len(tree['value']), dtype=np.intp) + offset
+            is_leaf = tree['left'] < 0
+            feature.append(np.where(is_leaf, 0, tree['feature']).astype(np.intp))
+            threshold.append(tree['threshold'].astype(np.float64))
+            left.append(np.where(is_leaf, node_ids, tree['left'] + offset).astype(np.intp))
+            right.append(np.where(is_leaf, node_ids, tree['right'] + offset).astype(np.intp))
+            value.append(tree['value'].astype(np.float64))
+            missing_left.append(tree['missing_left'].astype(bool))
+            max_depth = max(max_depth, tree['depth'])
+
+        self.feature = np.concatenate(feature)
+        self.threshold = np.concatenate(threshold)
+        self.left = np.concatenate(left)
+        self.right = np.concatenate(right)
+        self.value = np.concatenate(value)
+        self.missing_left = np.concatenate(missing_left)
+        self.max_depth = max_depth
+
+    def leaf_values(self, X):
+        """Valor de hoja de cada árbol para cada fila: array (n_trees, n_rows)"""
+        X = np.asarray(X, dtype=self.input_dtype)
+        rows = np.arange(X.shape[0])[None, :]
+        nodes = np.repeat(self.roots[:, None], X.shape[0], axis=1)
+
+        # Profundidad máxima pasos: las hojas se apuntan a sí mismas, así que iterar de más no cambia nada
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[nodes]]
+            go_left = x <= self.threshold[nodes]
+            missing = np.isnan(x)
+            if missing.any():
+                go_left = np.where(missing, self.missing_left[nodes], go_left)
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        return self.value[nodes]
+
+
+def _sklearn_tree(tree_):
+    """Arrays de un sklearn.tree._tree.Tree (regresión, una salida)"""
+    missing_left = getattr(tree_, 'missing_go_to_left', None)
+    return {
+        'feature': tree_.feature,
+        'threshold': tree_.threshold,
+        'left': tree_.children_left,
+        'right': tree_.children_right,
+        'value': tree_.value[:, 0, 0],
+        'missing_left': missing_left if missing_left is not None else np.zeros(tree_.node_count, dtype=bool),
+        'depth': tree_.max_depth,
+    }
+
+
+def _hist_tree(predictor):
+    """Arrays de un TreePredictor de HistGradientBoosting (sin features categóricas)"""
+    nodes = predictor.nodes
+    if nodes['is_categorical'].any():
+        raise NotImplementedError("HistGradientBoosting con features categóricas no soportado")
+    is_leaf = nodes['is_leaf'].astype(bool)
+    return {
+        'feature': nodes['feature_idx'],
+        'threshold': nodes['num_threshold'],
+        'left': np.where(is_leaf, -1, nodes['left'].astype(np.intp)),
+        'right': np.where(is_leaf, -1, nodes['right'].astype(np.intp)),
+        'value': nodes['value'],
+        'missing_left': nodes['missing_go_to_left'],
+        'depth': int(nodes['depth'].max()),
+    }
+
+
+class CompiledTreeModel:
+    """Modelo compilado con la misma interfaz predict(X) que el estimador original"""
+
+    # Desde este tamaño de lote el recorrido en paralelo de todos los árboles deja de ganarle
+    # al Cython de sklearn (ver scripts/testing/benchmark_tree_compiler.py): se delega en el original
+    MAX_COMPILED_ROWS = 64
+
+    def __init__(self, model):
+        self.source_model = model
+        self.kind = type(model).__name__
+        self.members = None
+        self.forest = None
+
+        # sklearn convierte X a float32 antes de recorrer árboles de sklearn.tree
+        if isinstance(model, (RandomForestRegressor, ExtraTreesRegressor)):
+            self.forest = CompiledForest([_sklearn_tree(e.tree_) for e in model.estimators_], np.float32)
+        elif isinstance(model, GradientBoostingRegressor):
+            if model.init_ == 'zero':
+                self.init_value = 0.0
+            else:
+                self.init_value = float(np.asarray(model.init_.predict(np.zeros((1, model.n_features_in_)))).ravel()[0])
+            self.learning_rate = model.learning_rate
+            self.forest = CompiledForest([_sklearn_tree(e.tree_) for e in model.estimators_[:, 0]], np.float32)
+        elif isinstance(model, HistGradientBoostingRegressor):
+            if model._loss.link.__class__.__name__ != 'IdentityLink':
+                raise NotImplementedError("HistGradientBoosting solo con pérdidas de link identidad")
+            self.baseline = np.asarray(model._baseline_prediction, dtype=np.float64).ravel()[0]
+            self.forest = CompiledForest([_hist_tree(p[0]) for p in model._predictors], np.float64)
+        elif isinstance(model, DecisionTreeRegressor):
+            self.forest = CompiledForest([_sklearn_tree(model.tree_)], np.float32)
+        elif isinstance(model, VotingRegressor):
+            self.members = [CompiledTreeModel(e) for e in model.estimators_]
+            self.weights = model._weights_not_none
+        else:
+            raise NotImplementedError(f"Modelo no soportado por el compilador de árboles: {self.kind}")
+
+    def __getstate__(self):
+        # El estimador original se guarda aparte (bundle de modelos): acá solo van los arrays
+        state = self.__dict__.copy()
+        state['source_model'] = None
+        return state
+
+    def attach_source(self, model):
+        """Reasociar el estimador original tras cargar los arrays compilados"""
+        self.source_model = model
+        if self.members is not None:
+            for member, estimator in zip(self.members, model.estimators_):
+                member.attach_source(estimator)
+        return self
+
+    def predict(self, X):
+        if len(X) > self.MAX_COMPILED_ROWS:
+            return self.source_model.predict(X)
+
+        if self.members is not None:
+            predictions = np.asarray([m.predict(X) for m in self.members]).T
+            return np.average(predictions, axis=1, weights=self.weights)
+
+        values = self.forest.leaf_values(X)
+
+        if self.kind in ('RandomForestRegressor', 'ExtraTreesRegressor'):
+            # Mismo orden de acumulación que ForestRegressor.predict
+            out = np.zeros(values.shape[1], dtype=np.float64)
+            for tree_values in values:
+                out += tree_values
+            out /= self.forest.n_trees
+            return out
+
+        if self.kind == 'GradientBoostingRegressor':
+            out = np.full(values.shape[1], self.init_value, dtype=np.float64)
+            for tree_values in values:
+                out += self.learning_rate * tree_values
+            return out
+
+        if self.kind == 'HistGradientBoostingRegressor':
+            out = np.zeros(values.shape[1], dtype=np.float64)
+            out += self.baseline
+            for tree_values in values:
+                out += tree_values
+            return out
+
+        return values[0]
+
+
+def compile_model(model):
+    """Compilar un modelo de árboles; None si no es compatible (se sigue usando model.predict)"""
+    try:
+        return CompiledTreeModel(model)
+    except (NotImplementedError, AttributeError) as e:
+        print(f"⚠️ Compilador de árboles no aplicable: {e}")
+        return None
@@ -8,6 +8,15 @@ from datetime import datetime, timedelta
 import re
 from urllib.parse import quote
 import logging
+import sys
+import threading
+
+# Agregar directorio raíz del proyecto al path (el scraper también se corre suelto)
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from scraping.player_identity import get_player_identity_map
 
 # Intentar importar Selenium (opcional)
 try:
@@ -35,6 +44,8 @@ class BeSoccerScraper:
             self.session = requests.Session()
             self.cache_file = "besoccer_cache.json"
             self.cache = self.load_cache()
+            self._cache_lock = threading.Lock()
+            self.identity_map = get_player_identity_map()
             
             # Headers para BeSoccer
             self.headers = {
@@ -68,10 +79,13 @@ class BeSoccerScraper:
         return {}
     
     def save_cache(self):
-        """Guardar cache en archivo"""
+        """Guardar cache en archivo (bajo lock: compare_players busca varios jugadores en paralelo)"""
         try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache, f, ensure_ascii=False, indent=2)
+            with self._cache_lock:
+                tmp_file = f"{self.cache_file}.{threading.get_ident()}.tmp"
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(self.cache, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_file, self.cache_file)
         except Exception as e:
             logger.error(f"Error guardando cache: {e}")
     
@@ -95,21 +109,24 @@ class BeSoccerScraper:
             logger.info(f"✅ Cache hit para {player_name}")
             return self.cache[player_name]['data']
         
-        # 2. Scraping con Selenium
+        # 2. Perfil ya conocido (un request, sin abrir el navegador) o scraping con Selenium
         try:
-            print(f"🌐 BeSoccer: Scraping en vivo para {player_name}")
-            logger.info(f"🌐 Scraping en vivo en BeSoccer para {player_name}")
-            player_data = self._scrape_with_selenium(player_name)
+            player_data = self._scrape_known_profile(player_name)
+            if not player_data:
+                print(f"🌐 BeSoccer: Scraping en vivo para {player_name}")
+                logger.info(f"🌐 Scraping en vivo en BeSoccer para {player_name}")
+                player_data = self._scrape_with_selenium(player_name)
             
             # Solo guardar si obtuvimos datos válidos
             if player_data and player_data.get('name'):
                 # Verificar si tiene market_value válido (no None)
                 market_value = player_data.get('market_value')
                 if market_value is not None and market_value > 0:
-                    self.cache[player_name] = {
-                        'data': player_data,
-                        'timestamp': datetime.now().isoformat()
-                    }
+                    with self._cache_lock:
+                        self.cache[player_name] = {
+                            'data': player_data,
+                            'timestamp': datetime.now().isoformat()
+                        }
                     self.save_cache()
                     print(f"✅ BeSoccer: Jugador encontrado - {player_data.get('name')} (€{market_value:,})")
                     logger.info(f"✅ Datos guardados en cache para {player_name}")
@@ -324,20 +341,9 @@ class BeSoccerScraper:
             
             logger.info("📊 Extrayendo datos del jugador...")
             
-            # Extraer datos del jugador
-            player_data = {
-                'name': self._extract_name(soup),
-                'current_club': self._extract_current_club(soup),
-                'market_value': self._extract_market_value(soup),
-                'age': self._extract_age(soup),
-                'position': self._extract_position(soup),
-                'height': self._extract_height(soup),
-                'foot': self._extract_foot(soup),
-                'nationality': self._extract_nationality(soup),
-            }
-            
-            # Normalizar formato para que coincida con Transfermarkt
-            player_data = self._normalize_to_transfermarkt_format(player_data)
+            # Extraer datos del jugador (normalizados al formato de Transfermarkt)
+            player_data = self._extract_player_data(soup)
+            self._record_slug(player_name, player_data, player_link.split('/player/')[-1])
             
             # Log de lo que se extrajo
             logger.info(f"✅ Datos extraídos de BeSoccer:")
@@ -366,6 +372,54 @@ class BeSoccerScraper:
             if driver:
                 driver.quit()
     
+    def _extract_player_data(self, soup):
+        """Datos del jugador desde la página de perfil, en el formato de Transfermarkt"""
+        player_data = {
+            'name': self._extract_name(soup),
+            'current_club': self._extract_current_club(soup),
+            'market_value': self._extract_market_value(soup),
+            'age': self._extract_age(soup),
+            'position': self._extract_position(soup),
+            'height': self._extract_height(soup),
+            'foot': self._extract_foot(soup),
+            'nationality': self._extract_nationality(soup),
+        }
+        return self._normalize_to_transfermarkt_format(player_data)
+    
+    def _scrape_known_profile(self, player_name):
+        """Ir directo al perfil guardado en el mapa de identidades (None si no hay o no sirvió)"""
+        slug = self.identity_map.get(player_name).get('besoccer_slug')
+        if not slug:
+            return None
+        
+        player_url = f"https://www.besoccer.com/player/{slug}"
+        logger.info(f"🪪 Perfil conocido para {player_name}: {player_url}")
+        try:
+            time.sleep(random.uniform(1, 2))
+            response = self.session.get(player_url, timeout=10)
+            
+            if response.status_code == 200:
+                player_data = self._extract_player_data(BeautifulSoup(response.content, 'html.parser'))
+                if player_data.get('name') and (player_data.get('market_value') or 0) > 0:
+                    return player_data
+            elif response.status_code != 404:
+                # 403 u otro error transitorio: el slug se conserva y se busca con Selenium
+                logger.warning(f"⚠️ Status {response.status_code} en perfil conocido de {player_name}")
+                return None
+        except Exception as e:
+            logger.warning(f"⚠️ Error en perfil conocido de {player_name}: {e}")
+            return None
+        
+        # 404 o perfil sin datos: se olvida el slug y se vuelve a buscar
+        logger.warning(f"⚠️ Slug conocido inválido para {player_name}, se busca de nuevo")
+        self.identity_map.forget(player_name, 'besoccer_slug')
+        return None
+    
+    def _record_slug(self, player_name, player_data, slug):
+        """Registrar en el mapa de identidades el slug (nombre-ID) que resolvió al jugador"""
+        if slug and player_data and player_data.get('name') and (player_data.get('market_value') or 0) > 0:
+            self.identity_map.record(player_name, player_data.get('name'), besoccer_slug=slug.strip('/'))
+    
     def _scrape_player_data(self, player_name):
         """Scraping real de BeSoccer - Usando búsqueda directa en la página principal"""
         try:
@@ -435,7 +489,9 @@ class BeSoccerScraper:
                     # Verificar si el texto coincide con el nombre buscado
                     if search_name in text.lower() or any(word in text.lower() for word in search_name.split()):
                         logger.info(f"✅ Enlace encontrado: {href} -> ID: {player_id}")
-                        return self._scrape_player_details_by_slug(player_slug)
+                        player_data = self._scrape_player_details_by_slug(player_slug)
+                        self._record_slug(player_name, player_data, player_slug)
+                        return player_data
             
             logger.warning(f"⚠️ No se encontró jugador en BeSoccer para {player_name}")
             return None
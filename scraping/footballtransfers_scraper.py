@@ -8,6 +8,15 @@ from datetime import datetime, timedelta
 import re
 from urllib.parse import quote
 import logging
+import sys
+import threading
+
+# Agregar directorio raíz del proyecto al path (el scraper también se corre suelto)
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from scraping.player_identity import get_player_identity_map
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -18,6 +27,8 @@ class FootballTransfersScraper:
         self.session = requests.Session()
         self.cache_file = "footballtransfers_cache.json"
         self.cache = self.load_cache()
+        self._cache_lock = threading.Lock()
+        self.identity_map = get_player_identity_map()
         
         # Headers para FootballTransfers
         # NOTA: No incluir Accept-Encoding explícitamente, requests lo maneja automáticamente
@@ -47,10 +58,13 @@ class FootballTransfersScraper:
         return {}
     
     def save_cache(self):
-        """Guardar cache en archivo"""
+        """Guardar cache en archivo (bajo lock: compare_players busca varios jugadores en paralelo)"""
         try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache, f, ensure_ascii=False, indent=2)
+            with self._cache_lock:
+                tmp_file = f"{self.cache_file}.{threading.get_ident()}.tmp"
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(self.cache, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_file, self.cache_file)
         except Exception as e:
             logger.error(f"Error guardando cache: {e}")
     
@@ -70,17 +84,20 @@ class FootballTransfersScraper:
             logger.info(f"✅ Cache hit para {player_name}")
             return self.cache[normalized_name]['data']
         
-        # 2. Scraping en vivo
+        # 2. Perfil ya conocido (un request) o scraping en vivo
         try:
-            logger.info(f"🌐 Scraping en vivo para {player_name}")
-            player_data = self._scrape_player_data(player_name)
+            player_data = self._scrape_known_profile(player_name)
+            if not player_data:
+                logger.info(f"🌐 Scraping en vivo para {player_name}")
+                player_data = self._scrape_player_data(player_name)
             
             # Solo guardar en cache si obtuvimos datos válidos
             if player_data and player_data.get('market_value', 0) > 0:
-                self.cache[normalized_name] = {
-                    'data': player_data,
-                    'timestamp': datetime.now().isoformat()
-                }
+                with self._cache_lock:
+                    self.cache[normalized_name] = {
+                        'data': player_data,
+                        'timestamp': datetime.now().isoformat()
+                    }
                 self.save_cache()
                 logger.info(f"✅ Datos guardados en cache para {player_name}")
                 return player_data
@@ -132,18 +149,8 @@ class FootballTransfersScraper:
             
             if is_player:
                 # Extraer datos del jugador
-                player_data = {
-                    'name': self._extract_name(soup),
-                    'current_club': self._extract_current_club(soup),
-                    'market_value': self._extract_market_value(soup),
-                    'age': self._extract_age(soup),
-                    'position': self._extract_position(soup),
-                    'height': self._extract_height(soup),
-                    'weight': self._extract_weight(soup),
-                    'foot': self._extract_foot(soup),
-                    'nationality': self._extract_nationality(soup),
-                    'etv_range': self._extract_etv_range(soup),
-                }
+                player_data = self._extract_player_data(soup)
+                self._record_slug(player_name, player_data, search_slug)
                 
                 logger.info(f"✅ Datos extraídos de FootballTransfers: {player_data.get('name')}")
                 logger.info(f"   Market value: {player_data.get('market_value')}")
@@ -281,7 +288,9 @@ class FootballTransfersScraper:
                         # Verificar que es una página de jugador
                         if self._is_player_page(soup, player_name):
                             logger.info(f"✅ Encontrado con variación: {variation}")
-                            return self._scrape_player_from_url(search_url)
+                            player_data = self._scrape_player_from_url(search_url)
+                            self._record_slug(player_name, player_data, variation)
+                            return player_data
                         else:
                             # Debug: ver qué tipo de página es
                             title = soup.find('title')
@@ -325,25 +334,63 @@ class FootballTransfersScraper:
             soup = BeautifulSoup(response.content, 'html.parser')
             
             # Extraer datos del jugador
-            player_data = {
-                'name': self._extract_name(soup),
-                'current_club': self._extract_current_club(soup),
-                'market_value': self._extract_market_value(soup),
-                'age': self._extract_age(soup),
-                'position': self._extract_position(soup),
-                'height': self._extract_height(soup),
-                'weight': self._extract_weight(soup),
-                'foot': self._extract_foot(soup),
-                'nationality': self._extract_nationality(soup),
-                'etv_range': self._extract_etv_range(soup),
-            }
-            
-            return player_data
+            return self._extract_player_data(soup)
             
         except Exception as e:
             logger.error(f"❌ Error scraping desde URL: {e}")
             return None
     
+    def _scrape_known_profile(self, player_name):
+        """Ir directo al slug guardado en el mapa de identidades (None si no hay o no sirvió)"""
+        slug = self.identity_map.get(player_name).get('footballtransfers_slug')
+        if not slug:
+            return None
+        
+        player_url = f"https://www.footballtransfers.com/en/players/{slug}"
+        logger.info(f"🪪 Perfil conocido para {player_name}: {player_url}")
+        try:
+            time.sleep(random.uniform(1, 2))
+            response = self.session.get(player_url, timeout=15)
+            
+            if response.status_code == 200:
+                soup = BeautifulSoup(response.content, 'html.parser')
+                if self._is_player_page(soup, player_name):
+                    player_data = self._extract_player_data(soup)
+                    if (player_data.get('market_value') or 0) > 0:
+                        return player_data
+            elif response.status_code != 404:
+                # 403 u otro error transitorio: el slug se conserva para el próximo refresh
+                logger.warning(f"⚠️ Status {response.status_code} en perfil conocido de {player_name}")
+                return None
+        except Exception as e:
+            logger.warning(f"⚠️ Error en perfil conocido de {player_name}: {e}")
+            return None
+        
+        # 404 o página que ya no es del jugador: se olvida el slug y se vuelve a buscar
+        logger.warning(f"⚠️ Slug conocido inválido para {player_name}, se busca de nuevo")
+        self.identity_map.forget(player_name, 'footballtransfers_slug')
+        return None
+    
+    def _record_slug(self, player_name, player_data, slug):
+        """Registrar en el mapa de identidades el slug que resolvió al jugador"""
+        if player_data and (player_data.get('market_value') or 0) > 0:
+            self.identity_map.record(player_name, player_data.get('name'), footballtransfers_slug=slug)
+    
+    def _extract_player_data(self, soup):
+        """Datos del jugador desde la página de perfil"""
+        return {
+            'name': self._extract_name(soup),
+            'current_club': self._extract_current_club(soup),
+            'market_value': self._extract_market_value(soup),
+            'age': self._extract_age(soup),
+            'position': self._extract_position(soup),
+            'height': self._extract_height(soup),
+            'weight': self._extract_weight(soup),
+            'foot': self._extract_foot(soup),
+            'nationality': self._extract_nationality(soup),
+            'etv_range': self._extract_etv_range(soup),
+        }
+    
     def _extract_name(self, soup):
         """Extraer nombre del jugador"""
         try:
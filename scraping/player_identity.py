@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Player Identity Map - Identidad canónica de jugadores entre Transfermarkt, FootballTransfers y BeSoccer
+
+Cada scraper resolvía al jugador desde cero: Transfermarkt pedía la búsqueda y después el
+perfil, FootballTransfers adivinaba el slug y ante un 404 probaba variaciones, y BeSoccer
+abría el autocomplete con Selenium antes de llegar al perfil. Acá se guarda, por nombre
+normalizado, dónde está el perfil de cada jugador en cada sitio:
+
+    {"lionel messi": {"transfermarkt_id": "28003",
+                      "transfermarkt_url": "/lionel-messi/profil/spieler/28003",
+                      "footballtransfers_slug": "lionel-messi",
+                      "besoccer_slug": "lionel-messi-19054",
+                      "updated_at": "..."}}
+
+El mapa se completa con cada búsqueda exitosa (se persiste en JSON) y se siembra en memoria
+con los player_id de player_profiles.csv, así que un refresh va directo al perfil con un
+solo request. Si el perfil guardado ya no responde, el scraper lo olvida y vuelve a buscar.
+"""
+
+import os
+import json
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+from utils.player_index import fold_name
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IDENTITY_MAP_PATH = os.path.join(PROJECT_ROOT, 'data', 'player_identity_map.json')
+PLAYER_PROFILES_PATH = os.path.join(PROJECT_ROOT, 'data', 'extracted', 'player_profiles', 'player_profiles.csv')
+
+TRANSFERMARKT_PROFILE_PATH = "/{slug}/profil/spieler/{player_id}"
+IDENTITY_FIELDS = ('transfermarkt_id', 'transfermarkt_url', 'footballtransfers_slug', 'besoccer_slug')
+
+
+def transfermarkt_profile_path(player_id, slug: Optional[str] = None) -> str:
+    """Path del perfil de Transfermarkt (el slug es decorativo: el sitio resuelve por ID)"""
+    slug = slug or 'spieler'
+    return TRANSFERMARKT_PROFILE_PATH.format(slug=slug, player_id=player_id)
+
+
+class PlayerIdentityMap:
+    """Nombre normalizado -> identificadores del jugador en cada sitio"""
+
+    def __init__(self, path: str = IDENTITY_MAP_PATH):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}   # Aprendidas en búsquedas (se persisten)
+        self.seeded: Dict[str, Dict] = {}    # Sembradas desde player_profiles (solo en memoria)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ No se pudo leer el mapa de identidades ({self.path}): {e}")
+            self.entries = {}
+
+    def _save(self):
+        """Escritura atómica de las entradas aprendidas (llamar con _lock tomado)"""
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ No se pudo guardar el mapa de identidades: {e}")
+
+    def get(self, player_name) -> Dict:
+        """Identificadores conocidos del jugador (las entradas aprendidas pisan a las sembradas)"""
+        key = fold_name(player_name)
+        if not key:
+            return {}
+        with self._lock:
+            identity = dict(self.seeded.get(key, {}))
+            identity.update(self.entries.get(key, {}))
+            if any(identity.get(field) for field in IDENTITY_FIELDS):
+                self.hits += 1
+            else:
+                self.misses += 1
+        return identity
+
+    def record(self, player_name, canonical_name=None, **identifiers):
+        """
+        Registrar identificadores tras una búsqueda exitosa
+
+        Se guardan bajo el nombre buscado y, si es distinto, bajo el nombre que devolvió el sitio.
+        """
+        identifiers = {field: str(value) for field, value in identifiers.items()
+                       if field in IDENTITY_FIELDS and value}
+        keys = {key for key in (fold_name(player_name), fold_name(canonical_name)) if key}
+        if not identifiers or not keys:
+            return
+        with self._lock:
+            changed = False
+            for key in keys:
+                entry = self.entries.setdefault(key, {})
+                if any(entry.get(field) != value for field, value in identifiers.items()):
+                    entry.update(identifiers)
+                    entry['updated_at'] = datetime.now().isoformat()
+                    changed = True
+            if changed:
+                self._save()
+
+    def forget(self, player_name, *fields):
+        """Descartar identificadores que dejaron de funcionar (perfil movido o borrado)"""
+        key = fold_name(player_name)
+        with self._lock:
+            changed = False
+            for store in (self.entries, self.seeded):
+                entry = store.get(key)
+                if not entry:
+                    continue
+                for field in fields:
+                    if entry.pop(field, None) is not None:
+                        changed = changed or store is self.entries
+            if changed:
+                self._save()
+
+    def seed_from_profiles(self, profiles=None) -> int:
+        """
+        Sembrar los IDs de Transfermarkt desde player_profiles (DataFrame o CSV por defecto)
+
+        Los nombres repetidos (dos jugadores con el mismo nombre) no se siembran: ir directo al
+        perfil equivocado es peor que buscar. Devuelve la cantidad de nombres sembrados.
+        """
+        if profiles is None:
+            if not os.path.exists(PLAYER_PROFILES_PATH):
+                return 0
+            try:
+                import pandas as pd
+                profiles = pd.read_csv(PLAYER_PROFILES_PATH, low_memory=False,
+                                       usecols=lambda column: column in ('player_id', 'player_slug', 'player_name'))
+            except Exception as e:
+                print(f"⚠️ No se pudo sembrar el mapa de identidades: {e}")
+                return 0
+
+        columns = getattr(profiles, 'columns', ())
+        if 'player_id' not in columns or 'player_name' not in columns:
+            return 0
+        slugs = profiles['player_slug'].tolist() if 'player_slug' in columns else [None] * len(profiles)
+
+        seeded, ambiguous = {}, set()
+        for name, player_id, slug in zip(profiles['player_name'].tolist(), profiles['player_id'].tolist(), slugs):
+            key = fold_name(name)
+            try:
+                player_id = str(int(float(player_id)))
+            except (ValueError, TypeError):
+                continue
+            if not key or key in ambiguous:
+                continue
+            if key in seeded and seeded[key]['transfermarkt_id'] != player_id:
+                del seeded[key]
+                ambiguous.add(key)
+                continue
+            slug = slug if isinstance(slug, str) and slug else key.replace(' ', '-')
+            seeded[key] = {'transfermarkt_id': player_id,
+                           'transfermarkt_url': transfermarkt_profile_path(player_id, slug)}
+
+        with self._lock:
+            self.seeded = seeded
+        print(f"🪪 Mapa de identidades: {len(seeded)} jugadores sembrados desde player_profiles "
+              f"({len(ambiguous)} nombres ambiguos omitidos)")
+        return len(seeded)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'learned': len(self.entries), 'seeded': len(self.seeded),
+                    'hits': self.hits, 'misses': self.misses}
+
+
+_identity_map = None
+_identity_map_lock = threading.Lock()
+
+
+def get_player_identity_map() -> PlayerIdentityMap:
+    """Instancia compartida por los scrapers y la app"""
+    global _identity_map
+    if _identity_map is None:
+        with _identity_map_lock:
+            if _identity_map is None:
+                _identity_map = PlayerIdentityMap()
+    return _identity_map
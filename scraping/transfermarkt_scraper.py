@@ -6,8 +6,17 @@ import json
 import os
 from datetime import datetime, timedelta
 import re
-from urllib.parse import quote, urljoin
+from urllib.parse import quote, urljoin, urlparse
 import logging
+import sys
+import threading
+
+# Agregar directorio raíz del proyecto al path (el scraper también se corre suelto)
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from scraping.player_identity import get_player_identity_map
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -18,6 +27,8 @@ class TransfermarktScraper:
         self.session = requests.Session()
         self.cache_file = "transfermarkt_cache.json"
         self.cache = self.load_cache()
+        self._cache_lock = threading.Lock()
+        self.identity_map = get_player_identity_map()
         
         # Headers más robustos para evitar detección 403
         self.headers = {
@@ -58,10 +69,13 @@ class TransfermarktScraper:
         return {}
     
     def save_cache(self):
-        """Guardar cache en archivo"""
+        """Guardar cache en archivo (bajo lock: compare_players busca varios jugadores en paralelo)"""
         try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache, f, ensure_ascii=False, indent=2)
+            with self._cache_lock:
+                tmp_file = f"{self.cache_file}.{threading.get_ident()}.tmp"
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(self.cache, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_file, self.cache_file)
         except Exception as e:
             logger.error(f"Error guardando cache: {e}")
     
@@ -88,20 +102,26 @@ class TransfermarktScraper:
         # 2. Rotar User-Agent antes de hacer request
         self.rotate_user_agent()
         
-        # 3. Esperar un poco para evitar rate limiting (más tiempo en producción)
-        time.sleep(random.uniform(2, 4))
+        # 3. Perfil ya conocido: un solo request, sin pasar por la búsqueda
+        player_data = self._scrape_known_profile(player_name)
+        
+        # 4. Esperar un poco para evitar rate limiting (más tiempo en producción)
+        if not player_data:
+            time.sleep(random.uniform(2, 4))
         
-        # 4. Scraping en vivo con manejo robusto de 403
+        # 5. Scraping en vivo con manejo robusto de 403
         try:
-            logger.info(f"🌐 Scraping en vivo para {player_name}")
-            player_data = self._scrape_player_data(player_name)
+            if not player_data:
+                logger.info(f"🌐 Scraping en vivo para {player_name}")
+                player_data = self._scrape_player_data(player_name)
             
             # Solo guardar en cache si obtuvimos datos válidos
             if player_data and player_data.get('market_value', 0) > 0:
-                self.cache[player_name] = {
-                    'data': player_data,
-                    'timestamp': datetime.now().isoformat()
-                }
+                with self._cache_lock:
+                    self.cache[player_name] = {
+                        'data': player_data,
+                        'timestamp': datetime.now().isoformat()
+                    }
                 self.save_cache()
                 logger.info(f"✅ Datos guardados en cache para {player_name}")
                 return player_data
@@ -159,7 +179,7 @@ class TransfermarktScraper:
                     return self._try_alternative_search(player_name)
                 
                 # Scraping de datos del jugador
-                return self._scrape_player_details(player_link)
+                return self._scrape_and_record(player_name, player_link)
                 
             except requests.exceptions.RequestException as e:
                 logger.error(f"Error en request: {e}")
@@ -213,7 +233,7 @@ class TransfermarktScraper:
                 player_link = self._find_player_link(soup, player_name)
                 if player_link:
                     logger.info(f"Encontrado con variación {variation}: {player_link}")
-                    return self._scrape_player_details(player_link)
+                    return self._scrape_and_record(player_name, player_link)
                     
             except Exception as e:
                 logger.error(f"Error en búsqueda alternativa {variation}: {e}")
@@ -221,6 +241,48 @@ class TransfermarktScraper:
         
         return None
     
+    def _scrape_known_profile(self, player_name):
+        """Ir directo al perfil guardado en el mapa de identidades (None si no hay o no sirvió)"""
+        identity = self.identity_map.get(player_name)
+        player_path = identity.get('transfermarkt_url')
+        if not player_path:
+            return None
+        
+        logger.info(f"🪪 Perfil conocido para {player_name}: {player_path}")
+        try:
+            time.sleep(random.uniform(1, 2))
+            response = self.session.get(urljoin("https://www.transfermarkt.com", player_path), timeout=10)
+            
+            if response.status_code == 200:
+                player_data = self._parse_player_details(BeautifulSoup(response.content, 'html.parser'))
+                if (player_data.get('market_value') or 0) > 0:
+                    self.identity_map.record(player_name, player_data.get('name'),
+                                             transfermarkt_id=identity.get('transfermarkt_id'),
+                                             transfermarkt_url=player_path)
+                    return player_data
+            elif response.status_code not in (404, 410):
+                # 403 u otro error transitorio: el perfil se conserva para el próximo refresh
+                logger.warning(f"⚠️ Status {response.status_code} en perfil conocido de {player_name}")
+                return None
+        except Exception as e:
+            logger.warning(f"⚠️ Error en perfil conocido de {player_name}: {e}")
+            return None
+        
+        # 404/410 o página que no es un perfil válido (ID movido): se olvida y se vuelve a buscar
+        logger.warning(f"⚠️ Perfil conocido inválido para {player_name}, se busca de nuevo")
+        self.identity_map.forget(player_name, 'transfermarkt_id', 'transfermarkt_url')
+        return None
+    
+    def _scrape_and_record(self, player_name, player_link):
+        """Scrapear el perfil encontrado por la búsqueda y registrarlo en el mapa de identidades"""
+        player_data = self._scrape_player_details(player_link)
+        if player_data and (player_data.get('market_value') or 0) > 0:
+            player_id = re.search(r'/spieler/(\d+)', player_link)
+            self.identity_map.record(player_name, player_data.get('name'),
+                                     transfermarkt_id=player_id.group(1) if player_id else None,
+                                     transfermarkt_url=urlparse(player_link).path or player_link)
+        return player_data
+    
     def _find_player_link(self, soup, player_name):
         """Encontrar enlace del jugador en resultados de búsqueda"""
         # Buscar enlaces de jugadores
@@ -288,28 +350,27 @@ class TransfermarktScraper:
             response = self.session.get(player_url, timeout=10)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extraer datos
-            player_data = {
-                'name': self._extract_name(soup),
-                'current_club': self._extract_current_club(soup),
-                'market_value': self._extract_market_value(soup),
-                'age': self._extract_age(soup),
-                'position': self._extract_position(soup),
-                'height': self._extract_height(soup),
-                'foot': self._extract_foot(soup),
-                'nationality': self._extract_nationality(soup),
-                'contract_until': self._extract_contract_until(soup),
-                'photo_url': self._extract_photo_url(soup)
-            }
-            
-            return player_data
+            return self._parse_player_details(BeautifulSoup(response.content, 'html.parser'))
             
         except Exception as e:
             logger.error(f"Error scraping detalles: {e}")
             return None
     
+    def _parse_player_details(self, soup):
+        """Extraer los datos del jugador de la página de perfil"""
+        return {
+            'name': self._extract_name(soup),
+            'current_club': self._extract_current_club(soup),
+            'market_value': self._extract_market_value(soup),
+            'age': self._extract_age(soup),
+            'position': self._extract_position(soup),
+            'height': self._extract_height(soup),
+            'foot': self._extract_foot(soup),
+            'nationality': self._extract_nationality(soup),
+            'contract_until': self._extract_contract_until(soup),
+            'photo_url': self._extract_photo_url(soup)
+        }
+    
     def _extract_name(self, soup):
         """Extraer nombre del jugador"""
         try:
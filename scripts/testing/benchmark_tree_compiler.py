@@ -0,0 +1,77 @@
+"""
+Benchmark del compilador de árboles: latencia por llamada de model.predict vs el modelo compilado
+(1 fila = /search, 200 filas = /squad/valuation) y verificación de salidas idénticas bit a bit
+"""
+
+import sys
+import os
+import time
+
+# Agregar directorio raíz del proyecto al path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+import pickle
+import numpy as np
+
+from models.predictors.model_backends import find_model_file, load_model_file
+from models.predictors.tree_compiler import compile_model
+
+MODELS_PATH = sys.argv[1] if len(sys.argv) > 1 else os.path.join(project_root, 'models', 'trained')
+BATCH_SIZES = [1, 10, 64, 200]
+REPEATS = 200
+
+def time_calls(predict, X, repeats):
+    """Tiempos por llamada en ms (mediana, p95)"""
+    times = []
+    for i in range(repeats):
+        start = time.perf_counter()
+        predict(X)
+        times.append(time.perf_counter() - start)
+    times = np.array(times) * 1000
+    return float(np.median(times)), float(np.percentile(times, 95))
+
+def benchmark(model_name, scaler_name):
+    model_file = find_model_file(MODELS_PATH, model_name)
+    if model_file is None:
+        print(f"   ⚠️  {model_name}: modelo no encontrado")
+        return
+
+    try:
+        model = load_model_file(model_file)
+        with open(os.path.join(MODELS_PATH, f'{scaler_name}.pkl'), 'rb') as f:
+            scaler = pickle.load(f)
+    except Exception as e:
+        print(f"   ❌ {model_name}: error cargando modelo ({e})")
+        return
+
+    start = time.perf_counter()
+    compiled = compile_model(model)
+    if compiled is None:
+        return
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    print(f"\n📈 {model_name} ({type(model).__name__}) - compilado en {compile_ms:.0f} ms")
+    print(f"   {'filas':>7} {'predict ms':>12} {'p95':>8} {'compilado ms':>13} {'p95':>8} {'speedup':>8} {'idéntico':>9}")
+
+    rng = np.random.default_rng(42)
+    for batch_size in BATCH_SIZES:
+        # Filas en el espacio escalado (lo que recibe el modelo en los predictores)
+        X = rng.normal(size=(batch_size, scaler.n_features_in_))
+        repeats = max(5, REPEATS // max(1, batch_size // 100))
+
+        identical = np.array_equal(model.predict(X), compiled.predict(X))
+        base_median, base_p95 = time_calls(model.predict, X, repeats)
+        fast_median, fast_p95 = time_calls(compiled.predict, X, repeats)
+
+        print(f"   {batch_size:>7,} {base_median:>12.3f} {base_p95:>8.3f} {fast_median:>13.3f} {fast_p95:>8.3f} "
+              f"{base_median / fast_median:>7.1f}x {'✅' if identical else '❌':>8}")
+
+print("="*70)
+print("   BENCHMARK: COMPILADOR DE ÁRBOLES")
+print("="*70)
+
+benchmark('value_change_model', 'value_change_scaler')
+benchmark('maximum_price_model', 'maximum_price_scaler')
+
+print("\n" + "="*70)
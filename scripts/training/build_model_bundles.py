@@ -0,0 +1,105 @@
+"""
+TrueSign - Generación de bundles de modelos
+Empaqueta los .pkl sueltos de models/trained/ (modelo, scaler y encoders) en bundles
+versionados (manifest.json + payloads joblib mapeables) que cargan los predictores 2025
+"""
+
+import os
+import sys
+import pickle
+import warnings
+warnings.filterwarnings('ignore')
+
+# Agregar directorio raíz del proyecto al path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from models.predictors.model_bundle import (write_model_bundle, load_model_bundle, read_manifest,
+                                            check_compatibility, check_sources, ModelBundleError)
+from models.predictors.model_backends import find_model_file, load_model_file
+
+# Mismo orden que prepare_features_* en train_models_verbose.py y _prepare_features de los predictores
+VALUE_CHANGE_FEATURES = [
+    'age', 'height', 'value', 'position_encoded', 'nationality_encoded', 'foot_encoded',
+    'sqrt_value', 'age_squared', 'age_cubed', 'height_normalized', 'log_value', 'value_millions',
+    'age_value_interaction', 'position_nationality_interaction', 'position_value_interaction',
+    'height_age_interaction', 'is_young', 'is_veteran', 'is_prime',
+]
+MAXIMUM_PRICE_FEATURES = [
+    'age', 'height', 'value_at_transfer', 'position_encoded', 'nationality_encoded', 'foot_encoded',
+    'sqrt_value', 'age_squared', 'log_value', 'value_millions', 'age_value_interaction',
+    'position_value_interaction', 'is_young', 'is_veteran',
+]
+
+# bundle -> (modelo, scaler, {nombre en el bundle: archivo .pkl del encoder}, features)
+BUNDLES = {
+    'value_change': ('value_change_model', 'value_change_scaler',
+                     {'position_encoder': 'position_encoder', 'nationality_encoder': 'nationality_encoder'},
+                     VALUE_CHANGE_FEATURES),
+    'maximum_price': ('maximum_price_model', 'maximum_price_scaler',
+                      {'position_encoder': 'position_encoder_price', 'nationality_encoder': 'nationality_encoder_price'},
+                      MAXIMUM_PRICE_FEATURES),
+}
+
+def load_pickle(models_path, name):
+    with open(os.path.join(models_path, f'{name}.pkl'), 'rb') as f:
+        return pickle.load(f)
+
+def bundle_is_current(models_path, bundle_name):
+    """El bundle existe, es compatible con el entorno y sus .pkl fuente no cambiaron"""
+    bundle_path = os.path.join(models_path, bundle_name)
+    try:
+        manifest = read_manifest(bundle_path)
+    except ModelBundleError:
+        return False
+    return not check_compatibility(manifest) and not check_sources(bundle_path, manifest)
+
+def build_bundle(models_path, bundle_name):
+    model_name, scaler_name, encoder_files, features = BUNDLES[bundle_name]
+
+    model_file = find_model_file(models_path, model_name)
+    if model_file is None:
+        raise FileNotFoundError(f"{model_name} no encontrado en {models_path}")
+
+    model = load_model_file(model_file)
+    scaler = load_pickle(models_path, scaler_name)
+    encoders = {name: load_pickle(models_path, file_name) for name, file_name in encoder_files.items()}
+
+    sources = {'model': model_file, 'scaler': os.path.join(models_path, f'{scaler_name}.pkl')}
+    sources.update({name: os.path.join(models_path, f'{file_name}.pkl') for name, file_name in encoder_files.items()})
+
+    bundle_path = os.path.join(models_path, bundle_name)
+    manifest = write_model_bundle(bundle_path, model, scaler, encoders, features, sources=sources)
+    # Verificar que el bundle recién escrito carga y predice en este entorno
+    load_model_bundle(bundle_path)
+
+    total_mb = sum(a['bytes'] for a in manifest['artifacts'].values()) / 1e6
+    print(f"   ✅ {bundle_name}: {', '.join(manifest['artifacts'])} ({total_mb:.1f} MB) → {bundle_path}")
+    return manifest
+
+def main():
+    # Uso: build_model_bundles.py [models_path] [--if-stale]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    only_stale = '--if-stale' in sys.argv
+    models_path = args[0] if args else os.path.join(project_root, 'models', 'trained')
+
+    print("\n" + "="*70)
+    print("   TRUESIGN - BUNDLES DE MODELOS")
+    print("="*70)
+
+    failed = 0
+    for bundle_name in BUNDLES:
+        if only_stale and bundle_is_current(models_path, bundle_name):
+            print(f"   ✅ {bundle_name}: al día con sus .pkl")
+            continue
+        try:
+            build_bundle(models_path, bundle_name)
+        except Exception as e:
+            failed += 1
+            print(f"   ❌ {bundle_name}: {e}")
+
+    print("="*70 + "\n")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+TrueSign - Comparación de backends de entrenamiento
+Entrena cada backend disponible sobre el mismo dataset y reporta tiempo de entrenamiento,
+latencia de inferencia (1 fila y lote), tamaño en disco y MAE
+"""
+
+import os
+import sys
+import io
+import json
+import time
+import pickle
+import tempfile
+import contextlib
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from sklearn.model_selection import train_test_split
+import warnings
+warnings.filterwarnings('ignore')
+
+from train_models_verbose import VerboseModelTrainer, BACKENDS, histogram_backend, export_native_model
+from training_cache import json_default
+
+DATASETS = {
+    'value_change': ('data/training/value_change_dataset.csv', 'prepare_features_value_change'),
+    'maximum_price': ('data/training/maximum_price_dataset.csv', 'prepare_features_maximum_price'),
+}
+
+class BackendComparison:
+    # Llamadas de predict de 1 fila para la mediana de latencia (caso /predict de la API)
+    LATENCY_REPEATS = 200
+    # Filas del lote (caso /squad/valuation y /compare)
+    BATCH_SIZE = 10_000
+
+    def __init__(self, model_name='value_change', backends=BACKENDS, report_path="models/trained"):
+        self.model_name = model_name
+        self.backends = backends
+        self.report_path = report_path
+        self.rows = []
+
+    def available_backends(self):
+        """Backends cuyas dependencias están instaladas"""
+        available = []
+        for backend in self.backends:
+            if backend != 'sklearn':
+                try:
+                    histogram_backend(backend)
+                except ImportError as e:
+                    print(f"   ⚠️  {backend}: {e}")
+                    continue
+            available.append(backend)
+        return available
+
+    def measure_latency(self, model, X):
+        """(mediana ms de predict con 1 fila, ms totales del lote)"""
+        single = []
+        for i in range(self.LATENCY_REPEATS):
+            row = X[i % len(X)].reshape(1, -1)
+            start = time.perf_counter()
+            model.predict(row)
+            single.append(time.perf_counter() - start)
+
+        batch = np.resize(X, (self.BATCH_SIZE, X.shape[1]))
+        start = time.perf_counter()
+        model.predict(batch)
+        batch_seconds = time.perf_counter() - start
+
+        return float(np.median(single)) * 1000, batch_seconds * 1000
+
+    def model_size(self, model):
+        """Tamaño en disco del pickle y, si existe, del formato nativo"""
+        sizes = {'pickle_mb': len(pickle.dumps(model)) / 1e6}
+        with tempfile.TemporaryDirectory() as tmp:
+            native_path = export_native_model(model, tmp, 'model')
+            if native_path:
+                sizes['native_mb'] = os.path.getsize(native_path) / 1e6
+        return sizes
+
+    def run_backend(self, backend, df, prepare_method):
+        trainer = VerboseModelTrainer(backend=backend)
+        trainer.search_checkpoints = False
+
+        X, y, _ = getattr(trainer, prepare_method)(df.copy())
+        start = time.perf_counter()
+        # La salida de cada entrenamiento es muy larga: solo se reporta el resumen
+        with contextlib.redirect_stdout(io.StringIO()):
+            model, scaler, results = trainer.train_optimized(X, y, self.model_name)
+        train_seconds = time.perf_counter() - start
+
+        # Mismo split que train_optimized
+        _, X_test, _, _ = train_test_split(X, y, test_size=0.2, random_state=42)
+        X_test_scaled = scaler.transform(X_test)
+        single_ms, batch_ms = self.measure_latency(model, X_test_scaled)
+
+        winner = min(results, key=lambda k: results[k]['test_mae'])
+        row = {
+            'backend': backend,
+            'model': winner,
+            'train_seconds': train_seconds,
+            'single_row_ms': single_ms,
+            'batch_ms': batch_ms,
+            'batch_us_per_row': batch_ms * 1000 / self.BATCH_SIZE,
+            'test_mae': results[winner]['test_mae'],
+            'test_r2': results[winner]['test_r2'],
+            **self.model_size(model),
+        }
+        self.rows.append(row)
+        print(f"   ✅ {backend}: {winner} | train {train_seconds:.1f}s | MAE {row['test_mae']:.2f}")
+        return row
+
+    def run(self):
+        dataset_path, prepare_method = DATASETS[self.model_name]
+        print(f"\n📊 COMPARANDO BACKENDS ({self.model_name})...")
+        print("="*70)
+
+        df = pd.read_csv(dataset_path)
+        for backend in self.available_backends():
+            try:
+                self.run_backend(backend, df, prepare_method)
+            except Exception as e:
+                print(f"   ❌ {backend}: {e}")
+
+        self.print_report()
+        self.save_report()
+        return self.rows
+
+    def print_report(self):
+        print("\n" + "="*70)
+        print(f"{'backend':<10} {'modelo':<22} {'train s':>8} {'1 fila ms':>10} {'lote ms':>9} {'MB':>7} {'MAE':>12}")
+        print("-"*70)
+        for row in sorted(self.rows, key=lambda r: r['test_mae']):
+            print(f"{row['backend']:<10} {row['model']:<22} {row['train_seconds']:>8.1f} {row['single_row_ms']:>10.3f} "
+                  f"{row['batch_ms']:>9.1f} {row['pickle_mb']:>7.2f} {row['test_mae']:>12.2f}")
+        print("="*70)
+
+    def save_report(self):
+        os.makedirs(self.report_path, exist_ok=True)
+        path = os.path.join(self.report_path, f'backend_comparison_{self.model_name}.json')
+        with open(path, 'w') as f:
+            json.dump({
+                'generated_at': datetime.now().isoformat(timespec='seconds'),
+                'dataset': self.model_name,
+                'batch_size': self.BATCH_SIZE,
+                'results': self.rows,
+            }, f, indent=2, default=json_default)
+        print(f"💾 Reporte guardado en {path}")
+
+def main():
+    model_name = next((arg.split('=', 1)[1] for arg in sys.argv if arg.startswith('--dataset=')), 'value_change')
+    backends = next((arg.split('=', 1)[1].split(',') for arg in sys.argv if arg.startswith('--backends=')), BACKENDS)
+
+    print("\n" + "="*70)
+    print("   TRUESIGN - COMPARACIÓN DE BACKENDS")
+    print("="*70)
+
+    BackendComparison(model_name=model_name, backends=backends).run()
+
+if __name__ == "__main__":
+    main()
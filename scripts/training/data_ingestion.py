@@ -0,0 +1,167 @@
+"""
+Streaming Ingestion for TrueSign ML Models
+Convierte los CSVs de extracted_data/ a Parquet particionado (data/parquet/) leyendo por chunks,
+con dtypes explícitos y solo las columnas que usan los builders de data_preparation.py
+"""
+
+import os
+import json
+import shutil
+import pandas as pd
+from tqdm import tqdm
+import warnings
+warnings.filterwarnings('ignore')
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+from data_preparation import DataPreparation
+
+class StreamingIngestion:
+    # Filas por chunk: mantiene el pico de memoria acotado aunque el CSV pese cientos de MB
+    CHUNK_SIZE = 500_000
+
+    # Columna de partición por tabla (None = dataset sin particionar)
+    PARTITIONS = {
+        'player_market_value': 'year',   # Derivada de date_unix
+        'transfer_history': None,
+        'player_performances': None,
+        'player_profiles': None,
+        'team_details': None,
+    }
+
+    def __init__(self, base_path="extracted_data", output_path="data/parquet", chunk_size=CHUNK_SIZE):
+        if pq is None:
+            raise ImportError("pyarrow es necesario para la ingesta a Parquet (pip install pyarrow)")
+        self.base_path = base_path
+        self.output_path = output_path
+        self.chunk_size = chunk_size
+
+    def _read_chunks(self, name):
+        """Itera el CSV por chunks con la misma proyección y dtypes que DataPreparation"""
+        dtypes, date_columns = DataPreparation.CSV_SCHEMAS[name]
+        wanted = set(dtypes) | set(date_columns)
+        # category por chunk daría diccionarios distintos en cada archivo: se escribe como string
+        chunk_dtypes = {c: ('string' if t == 'category' else t) for c, t in dtypes.items()}
+
+        reader = pd.read_csv(
+            f'{self.base_path}/{name}/{name}.csv',
+            usecols=lambda column: column in wanted,
+            dtype=chunk_dtypes,
+            chunksize=self.chunk_size,
+        )
+        for chunk in reader:
+            for column in date_columns:
+                if column in chunk.columns:
+                    chunk[column] = pd.to_datetime(chunk[column], errors='coerce')
+            yield chunk
+
+    def _write_chunk(self, chunk, name, part):
+        """Escribe un chunk como archivo(s) nuevos del dataset Parquet de la tabla"""
+        partition_column = self.PARTITIONS.get(name)
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        pq.write_to_dataset(
+            table,
+            root_path=os.path.join(self.output_path, name),
+            partition_cols=[partition_column] if partition_column else None,
+            basename_template=f'part-{part:05d}-{{i}}.parquet',
+        )
+
+    def ingest_table(self, name):
+        """Convierte un CSV a Parquet chunk por chunk; devuelve filas escritas"""
+        target = os.path.join(self.output_path, name)
+        if os.path.exists(target):
+            shutil.rmtree(target)
+
+        rows = 0
+        for part, chunk in enumerate(tqdm(self._read_chunks(name), desc=f"   {name}", unit="chunk")):
+            if name == 'player_market_value':
+                chunk['year'] = chunk['date_unix'].dt.year.fillna(0).astype('int16')
+            self._write_chunk(chunk, name, part)
+            rows += len(chunk)
+
+        self.record_source(name)
+        print(f"   ✅ {name}: {rows:,} registros → {target}")
+        return rows
+    
+    def record_source(self, name):
+        """Registrar tamaño y mtime del CSV ingestado (DataPreparation re-ingesta si cambian)"""
+        manifest_path = os.path.join(self.output_path, DataPreparation.PARQUET_MANIFEST)
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            manifest = {}
+        manifest[name] = DataPreparation.source_signature(f'{self.base_path}/{name}/{name}.csv')
+        tmp_path = manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, manifest_path)
+
+    def ingest_performances_aggregated(self):
+        """
+        Agrega player_performances por (player_id, season_name, team_id) de forma incremental:
+        sumas parciales por chunk y una reducción final sobre las parciales (mucho más chicas)
+        """
+        keys = ['player_id', 'season_name', 'team_id']
+        partials = []
+
+        for chunk in tqdm(self._read_chunks('player_performances'), desc="   player_performances_agg", unit="chunk"):
+            stat_columns = [c for c in ['minutes_played', 'goals', 'assists'] if c in chunk.columns]
+            partials.append(chunk.groupby(keys, as_index=False, dropna=False)[stat_columns].sum())
+
+        if not partials:
+            return 0
+
+        aggregated = pd.concat(partials, ignore_index=True)
+        stat_columns = [c for c in aggregated.columns if c not in keys]
+        aggregated = aggregated.groupby(keys, as_index=False, dropna=False)[stat_columns].sum()
+
+        target = os.path.join(self.output_path, 'player_performances_agg')
+        if os.path.exists(target):
+            shutil.rmtree(target)
+        self._write_chunk(aggregated, 'player_performances_agg', 0)
+
+        print(f"   ✅ player_performances_agg: {len(aggregated):,} registros → {target}")
+        return len(aggregated)
+
+    def ingest_all(self):
+        """Ingesta completa de todas las tablas que usa DataPreparation"""
+        return self.ingest_tables(list(DataPreparation.CSV_SCHEMAS))
+
+    def ingest_tables(self, names):
+        """Ingesta de las tablas indicadas (player_performances también regenera su agregado)"""
+        print("\n📦 INGESTA POR CHUNKS A PARQUET...")
+        print("="*70)
+
+        os.makedirs(self.output_path, exist_ok=True)
+        summary = {}
+        for name in names:
+            try:
+                summary[name] = self.ingest_table(name)
+            except FileNotFoundError:
+                print(f"   ⚠️  {name}.csv no encontrado, se omite")
+
+        if 'player_performances' in summary:
+            summary['player_performances_agg'] = self.ingest_performances_aggregated()
+
+        return summary
+
+def main():
+    print("\n" + "="*70)
+    print("   TRUESIGN - INGESTA DE DATOS A PARQUET")
+    print("="*70)
+
+    ingestion = StreamingIngestion()
+    summary = ingestion.ingest_all()
+
+    print("\n" + "="*70)
+    print(f"   ✅ INGESTA COMPLETADA ({len(summary)} tablas)")
+    print("="*70 + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -5,40 +5,168 @@ Prepara datos de extracted_data/ para entrenamiento de modelos ML
 
 import pandas as pd
 import numpy as np
+import os
+import json
 from datetime import datetime
 from tqdm import tqdm
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None  # Sin pyarrow se trabaja solo con los CSV
+
 class DataPreparation:
+    # Lectura tipada: solo las columnas que usan los builders, con dtype explícito
+    # (nombre de archivo -> (dtypes, columnas de fecha))
+    CSV_SCHEMAS = {
+        'player_profiles': ({
+            'player_id': 'Int64',
+            'height': 'float32',
+            'position': 'category',
+            'main_position': 'category',
+            'foot': 'category',
+            'citizenship': 'category',
+        }, ['date_of_birth']),
+        'transfer_history': ({
+            'player_id': 'Int64',
+            'season_name': 'string',
+            'from_team_id': 'float64',
+            'to_team_id': 'float64',
+            'transfer_fee': 'float64',
+            'value_at_transfer': 'float64',
+        }, ['transfer_date']),
+        'player_market_value': ({
+            'player_id': 'Int64',
+            'value': 'float64',
+        }, ['date_unix']),
+        'player_performances': ({
+            'player_id': 'Int64',
+            'season_name': 'string',
+            'team_id': 'float64',
+            'minutes_played': 'float32',
+            'goals': 'float32',
+            'assists': 'float32',
+        }, []),
+        'team_details': ({
+            'club_id': 'Int64',
+            'club_name': 'string',
+            'country_name': 'category',
+            'competition_id': 'category',
+        }, []),
+    }
+    
+    # Tablas en data/parquet/ (incluye las derivadas que escribe data_ingestion.py)
+    PARQUET_SCHEMAS = dict(CSV_SCHEMAS, player_performances_agg=CSV_SCHEMAS['player_performances'])
+    
+    # Registro de data_ingestion.py: tamaño y mtime del CSV del que salió cada tabla Parquet
+    PARQUET_MANIFEST = '_sources.json'
+    
     def __init__(self):
         self.base_path = "extracted_data"
-        
+        self.parquet_path = "data/parquet"  # Generado por data_ingestion.py
+        self.df_performances_agg = None
+    
+    def csv_path(self, name):
+        return f'{self.base_path}/{name}/{name}.csv'
+    
+    @staticmethod
+    def source_signature(path):
+        """Tamaño y mtime de un CSV (lo que registra la ingesta para detectar cambios)"""
+        stat = os.stat(path)
+        return {'size': stat.st_size, 'mtime': stat.st_mtime}
+    
+    def read_parquet_manifest(self):
+        try:
+            with open(os.path.join(self.parquet_path, self.PARQUET_MANIFEST), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+    
+    def stale_parquet_tables(self):
+        """
+        Tablas cuyo Parquet no corresponde al CSV actual: sin registro de ingesta, CSV con otro
+        tamaño o mtime, o tabla faltante. Sin CSV el Parquet es la única fuente y se usa tal cual.
+        """
+        manifest = self.read_parquet_manifest()
+        stale = []
+        for name in self.CSV_SCHEMAS:
+            csv_path = self.csv_path(name)
+            if not os.path.exists(csv_path):
+                continue
+            if (manifest.get(name) != self.source_signature(csv_path) or
+                    not os.path.isdir(os.path.join(self.parquet_path, name))):
+                stale.append(name)
+        return stale
+    
+    def read_typed_csv(self, name):
+        """Lee un CSV de extracted_data con usecols y dtypes explícitos"""
+        dtypes, date_columns = self.CSV_SCHEMAS[name]
+        wanted = set(dtypes) | set(date_columns)
+        df = pd.read_csv(
+            self.csv_path(name),
+            usecols=lambda column: column in wanted,
+            dtype=dtypes,
+        )
+        # Fechas a datetime64 una sola vez (las reusan todos los builders)
+        for column in date_columns:
+            if column in df.columns:
+                df[column] = pd.to_datetime(df[column], errors='coerce')
+        return df
+    
+    def read_parquet_table(self, name):
+        """Lee una tabla de data/parquet/ proyectando solo las columnas del esquema (memory-mapped)"""
+        dtypes, date_columns = self.PARQUET_SCHEMAS[name]
+        path = os.path.join(self.parquet_path, name)
+        available = set(pq.ParquetDataset(path).schema.names)
+        columns = [c for c in list(dtypes) + date_columns if c in available]
+        df = pd.read_parquet(path, columns=columns, memory_map=True)
+        # La ingesta escribe category como string: restaurar el dtype del esquema
+        for column, dtype in dtypes.items():
+            if dtype == 'category' and column in df.columns:
+                df[column] = df[column].astype('category')
+        return df
+    
     def load_data(self):
-        """Carga todos los CSVs necesarios"""
+        """Carga todos los CSVs necesarios (o el Parquet de data_ingestion.py si está al día)"""
+        if pq is not None and os.path.isdir(self.parquet_path):
+            stale = self.stale_parquet_tables()
+            if stale:
+                # Parquet viejo respecto de los CSV: re-ingestar esas tablas antes de entrenar
+                print(f"\n⚠️  Parquet desactualizado ({', '.join(stale)}): re-ingestando desde los CSV...")
+                try:
+                    from data_ingestion import StreamingIngestion
+                    StreamingIngestion(self.base_path, self.parquet_path).ingest_tables(stale)
+                    stale = self.stale_parquet_tables()
+                except Exception as e:
+                    print(f"   ❌ Error re-ingestando: {e}")
+            if not stale:
+                return self.load_parquet_data()
+            print(f"   ⚠️  Se cargan los CSV (Parquet desactualizado: {', '.join(stale)})")
+        
         print("\n📊 CARGANDO DATOS...")
         print("="*70)
         
         with tqdm(total=5, desc="Cargando archivos") as pbar:
             # Player Profiles
-            self.df_profiles = pd.read_csv(f'{self.base_path}/player_profiles/player_profiles.csv', 
-                                          low_memory=False)
+            self.df_profiles = self.read_typed_csv('player_profiles')
             pbar.update(1)
             
             # Transfer History
-            self.df_transfers = pd.read_csv(f'{self.base_path}/transfer_history/transfer_history.csv')
+            self.df_transfers = self.read_typed_csv('transfer_history')
             pbar.update(1)
             
             # Market Values
-            self.df_market_values = pd.read_csv(f'{self.base_path}/player_market_value/player_market_value.csv')
+            self.df_market_values = self.read_typed_csv('player_market_value')
             pbar.update(1)
             
             # Performances
-            self.df_performances = pd.read_csv(f'{self.base_path}/player_performances/player_performances.csv')
+            self.df_performances = self.read_typed_csv('player_performances')
             pbar.update(1)
             
             # Team Details
-            self.df_teams = pd.read_csv(f'{self.base_path}/team_details/team_details.csv')
+            self.df_teams = self.read_typed_csv('team_details')
             pbar.update(1)
             
         print(f"\n✅ Datos cargados:")
@@ -47,6 +175,31 @@ class DataPreparation:
         print(f"   - Valores de mercado: {len(self.df_market_values):,} registros")
         print(f"   - Performances: {len(self.df_performances):,} registros")
         print(f"   - Equipos: {len(self.df_teams):,} registros")
+    
+    def load_parquet_data(self):
+        """Carga las tablas desde data/parquet/ (solo las columnas que usan los builders)"""
+        print(f"\n📊 CARGANDO DATOS DESDE PARQUET ({self.parquet_path})...")
+        print("="*70)
+        
+        self.df_profiles = self.read_parquet_table('player_profiles')
+        self.df_transfers = self.read_parquet_table('transfer_history')
+        self.df_market_values = self.read_parquet_table('player_market_value')
+        self.df_teams = self.read_parquet_table('team_details')
+        
+        # Performances ya agregadas en la ingesta: no hace falta cargar la tabla cruda
+        if os.path.isdir(os.path.join(self.parquet_path, 'player_performances_agg')):
+            self.df_performances_agg = self.read_parquet_table('player_performances_agg')
+            self.df_performances = None
+        else:
+            self.df_performances = self.read_parquet_table('player_performances')
+        
+        performances = self.df_performances_agg if self.df_performances is None else self.df_performances
+        print(f"\n✅ Datos cargados:")
+        print(f"   - Perfiles: {len(self.df_profiles):,} jugadores")
+        print(f"   - Transferencias: {len(self.df_transfers):,} registros")
+        print(f"   - Valores de mercado: {len(self.df_market_values):,} registros")
+        print(f"   - Performances: {len(performances):,} registros")
+        print(f"   - Equipos: {len(self.df_teams):,} registros")
         
     def calculate_age_from_date(self, date_of_birth, reference_date):
         """Calcula edad desde fecha de nacimiento"""
@@ -60,6 +213,14 @@ class DataPreparation:
         except:
             return None
     
+    def add_age(self, df, reference_column):
+        """Agrega la columna age (años cumplidos a la fecha de referencia) con aritmética vectorizada"""
+        date_of_birth = pd.to_datetime(df['date_of_birth'], errors='coerce')
+        reference_date = pd.to_datetime(df[reference_column], errors='coerce')
+        # Mismo cálculo que calculate_age_from_date: int(días / 365.25)
+        df['age'] = np.trunc((reference_date - date_of_birth).dt.days / 365.25)
+        return df
+    
     def prepare_value_change_dataset(self):
         """Prepara dataset para ValueChangePredictor"""
         print("\n🔄 PREPARANDO DATOS PARA VALUE CHANGE PREDICTOR...")
@@ -85,10 +246,7 @@ class DataPreparation:
         )
         
         # Calcular edad al momento del cambio de valor
-        df_dataset['age'] = df_dataset.apply(
-            lambda x: self.calculate_age_from_date(x['date_of_birth'], x['date_unix']),
-            axis=1
-        )
+        df_dataset = self.add_age(df_dataset, 'date_unix')
         
         # Limpiar y filtrar
         df_dataset = df_dataset.dropna(subset=['age', 'height', 'position', 'citizenship'])
@@ -125,10 +283,7 @@ class DataPreparation:
         )
         
         # Calcular edad al momento de la transferencia
-        df_dataset['age'] = df_dataset.apply(
-            lambda x: self.calculate_age_from_date(x['date_of_birth'], x['transfer_date']),
-            axis=1
-        )
+        df_dataset = self.add_age(df_dataset, 'transfer_date')
         
         # Calcular ratio precio/valor (para evaluar sobrepago/descuento)
         df_dataset['price_value_ratio'] = df_dataset['transfer_fee'] / df_dataset['value_at_transfer']
@@ -158,57 +313,49 @@ class DataPreparation:
             (self.df_transfers['value_at_transfer'] > 0)
         ].copy()
         
-        # Para cada transferencia, buscar performance en la siguiente temporada
-        success_records = []
-        
         print("   Calculando tasa de éxito basada en performances...")
         
-        for idx, transfer in tqdm(df_transfers_paid.head(10000).iterrows(), 
-                                  total=min(10000, len(df_transfers_paid)),
-                                  desc="Procesando transferencias"):
-            
-            player_id = transfer['player_id']
-            transfer_season = transfer['season_name']
-            to_team_id = transfer['to_team_id']
-            
-            # Buscar performance en siguiente temporada
-            # Convertir season (ej: "20/21" a siguiente "21/22")
-            try:
-                season_parts = transfer_season.split('/')
-                if len(season_parts) == 2:
-                    next_season = f"{season_parts[1]}/{str(int(season_parts[1])+1).zfill(2)}"
-                else:
-                    continue
-                    
-                # Buscar stats
-                perf = self.df_performances[
-                    (self.df_performances['player_id'] == player_id) &
-                    (self.df_performances['season_name'] == next_season) &
-                    (self.df_performances['team_id'] == to_team_id)
-                ]
-                
-                if len(perf) > 0:
-                    # Calcular éxito basado en minutos jugados
-                    total_minutes = perf['minutes_played'].sum()
-                    total_goals = perf['goals'].sum() if 'goals' in perf.columns else 0
-                    total_assists = perf['assists'].sum() if 'assists' in perf.columns else 0
-                    
-                    # Criterio de éxito: más de 900 minutos (10 partidos completos)
-                    success = 1 if total_minutes >= 900 else 0
-                    
-                    success_records.append({
-                        'player_id': player_id,
-                        'transfer_fee': transfer['transfer_fee'],
-                        'value_at_transfer': transfer['value_at_transfer'],
-                        'minutes_played': total_minutes,
-                        'goals': total_goals,
-                        'assists': total_assists,
-                        'success': success
-                    })
-            except:
-                continue
+        # Siguiente temporada como columna (ej: "20/21" -> "21/22")
+        # Por fila: las temporadas con otro formato quedan en NaN y se descartan
+        second_part = df_transfers_paid['season_name'].astype(str).str.extract(r'^\d{2}/(\d{2})$', expand=False)
+        second_year = pd.to_numeric(second_part, errors='coerce')
+        df_transfers_paid['next_season'] = (
+            second_part + '/' + (second_year + 1).astype('Int64').astype(str).str.zfill(2)
+        ).where(second_year.notna())
+        df_transfers_paid = df_transfers_paid[df_transfers_paid['next_season'].notna()]
+        
+        # Performances agregadas una sola vez por (jugador, temporada, equipo)
+        if self.df_performances_agg is not None:
+            perf_grouped = self.df_performances_agg.assign(
+                team_id=pd.to_numeric(self.df_performances_agg['team_id'], errors='coerce')
+            )
+        else:
+            stat_columns = ['minutes_played'] + [c for c in ['goals', 'assists'] if c in self.df_performances.columns]
+            perf_grouped = (
+                self.df_performances
+                .assign(team_id=pd.to_numeric(self.df_performances['team_id'], errors='coerce'))
+                .groupby(['player_id', 'season_name', 'team_id'], as_index=False)[stat_columns]
+                .sum()
+            )
+        
+        # Join transferencia -> performance de la siguiente temporada en el club de destino
+        df_success = df_transfers_paid.assign(
+            to_team_id=pd.to_numeric(df_transfers_paid['to_team_id'], errors='coerce')
+        ).merge(
+            perf_grouped,
+            left_on=['player_id', 'next_season', 'to_team_id'],
+            right_on=['player_id', 'season_name', 'team_id'],
+            how='inner'
+        )
         
-        df_success = pd.DataFrame(success_records)
+        for column in ['goals', 'assists']:
+            if column not in df_success.columns:
+                df_success[column] = 0
+        
+        # Criterio de éxito: más de 900 minutos (10 partidos completos)
+        df_success['success'] = (df_success['minutes_played'] >= 900).astype(int)
+        df_success = df_success[['player_id', 'transfer_date', 'transfer_fee', 'value_at_transfer',
+                                 'minutes_played', 'goals', 'assists', 'success']]
         
         if len(df_success) > 0:
             # Merge con profiles
@@ -219,6 +366,9 @@ class DataPreparation:
                 how='left'
             )
             
+            # Edad al momento de la transferencia (mismo cálculo vectorizado que los otros datasets)
+            df_dataset = self.add_age(df_dataset, 'transfer_date')
+            
             df_dataset = df_dataset.dropna(subset=['height', 'position', 'citizenship'])
             
             print(f"\n✅ Dataset preparado:")
@@ -254,7 +404,6 @@ def main():
     print("="*70)
     
     # Crear directorio para datos de entrenamiento
-    import os
     os.makedirs('training_data', exist_ok=True)
     
     # Inicializar
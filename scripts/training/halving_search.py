@@ -0,0 +1,230 @@
+"""
+Successive Halving Search for TrueSign ML Models
+Búsqueda de hiperparámetros por successive halving: los folds y la matriz escalada se
+calculan una vez y se comparten entre RandomForest, GradientBoosting y el ensemble de ambos.
+Cada evaluación se guarda en un checkpoint JSON (y sus predicciones OOF en .npy al lado, para
+poder armar el ensemble de una ronda reanudada), así que una búsqueda cortada se reanuda.
+"""
+
+import os
+import json
+import math
+import time
+import shutil
+import hashlib
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.model_selection import KFold, ParameterSampler
+from sklearn.metrics import mean_absolute_error
+
+from training_cache import json_default
+
+def _fit_predict_fold(estimator, X, y, train_idx, val_idx):
+    estimator.fit(X[train_idx], y[train_idx])
+    return val_idx, estimator.predict(X[val_idx])
+
+class SuccessiveHalvingSearch:
+    # Filas mínimas de entrenamiento por fold en la primera ronda
+    MIN_RESOURCES = 200
+
+    def __init__(self, families, n_candidates=27, factor=3, cv=3, checkpoint_path=None,
+                 ensemble_members=('RandomForest', 'GradientBoosting'), random_state=42, n_jobs=-1):
+        """
+        families: {nombre: (estimador_base, param_distributions)}
+        n_candidates: int o {nombre: int} con los candidatos iniciales de cada familia
+        """
+        self.families = families
+        self.n_candidates = n_candidates
+        self.factor = factor
+        self.cv = cv
+        self.checkpoint_path = checkpoint_path
+        self.ensemble_members = ensemble_members
+        self.random_state = random_state
+        self.n_jobs = n_jobs
+
+        self.candidates = {}
+        self.results = {}
+        self.best_params_ = {}
+        self.best_score_ = {}
+
+    # ==================== CHECKPOINT ====================
+
+    def _signature(self, X, y):
+        """Identifica datos + espacio de búsqueda: un checkpoint de otra corrida no se reutiliza"""
+        digest = hashlib.sha256()
+        digest.update(np.ascontiguousarray(X).tobytes())
+        digest.update(np.ascontiguousarray(y).tobytes())
+        digest.update(json.dumps([self.candidates, self.cv, self.factor, self.random_state],
+                                 sort_keys=True, default=json_default).encode())
+        return digest.hexdigest()[:16]
+
+    def _load_checkpoint(self, signature):
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return {}
+        try:
+            with open(self.checkpoint_path, 'r') as f:
+                checkpoint = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        if checkpoint.get('signature') != signature:
+            print("   ℹ️  Checkpoint de otra búsqueda (datos o espacio distintos): se ignora")
+            return {}
+        return checkpoint.get('results', {})
+
+    def _save_checkpoint(self, signature):
+        if not self.checkpoint_path:
+            return
+        os.makedirs(os.path.dirname(self.checkpoint_path) or '.', exist_ok=True)
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'signature': signature, 'results': self.results}, f, indent=2, default=json_default)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _oof_root(self):
+        return os.path.splitext(self.checkpoint_path)[0] + '_oof'
+
+    def _oof_path(self, signature, key):
+        return os.path.join(self._oof_root(), signature, key.replace(':', '_') + '.npy')
+
+    def _save_oof(self, signature, key, predictions):
+        """Predicciones OOF de una evaluación (las necesita el ensemble si la búsqueda se reanuda)"""
+        if not self.checkpoint_path:
+            return
+        path = self._oof_path(signature, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, predictions)
+        os.replace(tmp_path, path)
+
+    def _load_oof(self, signature, key):
+        if not self.checkpoint_path:
+            return None
+        path = self._oof_path(signature, key)
+        if not os.path.exists(path):
+            return None
+        try:
+            return np.load(path)
+        except (OSError, ValueError):
+            return None
+
+    def _clear_other_oof(self, signature):
+        """Borrar las OOF de búsquedas anteriores (otros datos o espacio de búsqueda)"""
+        if not self.checkpoint_path or not os.path.isdir(self._oof_root()):
+            return
+        for entry in os.listdir(self._oof_root()):
+            if entry != signature:
+                shutil.rmtree(os.path.join(self._oof_root(), entry), ignore_errors=True)
+
+    # ==================== BÚSQUEDA ====================
+
+    def _sample_candidates(self):
+        for family, (_, param_dist) in self.families.items():
+            n = self.n_candidates.get(family, 1) if isinstance(self.n_candidates, dict) else self.n_candidates
+            self.candidates[family] = [dict(p) for p in ParameterSampler(param_dist, n, random_state=self.random_state)]
+
+    def _evaluate(self, family, params, X, y, fold_orders, n_rows):
+        """Predicciones out-of-fold de un candidato entrenado con las primeras n_rows filas de cada fold"""
+        base_estimator = self.families[family][0]
+        jobs = (
+            delayed(_fit_predict_fold)(clone(base_estimator).set_params(**params), X, y, order[:n_rows], val_idx)
+            for order, val_idx in fold_orders
+        )
+        predictions = np.empty(len(y))
+        # Threads: los árboles liberan el GIL y X se comparte sin copias entre folds
+        for val_idx, fold_pred in Parallel(n_jobs=self.n_jobs, prefer='threads')(jobs):
+            predictions[val_idx] = fold_pred
+        return predictions
+
+    def fit(self, X, y):
+        self._sample_candidates()
+        signature = self._signature(X, y)
+        self.results = self._load_checkpoint(signature)
+        self._clear_other_oof(signature)
+        if self.results:
+            print(f"   ♻️  Reanudando búsqueda desde checkpoint ({len(self.results)} evaluaciones)")
+
+        folds = KFold(n_splits=self.cv, shuffle=True, random_state=self.random_state).split(X)
+        rng = np.random.default_rng(self.random_state)
+        # Orden fijo de las filas de train por fold: cada ronda usa un prefijo más largo del mismo orden
+        fold_orders = [(rng.permutation(train_idx), val_idx) for train_idx, val_idx in folds]
+        max_rows = min(len(order) for order, _ in fold_orders)
+
+        survivors = {family: list(range(len(candidates))) for family, candidates in self.candidates.items()}
+        n_rounds = max(1, math.ceil(math.log(max(len(c) for c in survivors.values()), self.factor)) + 1)
+
+        for round_idx in range(n_rounds):
+            fraction = self.factor ** (round_idx - n_rounds + 1)
+            n_rows = min(max_rows, max(self.MIN_RESOURCES, math.ceil(max_rows * fraction)))
+            n_alive = sum(len(alive) for alive in survivors.values())
+            print(f"\n   🔁 Ronda {round_idx + 1}/{n_rounds}: {n_alive} candidatos × {self.cv} folds, {n_rows:,} filas por fold")
+
+            round_scores = {}
+            oof_predictions = {}
+            for family, alive in survivors.items():
+                for candidate_id in alive:
+                    key = f'{round_idx}:{family}:{candidate_id}'
+                    if key in self.results:
+                        round_scores[(family, candidate_id)] = self.results[key]['mae']
+                        continue
+
+                    start = time.perf_counter()
+                    predictions = self._evaluate(family, self.candidates[family][candidate_id], X, y, fold_orders, n_rows)
+                    elapsed = time.perf_counter() - start
+                    mae = mean_absolute_error(y, predictions)
+
+                    round_scores[(family, candidate_id)] = mae
+                    oof_predictions[(family, candidate_id)] = predictions
+                    self._save_oof(signature, key, predictions)
+                    self.results[key] = {
+                        'round': round_idx, 'family': family, 'candidate': candidate_id,
+                        'params': self.candidates[family][candidate_id],
+                        'rows': n_rows, 'mae': mae, 'seconds': round(elapsed, 3),
+                    }
+                    self._save_checkpoint(signature)
+                    print(f"      ⏱️  {family}#{candidate_id:02d}: MAE {mae:.2f} ({elapsed:.1f}s)")
+
+            # Ensemble de los mejores de la ronda: promedio de sus predicciones OOF (sin fits extra)
+            leaders = {}
+            for family in self.ensemble_members:
+                scored = [(round_scores[(family, c)], c) for c in survivors.get(family, [])]
+                if scored:
+                    leaders[family] = min(scored)[1]
+            ensemble_key = f'{round_idx}:Ensemble'
+            if self.ensemble_members and len(leaders) == len(self.ensemble_members) and ensemble_key not in self.results:
+                member_keys = [(family, c) for family, c in leaders.items()]
+                # Miembros evaluados antes de reanudar: sus OOF están en disco
+                for family, c in member_keys:
+                    if (family, c) not in oof_predictions:
+                        stored = self._load_oof(signature, f'{round_idx}:{family}:{c}')
+                        if stored is not None and len(stored) == len(y):
+                            oof_predictions[(family, c)] = stored
+                missing = [f'{family}#{c:02d}' for family, c in member_keys if (family, c) not in oof_predictions]
+                if missing:
+                    print(f"      ⚠️  Ensemble de la ronda {round_idx + 1} omitido: faltan las predicciones OOF de "
+                          f"{', '.join(missing)} (checkpoint anterior sin OOF)")
+                else:
+                    ensemble_pred = np.mean([oof_predictions[k] for k in member_keys], axis=0)
+                    mae = mean_absolute_error(y, ensemble_pred)
+                    self.results[ensemble_key] = {
+                        'round': round_idx, 'family': 'Ensemble', 'members': leaders, 'rows': n_rows, 'mae': mae,
+                    }
+                    self._save_checkpoint(signature)
+                    print(f"      🎯 Ensemble {leaders}: MAE {mae:.2f}")
+
+            # Halving por familia: así el ensemble siempre tiene un miembro de cada una
+            for family, alive in survivors.items():
+                keep = max(1, math.ceil(len(alive) / self.factor))
+                survivors[family] = sorted(alive, key=lambda c: round_scores[(family, c)])[:keep]
+
+        for family, alive in survivors.items():
+            best = alive[0]
+            self.best_params_[family] = self.candidates[family][best]
+            self.best_score_[family] = self.results[f'{n_rounds - 1}:{family}:{best}']['mae']
+
+        return self
+
+    def total_seconds(self):
+        """Tiempo total de fits (incluye evaluaciones recuperadas del checkpoint)"""
+        return sum(r.get('seconds', 0) for r in self.results.values())
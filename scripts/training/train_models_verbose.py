@@ -2,38 +2,167 @@
 TrueSign - OPTIMIZED Training con PROGRESO VISIBLE
 """
 
+import os
+import sys
+import math
 import pandas as pd
 import numpy as np
 import pickle
 import json
 from datetime import datetime
-from sklearn.model_selection import train_test_split, cross_val_score, RandomizedSearchCV
+from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor, VotingRegressor
+from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor, VotingRegressor, HistGradientBoostingRegressor
 from sklearn.metrics import mean_absolute_error, r2_score, mean_squared_error
+from sklearn.utils import Bunch
+from sklearn.base import clone
 from scipy.stats import randint, uniform
 from tqdm import tqdm
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    import lightgbm as lgb
+except ImportError:
+    lgb = None
+
+try:
+    import xgboost as xgb
+except ImportError:
+    xgb = None
+
+# Agregar directorio raíz del proyecto al path (export en formatos que leen los predictores)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from models.predictors.model_backends import export_native_model
+from models.predictors.model_bundle import write_model_bundle
+from training_cache import TrainingCache, json_default
+from halving_search import SuccessiveHalvingSearch
+
+# Encoders que usa cada dataset (firma del cache de features)
+FEATURE_ENCODERS = {
+    'value_change': ['position_encoder', 'nationality_encoder'],
+    'maximum_price': ['position_encoder_price', 'nationality_encoder_price'],
+}
+
+# Búsqueda de hiperparámetros (successive halving: 27 -> 9 -> 3 -> 1 por familia)
+SEARCH_CANDIDATES = 27
+SEARCH_FACTOR = 3
+
+# Backends de estimadores: 'sklearn' = RF + GB + VotingRegressor; el resto son GBDT por histogramas
+BACKENDS = ('sklearn', 'hist', 'lightgbm', 'xgboost')
+
+def histogram_backend(backend):
+    """(familia, estimador base, espacio de búsqueda) de un backend GBDT por histogramas"""
+    if backend == 'hist':
+        return 'HistGradientBoosting', HistGradientBoostingRegressor(random_state=42), {
+            'max_iter': randint(100, 600),
+            'learning_rate': uniform(0.02, 0.18),
+            'max_leaf_nodes': randint(15, 128),
+            'min_samples_leaf': randint(10, 100),
+            'l2_regularization': uniform(0.0, 1.0),
+        }
+    
+    if backend == 'lightgbm':
+        if lgb is None:
+            raise ImportError("lightgbm no está instalado (pip install lightgbm)")
+        return 'LightGBM', lgb.LGBMRegressor(random_state=42, n_jobs=-1, subsample_freq=1, verbose=-1), {
+            'n_estimators': randint(100, 600),
+            'learning_rate': uniform(0.02, 0.18),
+            'num_leaves': randint(15, 128),
+            'min_child_samples': randint(10, 100),
+            'subsample': uniform(0.6, 0.4),
+            'colsample_bytree': uniform(0.6, 0.4),
+            'reg_lambda': uniform(0.0, 1.0),
+        }
+    
+    if backend == 'xgboost':
+        if xgb is None:
+            raise ImportError("xgboost no está instalado (pip install xgboost)")
+        return 'XGBoost', xgb.XGBRegressor(random_state=42, n_jobs=-1, tree_method='hist'), {
+            'n_estimators': randint(100, 600),
+            'learning_rate': uniform(0.02, 0.18),
+            'max_depth': randint(3, 10),
+            'min_child_weight': randint(1, 20),
+            'subsample': uniform(0.6, 0.4),
+            'colsample_bytree': uniform(0.6, 0.4),
+            'reg_lambda': uniform(0.0, 1.0),
+        }
+    
+    raise ValueError(f"Backend desconocido: {backend} (opciones: {', '.join(BACKENDS)})")
+
+# Modo incremental
+WARM_SEARCH_ITER = 4          # Combinaciones alrededor de los best_params_ anteriores
+WARM_SEARCH_SPREAD = 0.2      # ±20% del valor anterior (ints) / ±10% del rango (floats)
+DELTA_MAX_FRACTION = 0.2      # Más filas nuevas que esto => reentrenamiento completo
+DELTA_MIN_ESTIMATORS = 10     # Árboles/etapas mínimos que se agregan en un refit por delta
+# HistGradientBoosting no está: un fit con warm_start sobre el delta rearma los bins con esas
+# filas y sigue desde árboles que partieron con los bins viejos (el backend 'hist' siempre reentrena)
+DELTA_SIZE_PARAMS = {         # Parámetro que cuenta árboles/iteraciones en cada estimador con warm_start
+    RandomForestRegressor: 'n_estimators',
+    GradientBoostingRegressor: 'n_estimators',
+}
+
 class VerboseModelTrainer:
-    def __init__(self):
+    def __init__(self, incremental=False, backend='sklearn'):
         self.models = {}
         self.encoders = {}
         self.scalers = {}
         self.metrics = {}
+        self.feature_names = {}
+        self.incremental = incremental
+        self.backend = backend
+        self.search_checkpoints = True  # False = búsqueda desde cero (benchmarks)
+        self.cache = TrainingCache() if incremental else None
+        self.previous_models = {}
+        self.pending_snapshots = {}
+        
+        if incremental:
+            self.load_previous_artifacts()
         
     def print_header(self, title):
         print("\n" + "="*70)
         print(f"   {title}")
         print("="*70)
         
+    def load_previous_artifacts(self):
+        """Carga modelos, encoders y scalers del último entrenamiento (modo incremental)"""
+        print("\n♻️  Cargando artefactos del entrenamiento anterior...")
+        names = [f'{model_name}_model' for model_name in FEATURE_ENCODERS]
+        names += [f'{model_name}_scaler' for model_name in FEATURE_ENCODERS]
+        names += [name for encoder_names in FEATURE_ENCODERS.values() for name in encoder_names]
+        
+        for name in names:
+            try:
+                with open(f'models/trained/{name}.pkl', 'rb') as f:
+                    artifact = pickle.load(f)
+            except Exception as e:
+                print(f"   ⚠️  {name}.pkl no disponible ({type(e).__name__})")
+                continue
+            
+            if name.endswith('_model'):
+                self.previous_models[name] = artifact
+            elif name.endswith('_scaler'):
+                self.scalers[name] = artifact
+            else:
+                self.encoders[name] = artifact
+            print(f"   ✅ {name}.pkl")
+    
     def encode_categorical(self, df, column, encoder_name):
         if encoder_name not in self.encoders:
             self.encoders[encoder_name] = LabelEncoder()
             encoded = self.encoders[encoder_name].fit_transform(df[column].fillna('Unknown'))
         else:
-            encoded = self.encoders[encoder_name].transform(df[column].fillna('Unknown'))
+            values = df[column].fillna('Unknown')
+            encoder = self.encoders[encoder_name]
+            if self.incremental:
+                # Categorías nuevas al final: los códigos existentes no cambian y los árboles siguen siendo válidos
+                unseen = pd.unique(values[~values.isin(encoder.classes_)])
+                if len(unseen):
+                    encoder.classes_ = np.concatenate([encoder.classes_.astype(object), np.asarray(unseen, dtype=object)])
+                    print(f"   ➕ {encoder_name}: {len(unseen)} categorías nuevas")
+            encoded = encoder.transform(values)
         return encoded
     
     def prepare_features_value_change(self, df):
@@ -130,8 +259,51 @@ class VerboseModelTrainer:
         
         return X, y, feature_names
     
-    def train_optimized(self, X, y, model_name):
-        """Entrena con hiperparámetros optimizados"""
+    def narrow_param_distributions(self, param_dist, best_params):
+        """Distribuciones acotadas alrededor de los best_params_ del entrenamiento anterior"""
+        narrowed = {}
+        for name, dist in param_dist.items():
+            best = best_params.get(name)
+            if best is None:
+                narrowed[name] = dist
+            elif isinstance(dist, list):
+                narrowed[name] = [best]
+            elif dist.dist.name == 'randint':
+                lo, hi = dist.support()
+                span = max(1, int(round(best * WARM_SEARCH_SPREAD)))
+                narrowed[name] = randint(max(lo, best - span), min(hi, best + span) + 1)
+            else:
+                lo, hi = dist.support()
+                span = (hi - lo) * WARM_SEARCH_SPREAD / 2
+                low, high = max(lo, best - span), min(hi, best + span)
+                narrowed[name] = uniform(low, high - low)
+        return narrowed
+    
+    def build_prefit_ensemble(self, estimators):
+        """VotingRegressor (promedio simple) armado con miembros ya entrenados, sin volver a entrenarlos"""
+        ensemble = VotingRegressor(estimators=estimators)
+        ensemble.estimators_ = [estimator for _, estimator in estimators]
+        ensemble.named_estimators_ = Bunch(**dict(estimators))
+        return ensemble
+    
+    def report_metrics(self, name, y_train, pred_train, y_test, pred_test):
+        """Imprime y devuelve las métricas train/test de un modelo"""
+        metrics = {
+            'train_mae': mean_absolute_error(y_train, pred_train),
+            'test_mae': mean_absolute_error(y_test, pred_test),
+            'train_r2': r2_score(y_train, pred_train),
+            'test_r2': r2_score(y_test, pred_test),
+        }
+        print(f"\n   ✅ {name} completado!")
+        print(f"   📊 Train MAE: {metrics['train_mae']:.2f} | Test MAE: {metrics['test_mae']:.2f}")
+        print(f"   📊 Train R²: {metrics['train_r2']:.4f} | Test R²: {metrics['test_r2']:.4f}")
+        return metrics
+    
+    def train_optimized(self, X, y, model_name, warm_params=None):
+        """Entrena con hiperparámetros optimizados (warm_params: best_params_ previos por familia)"""
+        if self.backend != 'sklearn':
+            return self.train_histogram(X, y, model_name, warm_params=warm_params)
+        
         self.print_header(f"ENTRENANDO {model_name}")
         
         print(f"\n⏱️  Inicio: {datetime.now().strftime('%H:%M:%S')}")
@@ -139,7 +311,7 @@ class VerboseModelTrainer:
         # Split
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
         
-        # Escalar
+        # Escalar (una sola vez: la búsqueda comparte esta matriz entre todos los candidatos)
         print("\n🔧 Escalando features...")
         scaler = StandardScaler()
         X_train_scaled = scaler.fit_transform(X_train)
@@ -147,126 +319,277 @@ class VerboseModelTrainer:
         self.scalers[f'{model_name}_scaler'] = scaler
         print(f"   ✅ Escalado completado")
         
-        # Optimización RandomForest
-        print("\n🌲 PASO 1/3: Optimizando RandomForest...")
-        print(f"   Buscando en 10 combinaciones con 3-fold CV (30 fits)")
+        warm_params = warm_params or {}
         
         rf_param_dist = {
-            'n_estimators': randint(100, 400),
-            'max_depth': randint(15, 40),
-            'min_samples_split': randint(2, 10),
-            'min_samples_leaf': randint(1, 5),
-            'max_features': ['sqrt', 'log2']
+            'n_estimators': randint(100, 500),
+            'max_depth': randint(10, 40),
+            'min_samples_split': randint(2, 12),
+            'min_samples_leaf': randint(1, 6),
+            'max_features': ['sqrt', 'log2', 0.5]
         }
-        
-        rf_search = RandomizedSearchCV(
-            RandomForestRegressor(random_state=42, n_jobs=-1),
-            param_distributions=rf_param_dist,
-            n_iter=10,  # Reducido a 10 para velocidad
-            cv=3,
-            scoring='neg_mean_absolute_error',
-            random_state=42,
-            n_jobs=-1,
-            verbose=2  # VERBOSE!
-        )
-        
-        print(f"   ⏳ Entrenando RF (esto tomará ~5-10 minutos)...")
-        rf_search.fit(X_train_scaled, y_train)
-        
-        best_rf = rf_search.best_estimator_
-        print(f"\n   ✅ RandomForest completado!")
-        print(f"   📋 Mejores params: {rf_search.best_params_}")
-        
-        y_pred_train_rf = best_rf.predict(X_train_scaled)
-        y_pred_test_rf = best_rf.predict(X_test_scaled)
-        
-        rf_train_mae = mean_absolute_error(y_train, y_pred_train_rf)
-        rf_test_mae = mean_absolute_error(y_test, y_pred_test_rf)
-        rf_train_r2 = r2_score(y_train, y_pred_train_rf)
-        rf_test_r2 = r2_score(y_test, y_pred_test_rf)
-        
-        print(f"   📊 Train MAE: {rf_train_mae:.2f} | Test MAE: {rf_test_mae:.2f}")
-        print(f"   📊 Train R²: {rf_train_r2:.4f} | Test R²: {rf_test_r2:.4f}")
-        
-        # Optimización GradientBoosting
-        print("\n🚀 PASO 2/3: Optimizando GradientBoosting...")
-        print(f"   Buscando en 10 combinaciones con 3-fold CV (30 fits)")
-        
         gb_param_dist = {
-            'n_estimators': randint(100, 400),
-            'max_depth': randint(5, 12),
+            'n_estimators': randint(100, 500),
+            'max_depth': randint(3, 12),
             'learning_rate': uniform(0.01, 0.2),
-            'min_samples_split': randint(2, 10),
-            'subsample': uniform(0.7, 0.3)
+            'min_samples_split': randint(2, 12),
+            'min_samples_leaf': randint(1, 6),
+            'subsample': uniform(0.6, 0.4)
         }
-        
-        gb_search = RandomizedSearchCV(
-            GradientBoostingRegressor(random_state=42),
-            param_distributions=gb_param_dist,
-            n_iter=10,
+        n_candidates = {'RandomForest': SEARCH_CANDIDATES, 'GradientBoosting': SEARCH_CANDIDATES}
+        if warm_params.get('RandomForest'):
+            rf_param_dist = self.narrow_param_distributions(rf_param_dist, warm_params['RandomForest'])
+            n_candidates['RandomForest'] = WARM_SEARCH_ITER
+        if warm_params.get('GradientBoosting'):
+            gb_param_dist = self.narrow_param_distributions(gb_param_dist, warm_params['GradientBoosting'])
+            n_candidates['GradientBoosting'] = WARM_SEARCH_ITER
+        
+        # Búsqueda por successive halving (RF, GB y su ensemble sobre los mismos folds)
+        print("\n🔎 PASO 1/3: Successive halving (RandomForest + GradientBoosting + Ensemble)...")
+        print(f"   {n_candidates['RandomForest']} + {n_candidates['GradientBoosting']} candidatos, factor {SEARCH_FACTOR}, 3-fold CV")
+        search = SuccessiveHalvingSearch(
+            {
+                'RandomForest': (RandomForestRegressor(random_state=42, n_jobs=-1), rf_param_dist),
+                'GradientBoosting': (GradientBoostingRegressor(random_state=42), gb_param_dist),
+            },
+            n_candidates=n_candidates,
+            factor=SEARCH_FACTOR,
             cv=3,
-            scoring='neg_mean_absolute_error',
+            checkpoint_path=f'models/trained/cache/search_{model_name}.json' if self.search_checkpoints else None,
             random_state=42,
-            n_jobs=-1,
-            verbose=2
+        )
+        search.fit(X_train_scaled, y_train)
+        print(f"\n   ✅ Búsqueda completada ({search.total_seconds():.0f}s de fits)")
+        for family, params in search.best_params_.items():
+            print(f"   📋 {family}: CV MAE {search.best_score_[family]:.2f} | {params}")
+        
+        # Refit final de los ganadores con todo el train
+        print("\n🌲 PASO 2/3: Entrenando RandomForest y GradientBoosting finales...")
+        best_rf = RandomForestRegressor(random_state=42, n_jobs=-1, **search.best_params_['RandomForest'])
+        best_gb = GradientBoostingRegressor(random_state=42, **search.best_params_['GradientBoosting'])
+        best_rf.fit(X_train_scaled, y_train)
+        best_gb.fit(X_train_scaled, y_train)
+        
+        # Predicciones una sola vez por miembro; el ensemble es su promedio
+        predictions = {
+            'RandomForest': (best_rf.predict(X_train_scaled), best_rf.predict(X_test_scaled)),
+            'GradientBoosting': (best_gb.predict(X_train_scaled), best_gb.predict(X_test_scaled)),
+        }
+        predictions['Ensemble'] = tuple(
+            np.mean([predictions['RandomForest'][i], predictions['GradientBoosting'][i]], axis=0) for i in (0, 1)
         )
         
-        print(f"   ⏳ Entrenando GB (esto tomará ~5-10 minutos)...")
-        gb_search.fit(X_train_scaled, y_train)
+        print("\n🎯 PASO 3/3: Creando Voting Ensemble (sin refit)...")
+        ensemble = self.build_prefit_ensemble([('rf', best_rf), ('gb', best_gb)])
         
-        best_gb = gb_search.best_estimator_
-        print(f"\n   ✅ GradientBoosting completado!")
-        print(f"   📋 Mejores params: {gb_search.best_params_}")
+        models = {'RandomForest': best_rf, 'GradientBoosting': best_gb, 'Ensemble': ensemble}
+        results = {}
+        for name, (pred_train, pred_test) in predictions.items():
+            metrics = self.report_metrics(name, y_train, pred_train, y_test, pred_test)
+            results[name] = {'test_mae': metrics['test_mae'], 'test_r2': metrics['test_r2'], 'model': models[name]}
+            if name in search.best_params_:
+                results[name]['params'] = search.best_params_[name]
+                results[name]['cv_mae'] = search.best_score_[name]
         
-        y_pred_train_gb = best_gb.predict(X_train_scaled)
-        y_pred_test_gb = best_gb.predict(X_test_scaled)
+        best_name = min(results.keys(), key=lambda k: results[k]['test_mae'])
         
-        gb_train_mae = mean_absolute_error(y_train, y_pred_train_gb)
-        gb_test_mae = mean_absolute_error(y_test, y_pred_test_gb)
-        gb_train_r2 = r2_score(y_train, y_pred_train_gb)
-        gb_test_r2 = r2_score(y_test, y_pred_test_gb)
+        print(f"\n🏆 GANADOR: {best_name}")
+        print(f"   Test MAE: {results[best_name]['test_mae']:.2f}")
+        print(f"   Test R²: {results[best_name]['test_r2']:.4f}")
         
-        print(f"   📊 Train MAE: {gb_train_mae:.2f} | Test MAE: {gb_test_mae:.2f}")
-        print(f"   📊 Train R²: {gb_train_r2:.4f} | Test R²: {gb_test_r2:.4f}")
+        print(f"\n⏱️  Fin: {datetime.now().strftime('%H:%M:%S')}")
         
-        # Ensemble
-        print("\n🎯 PASO 3/3: Creando Voting Ensemble...")
-        ensemble = VotingRegressor(estimators=[
-            ('rf', best_rf),
-            ('gb', best_gb)
-        ])
+        return results[best_name]['model'], scaler, results
+    
+    def train_histogram(self, X, y, model_name, warm_params=None):
+        """Entrena un único GBDT por histogramas (hist / lightgbm / xgboost) con la misma búsqueda"""
+        family, base_estimator, param_dist = histogram_backend(self.backend)
+        self.print_header(f"ENTRENANDO {model_name} ({family})")
         
-        print(f"   ⏳ Entrenando ensemble...")
-        ensemble.fit(X_train_scaled, y_train)
+        print(f"\n⏱️  Inicio: {datetime.now().strftime('%H:%M:%S')}")
         
-        y_pred_train_ens = ensemble.predict(X_train_scaled)
-        y_pred_test_ens = ensemble.predict(X_test_scaled)
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
         
-        ens_train_mae = mean_absolute_error(y_train, y_pred_train_ens)
-        ens_test_mae = mean_absolute_error(y_test, y_pred_test_ens)
-        ens_train_r2 = r2_score(y_train, y_pred_train_ens)
-        ens_test_r2 = r2_score(y_test, y_pred_test_ens)
+        # Los árboles no necesitan escalado, pero el predictor siempre aplica el scaler
+        print("\n🔧 Escalando features...")
+        scaler = StandardScaler()
+        X_train_scaled = scaler.fit_transform(X_train)
+        X_test_scaled = scaler.transform(X_test)
+        self.scalers[f'{model_name}_scaler'] = scaler
+        print(f"   ✅ Escalado completado")
         
-        print(f"\n   ✅ Ensemble completado!")
-        print(f"   📊 Train MAE: {ens_train_mae:.2f} | Test MAE: {ens_test_mae:.2f}")
-        print(f"   📊 Train R²: {ens_train_r2:.4f} | Test R²: {ens_test_r2:.4f}")
+        n_candidates = SEARCH_CANDIDATES
+        if (warm_params or {}).get(family):
+            param_dist = self.narrow_param_distributions(param_dist, warm_params[family])
+            n_candidates = WARM_SEARCH_ITER
+        
+        print(f"\n🔎 PASO 1/2: Successive halving ({family})...")
+        print(f"   {n_candidates} candidatos, factor {SEARCH_FACTOR}, 3-fold CV")
+        search = SuccessiveHalvingSearch(
+            {family: (base_estimator, param_dist)},
+            n_candidates=n_candidates,
+            factor=SEARCH_FACTOR,
+            cv=3,
+            checkpoint_path=f'models/trained/cache/search_{model_name}_{self.backend}.json' if self.search_checkpoints else None,
+            ensemble_members=(),
+            random_state=42,
+        )
+        search.fit(X_train_scaled, y_train)
+        print(f"\n   ✅ Búsqueda completada ({search.total_seconds():.0f}s de fits)")
+        print(f"   📋 {family}: CV MAE {search.best_score_[family]:.2f} | {search.best_params_[family]}")
         
-        # Comparación
-        results = {
-            'RandomForest': {'test_mae': rf_test_mae, 'test_r2': rf_test_r2, 'model': best_rf, 'params': rf_search.best_params_},
-            'GradientBoosting': {'test_mae': gb_test_mae, 'test_r2': gb_test_r2, 'model': best_gb, 'params': gb_search.best_params_},
-            'Ensemble': {'test_mae': ens_test_mae, 'test_r2': ens_test_r2, 'model': ensemble}
-        }
+        print(f"\n🌲 PASO 2/2: Entrenando {family} final...")
+        model = clone(base_estimator).set_params(**search.best_params_[family])
+        model.fit(X_train_scaled, y_train)
         
-        best_name = min(results.keys(), key=lambda k: results[k]['test_mae'])
+        metrics = self.report_metrics(family, y_train, model.predict(X_train_scaled), y_test, model.predict(X_test_scaled))
+        results = {family: {
+            'test_mae': metrics['test_mae'], 'test_r2': metrics['test_r2'], 'model': model,
+            'params': search.best_params_[family], 'cv_mae': search.best_score_[family],
+        }}
         
-        print(f"\n🏆 GANADOR: {best_name}")
-        print(f"   Test MAE: {results[best_name]['test_mae']:.2f}")
-        print(f"   Test R²: {results[best_name]['test_r2']:.4f}")
+        print(f"\n⏱️  Fin: {datetime.now().strftime('%H:%M:%S')}")
+        
+        return model, scaler, results
+    
+    # ==================== MODO INCREMENTAL ====================
+    
+    def prepare_features_cached(self, df, model_name, prepare_fn, dataset_hash):
+        """Features del snapshot desde el cache si el dataset y los encoders no cambiaron"""
+        encoder_names = FEATURE_ENCODERS[model_name]
+        signature = self.cache.encoder_signature(self.encoders, encoder_names)
+        cached = self.cache.load_features(model_name, dataset_hash, signature)
+        if cached is not None:
+            X, y, feature_names = cached
+            print(f"\n⚡ Features de {model_name} desde cache (snapshot {dataset_hash}): {X.shape[0]:,} muestras")
+            return X, y, feature_names
+        
+        X, y, feature_names = prepare_fn(df)
+        # Firma después de preparar: incluye las categorías nuevas que se hayan agregado
+        signature = self.cache.encoder_signature(self.encoders, encoder_names)
+        self.cache.save_features(model_name, dataset_hash, signature, X, y, feature_names)
+        return X, y, feature_names
+    
+    def supports_delta(self, model):
+        """Estimadores que pueden seguir entrenando con warm_start sobre filas nuevas"""
+        if isinstance(model, VotingRegressor):
+            return all(self.supports_delta(estimator) for estimator in model.estimators_)
+        return type(model) in DELTA_SIZE_PARAMS
+    
+    def extend_estimator(self, model, X, y, delta_fraction):
+        """Agrega árboles/etapas entrenados solo con el delta (proporcionales a su peso en el dataset)"""
+        if isinstance(model, VotingRegressor):
+            for estimator in model.estimators_:
+                self.extend_estimator(estimator, X, y, delta_fraction)
+            return
+        
+        size_param = DELTA_SIZE_PARAMS[type(model)]
+        current = model.get_params()[size_param]
+        extra = max(DELTA_MIN_ESTIMATORS, math.ceil(current * delta_fraction))
+        model.set_params(warm_start=True, **{size_param: current + extra})
+        model.fit(X, y)
+        model.set_params(warm_start=False)
+        print(f"   ➕ {type(model).__name__}: +{extra} estimadores ({current + extra} total)")
+    
+    def refit_delta(self, model, scaler, X_delta, y_delta, model_name, delta_fraction):
+        """Refit solo con las filas nuevas; el scaler se congela para no mover los umbrales de los árboles"""
+        self.print_header(f"REFIT INCREMENTAL {model_name}")
+        print(f"\n⏱️  Inicio: {datetime.now().strftime('%H:%M:%S')}")
+        print(f"   📥 {len(X_delta):,} filas nuevas ({delta_fraction:.1%} del dataset)")
+        
+        X_delta_scaled = scaler.transform(X_delta)
+        mae_before = mean_absolute_error(y_delta, model.predict(X_delta_scaled))
+        self.extend_estimator(model, X_delta_scaled, y_delta, delta_fraction)
+        mae_after = mean_absolute_error(y_delta, model.predict(X_delta_scaled))
         
+        print(f"   📊 MAE en filas nuevas: {mae_before:.2f} → {mae_after:.2f}")
         print(f"\n⏱️  Fin: {datetime.now().strftime('%H:%M:%S')}")
         
-        return results[best_name]['model'], scaler, results
+        return {'Delta': {'delta_rows': len(X_delta), 'delta_mae_before': mae_before, 'delta_mae_after': mae_after}}
+    
+    def train_incremental(self, df, model_name, prepare_fn):
+        """
+        Reentrenamiento incremental:
+        - snapshot sin cambios => se reutiliza el modelo anterior
+        - solo filas nuevas (append) y pocas => refit por delta con warm_start
+        - en otro caso => reentrenamiento completo con búsqueda acotada a los best_params_ previos
+        - si el modelo anterior es de otro backend (o no se sabe de cuál) => reentrenamiento
+          completo desde cero, sin modelo ni best_params_ previos
+        """
+        row_hashes = self.cache.row_hashes(df)
+        dataset_hash = self.cache.content_hash(row_hashes)
+        state = self.cache.get_model_state(model_name)
+        previous_model = self.previous_models.get(f'{model_name}_model')
+        scaler = self.scalers.get(f'{model_name}_scaler')
+        print(f"\n🔑 Snapshot {model_name}: {dataset_hash} ({len(df):,} filas)")
+        
+        X, y, feature_names = self.prepare_features_cached(df, model_name, prepare_fn, dataset_hash)
+        self.feature_names[model_name] = feature_names
+        self.pending_snapshots[model_name] = (dataset_hash, row_hashes)
+        
+        if state and state.get('backend') != self.backend:
+            print(f"   ℹ️  Modelo anterior con backend {state.get('backend') or 'desconocido'}: "
+                  f"reentrenamiento completo con {self.backend}")
+            return self.train_optimized(X, y, model_name)
+        
+        if previous_model is not None and scaler is not None:
+            if state.get('dataset_hash') == dataset_hash:
+                print(f"   ✅ Dataset sin cambios: se reutiliza {model_name}_model")
+                return previous_model, scaler, state.get('results', {})
+            
+            seen_rows = self.cache.load_seen_rows(model_name)
+            if seen_rows is not None and self.supports_delta(previous_model):
+                new_mask = ~np.isin(row_hashes, seen_rows)
+                delta_fraction = new_mask.sum() / len(row_hashes)
+                removed = not np.isin(seen_rows, row_hashes).all()
+                if not removed and 0 < delta_fraction <= DELTA_MAX_FRACTION:
+                    results = self.refit_delta(previous_model, scaler, X[new_mask], y[new_mask], model_name, delta_fraction)
+                    return previous_model, scaler, results
+                print(f"   ℹ️  Delta no aplicable (filas nuevas: {delta_fraction:.1%}, filas eliminadas: {removed})")
+        
+        warm_params = {name: result['params'] for name, result in state.get('results', {}).items() if result.get('params')}
+        if warm_params:
+            print(f"   🔥 Warm start de hiperparámetros: {', '.join(warm_params)}")
+        return self.train_optimized(X, y, model_name, warm_params=warm_params)
+    
+    def save_training_state(self):
+        """Registra el snapshot y los best_params_ de cada modelo guardado (modo incremental)"""
+        for model_name, (dataset_hash, row_hashes) in self.pending_snapshots.items():
+            if f'{model_name}_model' not in self.models:
+                continue
+            results = {
+                name: {k: v for k, v in result.items() if k != 'model'}
+                for name, result in self.metrics.get(model_name, {}).items()
+            }
+            # Un refit por delta no busca hiperparámetros: se conservan los anteriores
+            if not any(result.get('params') for result in results.values()):
+                results = {**self.cache.get_model_state(model_name).get('results', {}), **results}
+            self.cache.update_model_state(model_name, dataset_hash=dataset_hash, rows=len(row_hashes),
+                                          results=results, backend=self.backend)
+            self.cache.save_seen_rows(model_name, row_hashes)
+        self.cache.save_state()
+        print(f"   ✅ Estado incremental guardado en {self.cache.state_file}")
+    
+    def save_bundles(self):
+        """Bundles versionados (manifest + payloads mapeables) que cargan los predictores"""
+        for model_name, encoder_names in FEATURE_ENCODERS.items():
+            model = self.models.get(f'{model_name}_model')
+            scaler = self.scalers.get(f'{model_name}_scaler')
+            if model is None or scaler is None:
+                continue
+            encoders = {
+                'position_encoder': self.encoders[encoder_names[0]],
+                'nationality_encoder': self.encoders[encoder_names[1]],
+            }
+            results = {
+                name: {k: v for k, v in result.items() if k != 'model'}
+                for name, result in self.metrics.get(model_name, {}).items()
+            }
+            manifest = write_model_bundle(
+                f'models/trained/{model_name}', model, scaler, encoders,
+                self.feature_names.get(model_name, []), metrics={'backend': self.backend, 'results': results},
+            )
+            print(f"   ✅ Bundle {model_name}/ ({', '.join(manifest['artifacts'])})")
     
     def save_models(self):
         """Guarda modelos"""
@@ -278,6 +601,9 @@ class VerboseModelTrainer:
             with open(f'models/trained/{name}.pkl', 'wb') as f:
                 pickle.dump(model, f)
             print(f"   ✅ {name}.pkl")
+            native_path = export_native_model(model, 'models/trained', name)
+            if native_path:
+                print(f"   ✅ {os.path.basename(native_path)}")
         
         for name, encoder in self.encoders.items():
             with open(f'models/trained/{name}.pkl', 'wb') as f:
@@ -292,25 +618,44 @@ class VerboseModelTrainer:
             for k, v in self.metrics.items():
                 if isinstance(v, dict):
                     metrics_clean[k] = {kk: vv for kk, vv in v.items() if kk != 'model'}
-            json.dump(metrics_clean, f, indent=2)
+            metrics_clean['backend'] = self.backend
+            json.dump(metrics_clean, f, indent=2, default=json_default)
+        
+        self.save_bundles()
+        
+        if self.incremental:
+            self.save_training_state()
         
         print("   ✅ Todos los modelos guardados\n")
 
 def main():
+    incremental = '--incremental' in sys.argv
+    backend = next((arg.split('=', 1)[1] for arg in sys.argv if arg.startswith('--backend=')), 'sklearn')
+    if backend not in BACKENDS:
+        print(f"❌ Backend desconocido: {backend} (opciones: {', '.join(BACKENDS)})")
+        return
+    
     print("\n" + "="*70)
     print("   TRUESIGN - ENTRENAMIENTO OPTIMIZADO")
     print("   ✨ Con progreso VISIBLE")
+    print(f"   🧩 Backend: {backend}")
+    if incremental:
+        print("   ♻️  Modo INCREMENTAL")
     print("="*70)
     
-    trainer = VerboseModelTrainer()
+    trainer = VerboseModelTrainer(incremental=incremental, backend=backend)
     
     # VALUE CHANGE PREDICTOR
     print("\n\n📈 MODELO 1: VALUE CHANGE PREDICTOR")
     print("-"*70)
     try:
-        df = pd.read_csv('data/training/value_change_dataset.csv')
-        X, y, features = trainer.prepare_features_value_change(df)
-        model, scaler, results = trainer.train_optimized(X, y, 'value_change')
+        df = pd.read_csv('data/training/value_change_dataset.csv', float_precision='round_trip')
+        if trainer.incremental:
+            model, scaler, results = trainer.train_incremental(df, 'value_change', trainer.prepare_features_value_change)
+        else:
+            X, y, features = trainer.prepare_features_value_change(df)
+            trainer.feature_names['value_change'] = features
+            model, scaler, results = trainer.train_optimized(X, y, 'value_change')
         trainer.models['value_change_model'] = model
         trainer.metrics['value_change'] = results
         print("✅ Value Change Predictor entrenado\n")
@@ -323,9 +668,13 @@ def main():
     print("\n\n💰 MODELO 2: MAXIMUM PRICE PREDICTOR")
     print("-"*70)
     try:
-        df = pd.read_csv('data/training/maximum_price_dataset.csv')
-        X, y, features = trainer.prepare_features_maximum_price(df)
-        model, scaler, results = trainer.train_optimized(X, y, 'maximum_price')
+        df = pd.read_csv('data/training/maximum_price_dataset.csv', float_precision='round_trip')
+        if trainer.incremental:
+            model, scaler, results = trainer.train_incremental(df, 'maximum_price', trainer.prepare_features_maximum_price)
+        else:
+            X, y, features = trainer.prepare_features_maximum_price(df)
+            trainer.feature_names['maximum_price'] = features
+            model, scaler, results = trainer.train_optimized(X, y, 'maximum_price')
         trainer.models['maximum_price_model'] = model
         trainer.metrics['maximum_price'] = results
         print("✅ Maximum Price Predictor entrenado\n")
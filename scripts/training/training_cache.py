@@ -0,0 +1,99 @@
+"""
+Training Cache for TrueSign ML Models
+Snapshots por hash de contenido de los datasets de entrenamiento, cache de features
+y estado del último entrenamiento (best_params_, filas vistas) para el reentrenamiento incremental
+"""
+
+import os
+import sys
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+# Agregar directorio raíz del proyecto al path (helpers compartidos con los predictores)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+# Serializador JSON único para checkpoints, métricas, reportes y manifests de bundles
+from models.predictors.model_bundle import json_default
+
+class TrainingCache:
+    def __init__(self, cache_path="models/trained/cache"):
+        self.cache_path = cache_path
+        self.state_file = os.path.join(cache_path, 'training_state.json')
+        os.makedirs(cache_path, exist_ok=True)
+        self.state = self._load_state()
+
+    def _load_state(self):
+        try:
+            with open(self.state_file, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save_state(self):
+        with open(self.state_file, 'w') as f:
+            json.dump(self.state, f, indent=2, default=json_default)
+
+    # ==================== SNAPSHOTS ====================
+
+    @staticmethod
+    def row_hashes(df):
+        """Hash de contenido por fila (independiente del índice)"""
+        return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+    @staticmethod
+    def content_hash(row_hashes):
+        """Hash del dataset completo; no depende del orden de las filas en el CSV"""
+        return hashlib.sha256(np.sort(row_hashes).tobytes()).hexdigest()[:16]
+
+    @staticmethod
+    def encoder_signature(encoders, names):
+        """Hash de las clases de los encoders que usa un modelo"""
+        digest = hashlib.sha256()
+        for name in names:
+            encoder = encoders.get(name)
+            classes = encoder.classes_ if encoder is not None else []
+            digest.update(name.encode())
+            digest.update('\x1f'.join(map(str, classes)).encode())
+        return digest.hexdigest()[:16]
+
+    def load_seen_rows(self, model_name):
+        """Hashes de las filas con las que se entrenó el modelo la última vez"""
+        path = os.path.join(self.cache_path, f'{model_name}_rows.npy')
+        return np.load(path) if os.path.exists(path) else None
+
+    def save_seen_rows(self, model_name, row_hashes):
+        np.save(os.path.join(self.cache_path, f'{model_name}_rows.npy'), np.unique(row_hashes))
+
+    # ==================== FEATURES ====================
+
+    def load_features(self, model_name, dataset_hash, signature):
+        """Devuelve (X, y, feature_names) si hay features cacheadas para ese snapshot"""
+        path = os.path.join(self.cache_path, f'{model_name}_features.npz')
+        if not os.path.exists(path):
+            return None
+        cached = np.load(path, allow_pickle=False)
+        if str(cached['dataset_hash']) != dataset_hash or str(cached['signature']) != signature:
+            return None
+        return cached['X'], cached['y'], cached['feature_names'].tolist()
+
+    def save_features(self, model_name, dataset_hash, signature, X, y, feature_names):
+        np.savez(
+            os.path.join(self.cache_path, f'{model_name}_features.npz'),
+            X=X, y=y, feature_names=np.array(feature_names),
+            dataset_hash=dataset_hash, signature=signature,
+        )
+
+    # ==================== ESTADO POR MODELO ====================
+
+    def get_model_state(self, model_name):
+        return self.state.get(model_name, {})
+
+    def update_model_state(self, model_name, **values):
+        state = self.state.setdefault(model_name, {})
+        state.update(values)
+        state['trained_at'] = datetime.now().isoformat(timespec='seconds')
@@ -0,0 +1,666 @@
+#!/usr/bin/env python3
+"""
+Club Registry - Índice único de clubes y servicio de multiplicadores de club
+
+Carga clubs_database.json una sola vez y construye índices en memoria
+(nombre exacto, alias, tokens normalizados y siglas) para resolver
+cualquier nombre de club en O(1). Los tiers se derivan del valor de
+mercado de cada club, así que no hace falta mantener listas a mano.
+
+Las filiales, reservas y juveniles salen de team_children.csv (TeamHierarchy):
+hijo -> padre, padre -> hijos y profundidad precalculados al cargar.
+"""
+
+import os
+import re
+import csv
+import json
+import threading
+import unicodedata
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLUBS_DATABASE_PATH = os.path.join(PROJECT_ROOT, 'clubs_database.json')
+TEAM_CHILDREN_PATH = os.path.join(PROJECT_ROOT, 'data', 'extracted', 'team_children', 'team_children.csv')
+
+# Umbrales de valor de mercado (mismos que _classify_club en app/main.py)
+TIER_THRESHOLDS = [
+    ('elite', 1_000_000_000),
+    ('top', 500_000_000),
+    ('big', 200_000_000),
+    ('medium', 50_000_000),
+]
+
+# Columnas precalculadas por club (mismos criterios que usaban las rutas de clubes de app/main.py)
+ECONOMIC_FACTORS = {'elite': 1.5, 'top': 1.3, 'big': 1.2, 'medium': 1.1, 'small': 1.0}
+CLUB_CLASSES = {'elite': 'Elite Club', 'top': 'Top Club', 'big': 'Big Club', 'medium': 'Medium Club', 'small': 'Small Club'}
+LEAGUE_FACTORS = {
+    'Spain': 1.4,       # La Liga - alta competitividad
+    'England': 1.5,     # Premier League - máxima competitividad
+    'Germany': 1.3,     # Bundesliga - alta competitividad
+    'Italy': 1.3,       # Serie A - alta competitividad
+    'France': 1.2,      # Ligue 1 - buena competitividad
+    'Netherlands': 1.2,  # Eredivisie
+    'Portugal': 1.1,    # Primeira Liga
+    'Argentina': 1.1,   # Liga Argentina
+    'Brazil': 1.1,      # Brasileirão
+    'Mexico': 1.1,      # Liga MX
+    'Colombia': 1.0,    # Liga Colombiana
+    'Chile': 1.0,       # Liga Chilena
+    'Ecuador': 1.0,     # Liga Ecuatoriana
+}
+CLUB_FACTOR_COLUMNS = ('economic_factor', 'league_factor', 'classification', 'squad_analysis', 'transfer_potential')
+# Potencial de transferencia: (umbral de economic * league * squad, etiqueta), de mayor a menor
+TRANSFER_POTENTIAL_LEVELS = [(2.0, "Muy Alto"), (1.5, "Alto"), (1.2, "Medio-Alto"), (1.0, "Medio"), (0.8, "Bajo")]
+DEFAULT_CLUB_MARKET_VALUE = 50_000_000
+DEFAULT_CLUB_COUNTRY = 'Unknown'
+
+# Multiplicador de club de destino del modelo híbrido 2025
+HYBRID_TIER_MULTIPLIERS = {'elite': 1.4, 'top': 1.2, 'big': 1.1}
+
+# Multiplicador base cuando el club no está en la tabla de multiplicadores CSV
+DEFAULT_TIER_MULTIPLIERS = {'elite': 1.05, 'top': 1.05, 'big': 1.02}
+LOWER_TEAM_MULTIPLIER = 0.9
+
+# Tipos de equipo de la jerarquía de clubes
+FIRST_TEAM = 'first_team'
+RESERVE_TEAM = 'reserve'
+YOUTH_TEAM = 'youth'
+
+# Marcadores de juveniles sobre el nombre normalizado (sin tildes ni signos)
+YOUTH_PATTERN = re.compile(
+    r'\b(?:(?:u|sub|under|y) ?(?:1\d|2[0-3])|youth|jugend|juvenil|juveniles|juniores|primavera|'
+    r'giovanili|academy|akademie|ungdom|jeugd|formacao|camadas jovens)\b')
+# Reservas solo como última (o primera) palabra: "Bayern II", "Jong Ajax"; "Schalke 04" o "B 93" no
+RESERVE_SUFFIXES = {'b', 'c', 'ii', 'iii', 'iv', '2', 'reserve', 'reserves', 'reserva', 'reservas'}
+RESERVE_PREFIXES = {'jong'}
+
+# Ajuste por valor del jugador: límites en euros y factor por tramo (de menor a mayor)
+PLAYER_VALUE_BOUNDS = [1_000_000, 5_000_000, 20_000_000, 50_000_000, 100_000_000]
+MATCHED_VALUE_ADJUSTMENTS = (1.03, 1.02, 1.01, 1.0, 0.98, 0.95)  # Club con multiplicador conocido
+DEFAULT_VALUE_ADJUSTMENTS = (1.1, 1.0, 0.95, 0.9, 0.8, 0.7)      # Club desconocido (más conservador)
+
+# Palabras que no identifican a un club ("FC", "Club", "de", ...)
+STOPWORDS = {
+    'fc', 'cf', 'ac', 'sc', 'cd', 'ca', 'cs', 'afc', 'sfc', 'club', 'de', 'del', 'la', 'el', 'the',
+    'football', 'futbol', 'fussball', 'calcio', 'sad', 'spa', 'sa', 'ssc', 'ss', 'as', 'ud', 'sd',
+    'rcd', 'fk', 'sk', 'nk', 'if', 'bk', 'sv', 'vfb', 'vfl', 'tsg', 'bv', 'ev', 'e', 'v', 'and', 'y',
+}
+
+
+def normalize_club_name(name) -> str:
+    """Normalizar nombre de club: sin tildes, minúsculas y sin signos"""
+    if name is None:
+        return ""
+    name = str(name)
+    if name.lower() == 'nan':
+        return ""
+    name = re.sub(r'\([^)]*\)', ' ', name)
+    name = unicodedata.normalize('NFD', name)
+    name = ''.join(c for c in name if unicodedata.category(c) != 'Mn')
+    name = re.sub(r'[^\w\s]', ' ', name.lower())
+    return re.sub(r'\s+', ' ', name).strip()
+
+
+def club_tokens(normalized: str) -> List[str]:
+    """Tokens significativos de un nombre ya normalizado"""
+    tokens = [t for t in normalized.split() if t not in STOPWORDS]
+    return tokens or normalized.split()
+
+
+def get_value_tier(market_value) -> str:
+    """Tier del club según su valor de mercado"""
+    try:
+        market_value = float(market_value or 0)
+    except (TypeError, ValueError):
+        market_value = 0
+    for tier, threshold in TIER_THRESHOLDS:
+        if market_value >= threshold:
+            return tier
+    return 'small'
+
+
+def economic_factor(market_value) -> float:
+    """Factor económico del club según su valor de mercado"""
+    return ECONOMIC_FACTORS[get_value_tier(market_value)]
+
+
+def league_factor(country) -> float:
+    """Factor de liga según el país del club"""
+    return LEAGUE_FACTORS.get(country, 1.0)
+
+
+def club_class(market_value) -> str:
+    """Clasificación del club (Elite Club, Top Club, ...) según su valor de mercado"""
+    return CLUB_CLASSES[get_value_tier(market_value)]
+
+
+def squad_analysis(squad_size) -> str:
+    """Necesidades de la plantilla según su tamaño"""
+    squad_size = squad_size or 0
+    if squad_size < 20:
+        return "Necesita refuerzos"
+    elif squad_size > 30:
+        return "Plantilla completa"
+    return "Plantilla equilibrada"
+
+
+def transfer_potential(market_value, squad_size, country) -> str:
+    """Potencial de transferencia: factor económico x factor de liga x necesidad de plantilla"""
+    squad_size = squad_size or 0
+    if squad_size < 20:
+        squad_factor = 1.3  # Alta necesidad
+    elif squad_size > 30:
+        squad_factor = 0.8  # Baja necesidad
+    else:
+        squad_factor = 1.0  # Necesidad normal
+
+    potential = economic_factor(market_value) * league_factor(country) * squad_factor
+    for threshold, label in TRANSFER_POTENTIAL_LEVELS:
+        if potential >= threshold:
+            return label
+    return "Muy Bajo"
+
+
+def club_factors(market_value, squad_size, country) -> Dict:
+    """Columnas de factores de un club (las que el registro precalcula por club)"""
+    tier = get_value_tier(market_value)
+    return {
+        'economic_factor': ECONOMIC_FACTORS[tier],
+        'league_factor': league_factor(country),
+        'classification': CLUB_CLASSES[tier],
+        'squad_analysis': squad_analysis(squad_size),
+        'transfer_potential': transfer_potential(market_value, squad_size, country),
+    }
+
+
+def classify_team_name(name) -> str:
+    """Tipo de equipo según los marcadores del nombre (first_team, reserve o youth)"""
+    normalized = normalize_club_name(name)
+    if not normalized:
+        return FIRST_TEAM
+    if YOUTH_PATTERN.search(normalized):
+        return YOUTH_TEAM
+    words = normalized.split()
+    if words[-1] in RESERVE_SUFFIXES or words[0] in RESERVE_PREFIXES:
+        return RESERVE_TEAM
+    return FIRST_TEAM
+
+
+def _parse_team_id(team_id) -> Optional[int]:
+    try:
+        return int(team_id)
+    except (TypeError, ValueError):
+        return None
+
+
+def player_value_bucket(player_value) -> int:
+    """Índice del tramo de valor del jugador (0 = más barato)"""
+    try:
+        return bisect_right(PLAYER_VALUE_BOUNDS, float(player_value or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+class NameIndex:
+    """Índice de nombres -> clave con búsqueda exacta, por alias, por tokens y por siglas"""
+
+    def __init__(self):
+        self.exact = {}     # nombre tal cual (minúsculas) -> clave
+        self.aliases = {}   # nombre o alias normalizado -> clave
+        self.token_keys = {}  # tokens significativos ordenados -> clave
+        self.acronyms = {}  # siglas (>= 3 letras) -> clave
+        self.postings = {}  # token -> lista de claves (ordenada por peso descendente)
+        self.sorted_tokens = []  # tokens ordenados alfabéticamente (búsqueda por prefijo)
+        self._weights = {}
+
+    def add(self, key, names, weight=0.0):
+        """Registrar una clave con su nombre principal y alias"""
+        self._weights[key] = weight
+        names = [n for n in names if n]
+        if not names:
+            return
+
+        self._add_if_heavier(self.exact, str(names[0]).strip().lower(), key)
+        for name in names:
+            normalized = normalize_club_name(name)
+            if not normalized:
+                continue
+            self._add_if_heavier(self.aliases, normalized, key)
+
+            tokens = club_tokens(normalized)
+            self._add_if_heavier(self.token_keys, ' '.join(sorted(tokens)), key)
+            if len(tokens) >= 3:
+                self._add_if_heavier(self.acronyms, ''.join(t[0] for t in tokens), key)
+            for token in set(tokens):
+                self.postings.setdefault(token, []).append(key)
+
+    def copy(self) -> 'NameIndex':
+        """Copia independiente (para agregar claves sin tocar el índice que están leyendo otros hilos)"""
+        index = NameIndex()
+        index.exact = dict(self.exact)
+        index.aliases = dict(self.aliases)
+        index.token_keys = dict(self.token_keys)
+        index.acronyms = dict(self.acronyms)
+        index.postings = {token: list(keys) for token, keys in self.postings.items()}
+        index.sorted_tokens = list(self.sorted_tokens)
+        index._weights = dict(self._weights)
+        return index
+
+    def finalize(self, tokens=None):
+        """Ordenar las listas de tokens por peso (todas, o solo las de tokens tras agregar claves)"""
+        for token in (self.postings if tokens is None else tokens):
+            keys = self.postings.get(token, [])
+            self.postings[token] = sorted(set(keys), key=lambda k: self._weights.get(k, 0), reverse=True)
+        self.sorted_tokens = sorted(self.postings)
+
+    def prefix_keys(self, prefix) -> set:
+        """Claves con algún token que empiece con prefix (búsqueda binaria sobre los tokens)"""
+        keys = set()
+        tokens = self.sorted_tokens
+        for i in range(bisect_left(tokens, prefix), len(tokens)):
+            if not tokens[i].startswith(prefix):
+                break
+            keys.update(self.postings[tokens[i]])
+        return keys
+
+    def _add_if_heavier(self, index, name_key, key):
+        current = index.get(name_key)
+        if current is None or self._weights.get(key, 0) > self._weights.get(current, 0):
+            index[name_key] = key
+
+    def lookup(self, name) -> Tuple[Optional[object], Optional[str]]:
+        """Resolver un nombre; devuelve (clave, tipo_de_match)"""
+        if not name:
+            return None, None
+
+        key = self.exact.get(str(name).strip().lower())
+        if key is not None:
+            return key, 'exact'
+
+        normalized = normalize_club_name(name)
+        if not normalized:
+            return None, None
+
+        key = self.aliases.get(normalized)
+        if key is not None:
+            return key, 'alias'
+
+        tokens = club_tokens(normalized)
+        key = self.token_keys.get(' '.join(sorted(tokens)))
+        if key is not None:
+            return key, 'tokens'
+
+        if len(tokens) == 1:
+            key = self.acronyms.get(tokens[0])
+            if key is not None:
+                return key, 'acronym'
+
+        # Club de más peso que contenga todos los tokens de la búsqueda
+        candidate_lists = [self.postings.get(t) for t in tokens]
+        if candidate_lists and all(candidate_lists):
+            candidate_lists.sort(key=len)
+            others = [set(keys) for keys in candidate_lists[1:]]
+            for key in candidate_lists[0]:
+                if all(key in other for other in others):
+                    return key, 'partial'
+
+        return None, None
+
+
+class TeamHierarchy:
+    """Índice precalculado de team_children.csv: hijo -> padre, padre -> hijos, profundidad y tipo"""
+
+    def __init__(self, csv_path: str = TEAM_CHILDREN_PATH, club_values: Optional[Dict[int, float]] = None):
+        self.csv_path = csv_path
+        self.parent: Dict[int, int] = {}            # equipo dependiente -> club padre
+        self.children: Dict[int, List[int]] = {}    # club padre -> equipos dependientes
+        self.names: Dict[int, str] = {}
+        self.depth: Dict[int, int] = {}             # 0 = primer equipo, 1 = filial, 2 = filial de filial
+        self.kind: Dict[int, str] = {}
+        self.index = NameIndex()
+        self.inverted_edges = 0
+        self._name_cache: Dict[str, Optional[int]] = {}
+        self._kind_cache: Dict[str, str] = {}
+
+        self._load(club_values or {})
+
+    def _load(self, club_values: Dict[int, float]):
+        """Leer el CSV y precalcular padres, hijos, profundidad y tipo de cada equipo"""
+        edges = []
+        try:
+            with open(self.csv_path, 'r', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    parent_id = _parse_team_id(row.get('parent_team_id'))
+                    child_id = _parse_team_id(row.get('child_team_id'))
+                    if parent_id is None or child_id is None:
+                        continue
+                    self.names.setdefault(parent_id, row.get('parent_team_name') or '')
+                    self.names.setdefault(child_id, row.get('child_team_name') or '')
+                    if parent_id != child_id:
+                        edges.append((parent_id, child_id))
+        except Exception as e:
+            print(f"⚠️ No se pudo cargar {self.csv_path}: {e}")
+            return
+
+        name_kinds = {team_id: classify_team_name(name) for team_id, name in self.names.items()}
+        for parent_id, child_id in edges:
+            # El CSV trae algunas relaciones al revés ("Atalanta BC U17" -> "Atalanta BC",
+            # "CD Tapatío" -> "Deportivo Guadalajara"): el primer equipo es el que no tiene
+            # marcadores de reserva, o el de mayor valor de mercado
+            if ((name_kinds[parent_id] != FIRST_TEAM and name_kinds[child_id] == FIRST_TEAM) or
+                    club_values.get(child_id, 0) > club_values.get(parent_id, 0)):
+                parent_id, child_id = child_id, parent_id
+                self.inverted_edges += 1
+            # Un equipo con dos padres se queda con el primero que aparece
+            if child_id in self.parent or self.parent.get(parent_id) == child_id:
+                continue
+            self.parent[child_id] = parent_id
+            self.children.setdefault(parent_id, []).append(child_id)
+
+        for team_id, name in self.names.items():
+            depth = len(self._ancestors(team_id))
+            self.depth[team_id] = depth
+            # Los hijos sin marcador en el nombre ("CD Basconia", "FC Barcelona Atlètic") son filiales
+            kind = name_kinds[team_id]
+            self.kind[team_id] = RESERVE_TEAM if kind == FIRST_TEAM and depth > 0 else kind
+            self.index.add(team_id, [name], weight=-depth)
+        self.index.finalize()
+
+        lower_teams = sum(1 for kind in self.kind.values() if kind != FIRST_TEAM)
+        print(f"✅ Team hierarchy: {len(self.children)} clubes con {len(self.parent)} equipos dependientes "
+              f"({lower_teams} reservas/juveniles)")
+
+    def _ancestors(self, team_id: int) -> List[int]:
+        """Padres de un equipo, del más cercano al club principal"""
+        ancestors, seen = [], {team_id}
+        while team_id in self.parent and self.parent[team_id] not in seen:
+            team_id = self.parent[team_id]
+            seen.add(team_id)
+            ancestors.append(team_id)
+        return ancestors
+
+    def resolve(self, club_name=None, club_id=None) -> Optional[int]:
+        """ID del equipo en el índice, por ID o por nombre (sin matches parciales)"""
+        team_id = _parse_team_id(club_id)
+        if team_id is not None and team_id in self.names:
+            return team_id
+
+        normalized = normalize_club_name(club_name)
+        if not normalized:
+            return None
+        if normalized not in self._name_cache:
+            key, match_type = self.index.lookup(club_name)
+            # Un match parcial confundiría "Boca" con "Boca Juniors U20"
+            self._name_cache[normalized] = key if match_type in ('exact', 'alias', 'tokens') else None
+        return self._name_cache[normalized]
+
+    def team_kind(self, club_name=None, club_id=None) -> str:
+        """first_team, reserve o youth (equipos fuera del CSV: por marcadores del nombre, memoizado)"""
+        team_id = self.resolve(club_name, club_id)
+        if team_id is not None:
+            return self.kind[team_id]
+
+        normalized = normalize_club_name(club_name)
+        kind = self._kind_cache.get(normalized)
+        if kind is None:
+            kind = classify_team_name(normalized)
+            self._kind_cache[normalized] = kind
+        return kind
+
+    def is_lower_team(self, club_name=None, club_id=None) -> bool:
+        """True para filiales, reservas y juveniles"""
+        return self.team_kind(club_name, club_id) != FIRST_TEAM
+
+    def get_parent(self, club_name=None, club_id=None) -> Optional[Dict]:
+        """Club principal de un equipo dependiente ({id, name}) o None si ya es primer equipo"""
+        team_id = self.resolve(club_name, club_id)
+        ancestors = self._ancestors(team_id) if team_id is not None else []
+        if not ancestors:
+            return None
+        return {'id': str(ancestors[-1]), 'name': self.names.get(ancestors[-1], '')}
+
+    def get_children(self, club_name=None, club_id=None) -> List[Dict]:
+        """Equipos dependientes directos de un club ({id, name, kind})"""
+        team_id = self.resolve(club_name, club_id)
+        return [{'id': str(child_id), 'name': self.names.get(child_id, ''), 'kind': self.kind.get(child_id)}
+                for child_id in self.children.get(team_id, [])]
+
+    def stats(self) -> Dict:
+        return {
+            'teams': len(self.names),
+            'parents': len(self.children),
+            'children': len(self.parent),
+            'inverted_edges': self.inverted_edges,
+            'max_depth': max(self.depth.values(), default=0),
+        }
+
+
+class ClubRegistry:
+    """Registro de clubes en memoria con tiers precalculados y multiplicadores memoizados"""
+
+    def __init__(self, database_path: str = CLUBS_DATABASE_PATH):
+        self.database_path = database_path
+        self.clubs: Dict[str, Dict] = {}
+        self.index = NameIndex()
+        self._resolve_cache: Dict[str, Optional[str]] = {}
+
+        # Tabla de multiplicadores CSV (realistic_club_multipliers.csv y similares)
+        self._multiplier_table = None
+        self._multiplier_index = NameIndex()
+        self._multiplier_rows: Dict[int, Tuple[float, str]] = {}
+        self._multiplier_memo: Dict[Tuple[str, int], float] = {}
+        self._write_lock = threading.Lock()
+
+        self._load_database()
+        club_values = {int(club_id): float(club.get('market_value') or 0)
+                       for club_id, club in self.clubs.items() if club_id.isdigit()}
+        self.hierarchy = TeamHierarchy(club_values=club_values)
+
+    def _load_database(self):
+        """Cargar clubs_database.json y construir los índices"""
+        try:
+            with open(self.database_path, 'r', encoding='utf-8') as f:
+                clubs = json.load(f).get('clubs', {})
+        except Exception as e:
+            print(f"⚠️ No se pudo cargar {self.database_path}: {e}")
+            clubs = {}
+
+        for club_id, club in clubs.items():
+            self._add_record(club_id, club, self.clubs, self.index)
+        self.index.finalize()
+
+        print(f"✅ Club registry: {len(self.clubs)} clubes indexados")
+
+    def _add_record(self, club_id, club, clubs, index) -> List[str]:
+        """Registrar un club en clubs e index; devuelve los nombres indexados"""
+        record = dict(club)
+        record['id'] = str(club_id)
+        record['value_tier'] = get_value_tier(record.get('market_value'))
+        record.update(club_factors(record.get('market_value') or 0, record.get('squad_size') or 0,
+                                   record.get('country') or ''))
+        clubs[record['id']] = record
+        names = [record.get('name'), record.get('official_name')] + list(record.get('aliases') or [])
+        index.add(record['id'], names, weight=float(record.get('market_value') or 0))
+        return [n for n in names if n]
+
+    def add_remote_clubs(self, results) -> int:
+        """
+        Sumar al registro clubes de /clubs/search de transfermarkt-api que no estaban en la base
+        (enriquecimiento: la próxima búsqueda los resuelve localmente). Devuelve cuántos se agregaron.
+
+        Los lectores no toman lock: los clubes nuevos se agregan a copias de clubs y del índice,
+        que después se reemplazan enteras (primero clubs, así un índice nuevo nunca apunta a un
+        club que todavía no está).
+        """
+        with self._write_lock:
+            clubs, index = None, None
+            touched_tokens = set()
+            added = 0
+            for club in results or []:
+                club_id = str(club.get('id') or '')
+                if not club_id or club_id in (clubs or self.clubs) or not club.get('name'):
+                    continue
+                if clubs is None:
+                    clubs, index = dict(self.clubs), self.index.copy()
+                names = self._add_record(club_id, {
+                    'name': club.get('name'),
+                    'country': club.get('country') or '',
+                    'market_value': club.get('marketValue') or 0,
+                    'url': club.get('url') or '',
+                    'squad_size': club.get('squad') or 0,
+                    'aliases': [club.get('name')],
+                    'source': 'search',
+                }, clubs, index)
+                for name in names:
+                    touched_tokens.update(club_tokens(normalize_club_name(name)))
+                added += 1
+            if added:
+                index.finalize(touched_tokens)
+                self.clubs = clubs
+                self.index = index
+                # Los nombres que antes no resolvían pueden resolver ahora
+                self._resolve_cache = {}
+            return added
+
+    # ==================== RESOLUCIÓN DE CLUBES ====================
+
+    def resolve(self, club_name) -> Optional[Dict]:
+        """Devolver el registro del club que corresponde a un nombre (o None)"""
+        normalized = normalize_club_name(club_name)
+        if not normalized:
+            return None
+        # Una sola lectura de cada atributo: add_remote_clubs los reemplaza desde otro hilo
+        cache = self._resolve_cache
+        if normalized in cache:
+            club_id = cache[normalized]
+        else:
+            club_id, _ = self.index.lookup(club_name)
+            cache[normalized] = club_id
+        return self.clubs.get(club_id) if club_id is not None else None
+
+    def search(self, query, limit: int = 20) -> List[Dict]:
+        """
+        Autocompletado local: clubes cuyos tokens empiezan con los de la búsqueda.
+        Orden: nombre o alias exacto primero, después por valor de mercado.
+        """
+        normalized = normalize_club_name(query)
+        if not normalized:
+            return []
+
+        # Índice antes que clubs: add_remote_clubs reemplaza clubs primero
+        index = self.index
+        clubs = self.clubs
+        candidates = None
+        for token in club_tokens(normalized):
+            keys = index.prefix_keys(token)
+            candidates = keys if candidates is None else candidates & keys
+            if not candidates:
+                return []
+
+        exact_key = index.aliases.get(normalized)
+
+        def rank(club_id):
+            return club_id == exact_key, float(clubs[club_id].get('market_value') or 0)
+
+        return [clubs[club_id] for club_id in sorted(candidates, key=rank, reverse=True)[:limit]]
+
+    def get_factors(self, club) -> Dict:
+        """Factores precalculados de un club del registro"""
+        return {column: club[column] for column in CLUB_FACTOR_COLUMNS}
+
+    def get_market_value(self, club_name, default=DEFAULT_CLUB_MARKET_VALUE):
+        """Valor de mercado del club (default si no se conoce)"""
+        club = self.resolve(club_name)
+        return (club.get('market_value') or default) if club else default
+
+    def get_country(self, club_name, default=DEFAULT_CLUB_COUNTRY) -> str:
+        """País del club (default si no se conoce)"""
+        club = self.resolve(club_name)
+        return (club.get('country') or default) if club else default
+
+    def get_tier(self, club_name) -> Optional[str]:
+        """Tier del club (elite/top/big/medium/small) o None si no se conoce"""
+        club = self.resolve(club_name)
+        return club['value_tier'] if club else None
+
+    def get_tier_multiplier(self, club_name, multipliers: Dict[str, float] = HYBRID_TIER_MULTIPLIERS, default: float = 1.0) -> float:
+        """Multiplicador del club de destino según su tier"""
+        return multipliers.get(self.get_tier(club_name), default)
+
+    # ==================== MULTIPLICADORES DINÁMICOS ====================
+
+    def set_multiplier_table(self, table):
+        """Indexar la tabla de multiplicadores de clubes (DataFrame con club_name y final_multiplier)"""
+        if table is self._multiplier_table:
+            return
+
+        index = NameIndex()
+        rows = {}
+        if table is not None and not getattr(table, 'empty', True) and 'club_name' in table.columns:
+            names = table['club_name'].tolist()
+            multipliers = table['final_multiplier'].tolist() if 'final_multiplier' in table.columns else [1.0] * len(names)
+            categories = table['category'].tolist() if 'category' in table.columns else ['Primera Division'] * len(names)
+            for row_id, (name, multiplier, category) in enumerate(zip(names, multipliers, categories)):
+                if not isinstance(name, str) or not name:
+                    continue
+                # La primera fila gana ante nombres repetidos (igual que el filtro exacto anterior)
+                index.add(row_id, [name], weight=-row_id)
+                rows[row_id] = (float(multiplier), category)
+            index.finalize()
+
+        self._multiplier_index = index
+        self._multiplier_rows = rows
+        self._multiplier_memo = {}
+        self._multiplier_table = table
+
+    def lookup_table_multiplier(self, club_name) -> Optional[Tuple[float, str]]:
+        """Buscar (multiplicador, categoría) del club en la tabla CSV"""
+        if not self._multiplier_rows:
+            return None
+        row_id, _ = self._multiplier_index.lookup(club_name)
+        return self._multiplier_rows.get(row_id) if row_id is not None else None
+
+    def get_default_multiplier(self, club_name) -> float:
+        """Multiplicador base para clubes fuera de la tabla CSV"""
+        tier_multiplier = DEFAULT_TIER_MULTIPLIERS.get(self.get_tier(club_name))
+        if tier_multiplier is not None:
+            return tier_multiplier
+
+        # Filiales, reservas y juveniles
+        if self.hierarchy.is_lower_team(club_name):
+            return LOWER_TEAM_MULTIPLIER
+
+        return 1.0
+
+    def get_dynamic_multiplier(self, club_name, player_value) -> float:
+        """Multiplicador final de club ajustado por el valor del jugador (memoizado)"""
+        bucket = player_value_bucket(player_value)
+        memo_key = (normalize_club_name(club_name), bucket)
+        cached = self._multiplier_memo.get(memo_key)
+        if cached is not None:
+            return cached
+
+        table_match = self.lookup_table_multiplier(club_name)
+        if table_match is not None:
+            multiplier = table_match[0] * MATCHED_VALUE_ADJUSTMENTS[bucket]
+        else:
+            multiplier = self.get_default_multiplier(club_name) * DEFAULT_VALUE_ADJUSTMENTS[bucket]
+
+        self._multiplier_memo[memo_key] = multiplier
+        return multiplier
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_club_registry() -> ClubRegistry:
+    """Instancia única del registro de clubes (se carga la primera vez que se usa)"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ClubRegistry()
+    return _registry
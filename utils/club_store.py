@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Club Store - Almacén append-only de clubes para los crawlers
+
+Los crawlers reescribían clubs_database.json completo (indent=2) cada vez que guardaban,
+así que el I/O del crawl crecía cuadráticamente con la base. Acá cada guardado agrega
+líneas a segmentos JSON Lines (O(1) por club):
+
+    {"op": "club", "id": "123", "club": {...}}
+    {"op": "meta", "metadata": {...}}
+    {"op": "reset"}
+
+El estado se reconstruye reproduciendo los segmentos en orden (el último registro de cada
+club gana). export_json() genera el clubs_database.json que consume la app y compact()
+reemplaza todos los segmentos por un único snapshot.
+
+El store se siembra desde clubs_database.json y registra su firma (tamaño, mtime y sha256)
+al sembrar y en cada export. Si el archivo cambió por fuera (git pull, arreglo a mano), el
+store se vuelve a sembrar al abrirse, y si cambia durante una corrida el export no lo pisa.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLUB_STORE_DIR = os.path.join(PROJECT_ROOT, 'data', 'clubs_store')
+CLUBS_DATABASE_PATH = os.path.join(PROJECT_ROOT, 'clubs_database.json')
+
+SEGMENT_MAX_BYTES = 8 * 1024 * 1024
+SEGMENT_PATTERN = 'segment_{:05d}.jsonl'
+SEED_SIGNATURE_FILE = 'seed.json'
+
+
+def file_signature(path: str, with_hash: bool = True) -> Dict:
+    """Tamaño, mtime y (opcional) sha256 de un archivo"""
+    stat = os.stat(path)
+    signature = {'size': stat.st_size, 'mtime': stat.st_mtime}
+    if with_hash:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        signature['sha256'] = digest.hexdigest()
+    return signature
+
+
+class ClubStore:
+    """Segmentos JSONL append-only con compactación y export a clubs_database.json"""
+
+    def __init__(self, store_dir: str = CLUB_STORE_DIR, seed_path: Optional[str] = CLUBS_DATABASE_PATH):
+        self.store_dir = store_dir
+        self.seed_path = seed_path
+        self._synced = False    # El seed se revisa una vez por instancia (una por corrida)
+        self._lock = threading.Lock()
+        os.makedirs(store_dir, exist_ok=True)
+
+    def _segments(self):
+        return sorted(f for f in os.listdir(self.store_dir)
+                      if f.startswith('segment_') and f.endswith('.jsonl'))
+
+    def _segment_path(self, index: int) -> str:
+        return os.path.join(self.store_dir, SEGMENT_PATTERN.format(index))
+
+    def _active_segment(self) -> str:
+        segments = self._segments()
+        if not segments:
+            return self._segment_path(1)
+        path = os.path.join(self.store_dir, segments[-1])
+        if os.path.getsize(path) >= SEGMENT_MAX_BYTES:
+            return self._segment_path(int(segments[-1][8:13]) + 1)
+        return path
+
+    def _append(self, records):
+        with self._lock:
+            self._sync_seed()
+            with open(self._active_segment(), 'a', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _signature_path(self) -> str:
+        return os.path.join(self.store_dir, SEED_SIGNATURE_FILE)
+
+    def _read_seed_signature(self) -> Dict:
+        try:
+            with open(self._signature_path(), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _record_seed_signature(self):
+        """Registrar la firma actual de clubs_database.json (tras sembrar o exportar)"""
+        tmp_path = self._signature_path() + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(file_signature(self.seed_path), f)
+        os.replace(tmp_path, self._signature_path())
+
+    def _seed_changed(self) -> bool:
+        """clubs_database.json cambió desde el último seed/export (sin firma registrada cuenta como cambio)"""
+        if not self.seed_path or not os.path.exists(self.seed_path):
+            return False
+        recorded = self._read_seed_signature()
+        current = file_signature(self.seed_path, with_hash=False)
+        if recorded.get('size') == current['size'] and recorded.get('mtime') == current['mtime']:
+            return False
+        # Mismo contenido con otro mtime (checkout, touch): no es un cambio
+        return recorded.get('sha256') != file_signature(self.seed_path)['sha256']
+
+    def _sync_seed(self):
+        """
+        Al abrir el store (llamar con _lock tomado): sembrarlo si está vacío, o volver a sembrarlo
+        si clubs_database.json cambió por fuera desde el último seed/export
+        """
+        if self._synced:
+            return
+        self._synced = True
+        if not self.seed_path or not os.path.exists(self.seed_path):
+            return
+        old_segments = self._segments()
+        if old_segments and not self._seed_changed():
+            return
+        try:
+            with open(self.seed_path, 'r', encoding='utf-8') as f:
+                database = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Club store: no se pudo leer {self.seed_path} para sembrar: {e}")
+            return
+
+        clubs = database.get('clubs', {})
+        if old_segments:
+            print(f"📦 Club store: {self.seed_path} cambió desde el último export, "
+                  f"se vuelve a sembrar con sus {len(clubs)} clubes")
+        else:
+            print(f"📦 Club store: sembrando {len(clubs)} clubes desde {self.seed_path}")
+        next_index = int(old_segments[-1][8:13]) + 1 if old_segments else 1
+        self._write_snapshot(self._segment_path(next_index), clubs, database.get('metadata', {}))
+        for segment in old_segments:
+            os.remove(os.path.join(self.store_dir, segment))
+        self._record_seed_signature()
+
+    def _write_snapshot(self, path, clubs, metadata):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'op': 'meta', 'metadata': metadata}, ensure_ascii=False) + '\n')
+            for club_id, club in clubs.items():
+                f.write(json.dumps({'op': 'club', 'id': str(club_id), 'club': club}, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def append_clubs(self, clubs: Dict[str, Dict]):
+        """Agregar (o reemplazar) clubes; solo escribe las líneas nuevas"""
+        if clubs:
+            self._append({'op': 'club', 'id': str(club_id), 'club': club} for club_id, club in clubs.items())
+
+    def update_metadata(self, metadata: Dict):
+        """Registrar metadata (se mergea con la anterior al reproducir)"""
+        self._append([{'op': 'meta', 'metadata': metadata}])
+
+    def reset(self):
+        """Empezar una base nueva (crawl completo): lo anterior deja de contar al reproducir"""
+        self._append([{'op': 'reset', 'at': datetime.now().isoformat()}])
+
+    def load(self) -> Tuple[Dict[str, Dict], Dict]:
+        """Reproducir los segmentos: (clubs, metadata)"""
+        with self._lock:
+            self._sync_seed()
+            clubs, metadata = {}, {}
+            for segment in self._segments():
+                with open(os.path.join(self.store_dir, segment), 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError:
+                            # Última línea cortada por un kill a mitad de escritura
+                            continue
+                        op = record.get('op')
+                        if op == 'club':
+                            clubs[record['id']] = record['club']
+                        elif op == 'meta':
+                            metadata.update(record.get('metadata', {}))
+                        elif op == 'reset':
+                            clubs, metadata = {}, {}
+            return clubs, metadata
+
+    def export_json(self, path: str = CLUBS_DATABASE_PATH, metadata: Optional[Dict] = None) -> int:
+        """
+        Generar el clubs_database.json que lee la app (escritura atómica)
+
+        Si el archivo cambió por fuera durante la corrida no se pisa: gana el archivo y el
+        próximo seed lo toma. Devuelve los clubes exportados (0 si no se exportó).
+        """
+        is_seed = bool(self.seed_path) and os.path.abspath(path) == os.path.abspath(self.seed_path)
+        clubs, stored_metadata = self.load()
+        if is_seed:
+            with self._lock:
+                changed = self._seed_changed()
+            if changed:
+                print(f"⚠️ Club store: {path} cambió durante la corrida, no se exporta encima")
+                return 0
+        export_metadata = dict(stored_metadata, **(metadata or {}))
+        export_metadata['total_clubs'] = len(clubs)
+        data = {'metadata': export_metadata, 'clubs': clubs}
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        if is_seed:
+            with self._lock:
+                self._record_seed_signature()
+        return len(clubs)
+
+    def compact(self) -> int:
+        """Reemplazar todos los segmentos por un snapshot con el estado actual"""
+        clubs, metadata = self.load()
+        with self._lock:
+            old_segments = self._segments()
+            next_index = int(old_segments[-1][8:13]) + 1 if old_segments else 1
+            self._write_snapshot(self._segment_path(next_index), clubs, metadata)
+            for segment in old_segments:
+                os.remove(os.path.join(self.store_dir, segment))
+        return len(clubs)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Player Index - Índice de nombres de jugadores tolerante a errores de tipeo
+
+buscar_jugador y /autocomplete recorrían los ~92k nombres de player_profiles con
+str.contains en cada búsqueda, y un typo ("Mbape", "Halland") no encontraba nada y
+terminaba en la API remota o en scraping. Acá los nombres se indexan una sola vez:
+
+- nombre completo normalizado (sin tildes ni signos) -> fila
+- token -> filas, con lista ordenada de tokens para búsquedas por prefijo
+- symmetric delete: cada token (>= 3 letras) y sus variantes con una letra borrada ->
+  tokens; un typo se resuelve borrando una letra de la consulta, sin recorrer el índice,
+  y los candidatos se verifican con distancia Damerau-Levenshtein
+"""
+
+import re
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MIN_FUZZY_TOKEN = 3      # Tokens más cortos ("de", "da") solo matchean exacto o por prefijo
+PREFIX_DISTANCE = 0.5    # Un token que solo matchea por prefijo rankea después del exacto
+
+
+def fold_name(name) -> str:
+    """Nombre sin tildes, en minúsculas, sin paréntesis ni signos"""
+    if name is None:
+        return ""
+    name = str(name)
+    if name.lower() == 'nan':
+        return ""
+    name = re.sub(r'\([^)]*\)', ' ', name)
+    name = unicodedata.normalize('NFD', name)
+    name = ''.join(c for c in name if unicodedata.category(c) != 'Mn')
+    name = re.sub(r"['´`’]", '', name.lower())  # N'Golo -> ngolo
+    name = re.sub(r'[^\w\s]', ' ', name)
+    return re.sub(r'\s+', ' ', name).strip()
+
+
+def max_distance(token: str) -> int:
+    """Errores tolerados según el largo del token"""
+    return 1 if len(token) <= 5 else 2
+
+
+def _deletes(token: str) -> set:
+    """El token y sus variantes con una letra borrada"""
+    return {token} | {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Distancia Damerau-Levenshtein (transposiciones adyacentes); corta al superar limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = current[0]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous2 is not None and i > 1 and j > 1 and
+                    a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous2[j - 2] + 1)
+            row_min = min(row_min, current[j])
+        if row_min > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class PlayerNameIndex:
+    """Índice exacto, por tokens, por prefijo y por typos sobre los nombres de jugadores"""
+
+    def __init__(self, names: Iterable, source=None):
+        self.names = list(names)
+        self.source = source    # Objeto del que salieron los nombres (para detectar cambios)
+        self.exact: Dict[str, int] = {}
+        self.token_rows: Dict[str, List[int]] = {}
+        self.deletes: Dict[str, List[str]] = {}
+
+        for row, name in enumerate(self.names):
+            folded = fold_name(name)
+            if not folded:
+                continue
+            # Ante nombres repetidos gana la primera fila (igual que iloc[0] sobre el DataFrame)
+            self.exact.setdefault(folded, row)
+            for token in set(folded.split()):
+                self.token_rows.setdefault(token, []).append(row)
+
+        self.sorted_tokens = sorted(self.token_rows)
+        for token in self.sorted_tokens:
+            if len(token) >= MIN_FUZZY_TOKEN:
+                for variant in _deletes(token):
+                    self.deletes.setdefault(variant, []).append(token)
+
+    def __len__(self):
+        return len(self.names)
+
+    def _prefix_tokens(self, prefix: str) -> Dict[str, float]:
+        matches = {}
+        for i in range(bisect_left(self.sorted_tokens, prefix), len(self.sorted_tokens)):
+            token = self.sorted_tokens[i]
+            if not token.startswith(prefix):
+                break
+            matches[token] = 0 if token == prefix else PREFIX_DISTANCE
+        return matches
+
+    def fuzzy_tokens(self, token: str) -> Dict[str, int]:
+        """Tokens del índice a distancia <= max_distance(token) (symmetric delete + verificación)"""
+        if len(token) < MIN_FUZZY_TOKEN:
+            return {}
+        limit = max_distance(token)
+        candidates = set()
+        for variant in _deletes(token):
+            candidates.update(self.deletes.get(variant, ()))
+        matches = {}
+        for candidate in candidates:
+            distance = edit_distance(token, candidate, limit)
+            if distance <= limit:
+                matches[candidate] = distance
+        return matches
+
+    def _token_matches(self, token: str, prefix: bool, fuzzy: bool) -> Dict[str, float]:
+        if prefix:
+            matches = self._prefix_tokens(token)
+        else:
+            matches = {token: 0} if token in self.token_rows else {}
+        if fuzzy:
+            # Los typos se suman aunque haya matches exactos: "Erling Halland" tiene que llegar a
+            # "haaland" aunque exista algún "hallandXXX" para el prefijo
+            for candidate, distance in self.fuzzy_tokens(token).items():
+                matches.setdefault(candidate, distance)
+        return matches
+
+    def search(self, query, limit: int = 10, prefix: bool = True, fuzzy: bool = True) -> List[Tuple[int, str]]:
+        """
+        Filas que matchean la búsqueda: [(fila, tipo)] con tipo 'exact', 'tokens' o 'fuzzy'
+
+        Todos los tokens de la búsqueda tienen que matchear (el último también por prefijo si
+        prefix=True). Orden: nombre exacto, menor distancia total y, ante empates, la primera fila.
+        """
+        folded = fold_name(query)
+        if not folded:
+            return []
+
+        results = []
+        exact_row = self.exact.get(folded)
+        if exact_row is not None:
+            results.append((exact_row, 'exact'))
+            if limit <= 1:
+                return results
+
+        tokens = folded.split()
+        per_token = []
+        for position, token in enumerate(tokens):
+            matches = self._token_matches(token, prefix and position == len(tokens) - 1, fuzzy)
+            if not matches:
+                return results
+            # Fila -> menor distancia entre los tokens candidatos
+            rows = {}
+            for candidate, distance in matches.items():
+                for row in self.token_rows[candidate]:
+                    if distance < rows.get(row, float('inf')):
+                        rows[row] = distance
+            per_token.append(rows)
+
+        per_token.sort(key=len)
+        scored = per_token[0]
+        for rows in per_token[1:]:
+            scored = {row: distance + rows[row] for row, distance in scored.items() if row in rows}
+            if not scored:
+                return results
+
+        ranked = sorted((distance, row) for row, distance in scored.items() if row != exact_row)
+        for distance, row in ranked[:limit - len(results)]:
+            results.append((row, 'tokens' if distance < 1 else 'fuzzy'))
+        return results
+
+    def best_match(self, query, fuzzy: bool = True) -> Optional[Tuple[int, str]]:
+        """
+        Mejor fila para la búsqueda ((fila, tipo)) o None. Primero tokens completos (un typo le gana
+        a un prefijo: "Halland" -> "Haaland" antes que "Hallander"), después por prefijo.
+        """
+        results = (self.search(query, limit=1, prefix=False, fuzzy=fuzzy) or
+                   self.search(query, limit=1, prefix=True, fuzzy=fuzzy))
+        return results[0] if results else None
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Player Profile Store - Perfiles de jugadores indexados por player_id
+
+/search completaba a los jugadores de la BD local filtrando player_profiles entero
+(player_profiles['player_id'] == player_id) en cada request, parseando date_of_birth con
+pd.to_datetime y convirtiendo la fila de pandas a dict. Acá los perfiles se indexan una
+sola vez: player_id -> posición, y una lista por campo con los valores ya limpios
+(fecha de nacimiento parseada, altura numérica, pie e imagen sin NaN). get() arma un dict
+plano en tiempo constante; la edad se calcula contra la fecha del día con la fecha ya parseada.
+"""
+
+import math
+from datetime import date
+from typing import Dict, Optional
+
+import pandas as pd
+
+# Campos de texto del perfil -> valor cuando falta (los mismos defaults que usaba /search)
+TEXT_FIELDS = (
+    ('foot', '--'),
+    ('contract_expires', '--'),
+    ('place_of_birth', '--'),
+    ('player_image_url', ''),
+    ('joined', '--'),
+    ('outfitter', '--'),
+)
+
+
+def profile_key(player_id) -> Optional[int]:
+    """player_id como entero (los CSV lo traen como int, float o string)"""
+    try:
+        return int(float(player_id))
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+
+def age_on(birth, today: date):
+    """Edad en años a la fecha dada ('--' si no hay fecha de nacimiento)"""
+    if birth is None:
+        return "--"
+    year, month, day = birth
+    return today.year - year - ((today.month, today.day) < (month, day))
+
+
+def clean_text(value, default):
+    """Valor del perfil, o el default si falta (None, NaN o vacío)"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return default
+    if isinstance(value, str) and (not value.strip() or value.lower() == 'nan'):
+        return default
+    return value
+
+
+class PlayerProfileStore:
+    """player_id -> perfil limpio (dict plano) a partir de player_profiles"""
+
+    def __init__(self, profiles, source=None):
+        self.source = source    # Objeto del que salieron los perfiles (para detectar cambios)
+        self.rows: Dict[int, int] = {}
+        self.fields: Dict[str, list] = {}
+
+        if profiles is None or 'player_id' not in getattr(profiles, 'columns', ()):
+            return
+
+        # Ante player_id repetidos gana la primera fila (igual que iloc[0] sobre el filtro)
+        for row, player_id in enumerate(profiles['player_id'].tolist()):
+            key = profile_key(player_id)
+            if key is not None and key not in self.rows:
+                self.rows[key] = row
+
+        size = len(profiles)
+        if 'date_of_birth' in profiles.columns:
+            births = pd.to_datetime(profiles['date_of_birth'], errors='coerce')
+            self.fields['birth'] = [None if pd.isna(year) else (int(year), int(month), int(day))
+                                    for year, month, day in zip(births.dt.year, births.dt.month, births.dt.day)]
+        else:
+            self.fields['birth'] = [None] * size
+
+        if 'height' in profiles.columns:
+            self.fields['height'] = pd.to_numeric(profiles['height'], errors='coerce').tolist()
+        else:
+            self.fields['height'] = [float('nan')] * size
+
+        for field, default in TEXT_FIELDS:
+            if field in profiles.columns:
+                self.fields[field] = [clean_text(value, default) for value in profiles[field].tolist()]
+            else:
+                self.fields[field] = [default] * size
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, player_id):
+        return profile_key(player_id) in self.rows
+
+    def get(self, player_id, today: Optional[date] = None) -> Optional[Dict]:
+        """Perfil del jugador como dict plano (None si no está)"""
+        row = self.rows.get(profile_key(player_id))
+        if row is None:
+            return None
+        fields = self.fields
+        profile = {field: fields[field][row] for field, _ in TEXT_FIELDS}
+        profile['height'] = fields['height'][row]
+        profile['age'] = age_on(fields['birth'][row], today or date.today())
+        profile['weight'] = '--'  # No disponible en el dataset
+        return profile
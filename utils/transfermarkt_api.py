@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Transfermarkt API Client - Cliente HTTP compartido por los crawlers de clubes
+
+Una sola Session (pool de conexiones), un rate limiter adaptativo, reintentos con backoff
+y un cache de respuestas por corrida: si dos etapas del pipeline de descubrimiento piden
+el mismo perfil (o el mismo plantel), la API se consulta una sola vez, incluso cuando los
+pedidos llegan al mismo tiempo desde distintos workers.
+"""
+
+import time
+import random
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+BASE_URL = "https://transfermarkt-api.fly.dev"
+HEADERS = {'accept': 'application/json'}
+
+DEFAULT_WORKERS = 8
+DEFAULT_MAX_RPS = 8.0
+MIN_RPS = 1.0
+MAX_ATTEMPTS = 3                      # Intentos por request ante errores transitorios (429, 5xx, timeouts)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def current_season_id() -> int:
+    """Temporada de Transfermarkt en curso (2024 = 2024/25; arranca en julio)"""
+    today = datetime.now()
+    return today.year if today.month >= 7 else today.year - 1
+
+
+class RateLimiter:
+    """
+    Token bucket compartido por los workers con tasa adaptativa: baja a la mitad ante un 429
+    (como mucho una vez por segundo, los 429 de una misma ráfaga cuentan una sola vez),
+    respeta Retry-After y se recupera un 2% del máximo con cada respuesta exitosa
+    """
+
+    def __init__(self, max_rps: float = DEFAULT_MAX_RPS, min_rps: float = MIN_RPS):
+        self.max_rps = max_rps
+        self.min_rps = min_rps
+        self.rate = max_rps
+        self.next_slot = time.monotonic()
+        self.paused_until = 0.0
+        self.last_throttle = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Bloquear hasta que el worker tenga turno para hacer un request"""
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now, self.paused_until)
+            self.next_slot = slot + 1.0 / self.rate
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def on_success(self):
+        with self.lock:
+            self.rate = min(self.max_rps, self.rate + self.max_rps * 0.02)
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        with self.lock:
+            now = time.monotonic()
+            if now - self.last_throttle >= 1.0:
+                self.rate = max(self.min_rps, self.rate / 2)
+                self.last_throttle = now
+            if retry_after:
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+
+
+class TransfermarktAPIClient:
+    """Cliente de transfermarkt-api con rate limit, reintentos y cache de respuestas deduplicado"""
+
+    def __init__(self, base_url: str = BASE_URL, workers: int = DEFAULT_WORKERS,
+                 max_rps: float = DEFAULT_MAX_RPS):
+        self.base_url = base_url.rstrip('/')
+        self.rate_limiter = RateLimiter(max_rps=max_rps)
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self.total_requests = 0
+        self.successful_requests = 0
+        self.cache_hits = 0
+        self._stats_lock = threading.Lock()
+        self._cache = {}       # clave -> (estado, datos); solo respuestas definitivas
+        self._inflight = {}    # clave -> Event de la primera petición en curso
+        self._cache_lock = threading.Lock()
+
+    def get_json(self, path: str, params: Optional[Dict] = None, timeout: int = 10,
+                 label: str = '') -> Tuple[str, Optional[Dict]]:
+        """
+        GET con reintentos adaptativos
+
+        Returns:
+            (estado, datos): 'ok' con el JSON, 'not_found' (404) o 'error' tras MAX_ATTEMPTS
+        """
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        label = label or path
+
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            self.rate_limiter.acquire()
+            with self._stats_lock:
+                self.total_requests += 1
+
+            retry_after = None
+            try:
+                response = self.session.get(url, params=params, timeout=timeout)
+
+                if response.status_code == 200:
+                    self.rate_limiter.on_success()
+                    with self._stats_lock:
+                        self.successful_requests += 1
+                    return 'ok', response.json()
+                elif response.status_code == 404:
+                    self.rate_limiter.on_success()
+                    return 'not_found', None
+                elif response.status_code in RETRY_STATUSES:
+                    try:
+                        retry_after = float(response.headers.get('Retry-After', 0)) or None
+                    except ValueError:
+                        retry_after = None
+                    if response.status_code == 429:
+                        self.rate_limiter.on_throttle(retry_after)
+                    print(f"   ⚠️  {label}: Status {response.status_code} (intento {attempt}/{MAX_ATTEMPTS})")
+                else:
+                    print(f"   ⚠️  {label}: Status {response.status_code}")
+                    return 'error', None
+
+            except requests.exceptions.Timeout:
+                print(f"   ⏱️  {label}: Timeout (intento {attempt}/{MAX_ATTEMPTS})")
+            except ValueError as e:
+                print(f"   ❌ {label}: JSON inválido - {str(e)}")
+            except requests.exceptions.RequestException as e:
+                print(f"   ❌ {label}: Error - {str(e)}")
+
+            # Backoff exponencial con jitter (o lo que pida Retry-After)
+            if attempt < MAX_ATTEMPTS:
+                time.sleep(retry_after or (0.5 * 2 ** (attempt - 1) + random.uniform(0, 0.25)))
+
+        return 'error', None
+
+    def _cached(self, key, fetch):
+        """Resolver una clave una sola vez por corrida (los pedidos concurrentes esperan al primero)"""
+        with self._cache_lock:
+            if key in self._cache:
+                self.cache_hits += 1
+                return self._cache[key]
+            event = self._inflight.get(key)
+            owner = event is None
+            if owner:
+                event = threading.Event()
+                self._inflight[key] = event
+
+        if not owner:
+            event.wait()
+            with self._cache_lock:
+                self.cache_hits += 1
+                return self._cache.get(key, ('error', None))
+
+        result = ('error', None)
+        try:
+            result = fetch()
+        finally:
+            with self._cache_lock:
+                # Los errores transitorios no se cachean: un reintento posterior vuelve a la API
+                if result[0] != 'error':
+                    self._cache[key] = result
+                del self._inflight[key]
+            event.set()
+        return result
+
+    def club_profile(self, club_id: int) -> Tuple[str, Optional[Dict]]:
+        """Perfil de un club por ID"""
+        return self._cached(('club', int(club_id)),
+                            lambda: self.get_json(f"clubs/{club_id}/profile", label=f"ID {club_id}"))
+
+    def competition_clubs(self, competition_id: str, season_id: Optional[int] = None) -> Optional[List[Dict]]:
+        """Clubes ({id, name}) de una competencia en una temporada (None si la API no respondió)"""
+        season_id = season_id or current_season_id()
+        status, data = self._cached(
+            ('competition', competition_id, season_id),
+            lambda: self.get_json(f"competitions/{competition_id}/clubs", params={'season_id': season_id},
+                                  timeout=15, label=competition_id))
+        if status != 'ok':
+            return None
+        return [club for club in data.get('clubs', []) if club.get('id')]